@@ -14,6 +14,8 @@ This tool attempts to:
 """
 
 import argparse
+import binascii
+import heapq
 import json
 import re
 import sys
@@ -66,31 +68,60 @@ RWZ_SIGNATURES = {
     b'\x00\x01\x00\x00': 'DWORD alignment marker (0x0100)',
 }
 
+# Signatures grouped by first byte, so header checks only test plausible candidates
+_SIG_BY_FIRST: Dict[int, List[Tuple[bytes, str]]] = {}
+for _sig, (_fmt, _) in SIGNATURES.items():
+    _SIG_BY_FIRST.setdefault(_sig[0], []).append((_sig, _fmt))
 
-def find_all_signatures(data: bytes, max_results: int = 100) -> List[Dict]:
-    """Find all known signatures in data."""
-    findings = []
-    
-    for sig, (format_name, description) in SIGNATURES.items():
+
+def find_all_signatures(data: bytes, max_results: int = 100, include_context: bool = False) -> List[Dict]:
+    """Find known signatures in data (first max_results per format)."""
+    # Collect bare (offset, signature) tuples first; dicts and hex strings are
+    # only built for the matches that survive the per-format cap.
+    hits_by_format: Dict[str, List[Tuple[int, bytes]]] = {}
+    
+    for sig, (format_name, _) in SIGNATURES.items():
+        hits = hits_by_format.setdefault(format_name, [])
         pos = 0
         count = 0
         while count < max_results:
             idx = data.find(sig, pos)
             if idx == -1:
                 break
-            findings.append({
-                'offset': idx,
-                'offset_hex': f'0x{idx:08x}',
-                'signature': sig.hex(),
-                'format': format_name,
-                'description': description,
-                'context': data[max(0, idx-4):idx+len(sig)+4].hex(),
-            })
+            hits.append((idx, sig))
             pos = idx + 1
             count += 1
     
+    kept = []
+    for hits in hits_by_format.values():
+        kept.extend(heapq.nsmallest(max_results, hits))
+    
     # Sort by offset
-    findings.sort(key=lambda x: x['offset'])
+    kept.sort()
+    
+    findings = []
+    for idx, sig in kept:
+        format_name, description = SIGNATURES[sig]
+        findings.append({
+            'offset': idx,
+            'offset_hex': f'0x{idx:08x}',
+            'signature': sig.hex(),
+            'format': format_name,
+            'description': description,
+        })
+    
+    if include_context:
+        # Hex-encode all context windows in one call, then split per finding
+        scratch = bytearray()
+        bounds = []
+        for idx, sig in kept:
+            start = len(scratch)
+            scratch += data[max(0, idx-4):idx+len(sig)+4]
+            bounds.append((start * 2, len(scratch) * 2))
+        context_hex = binascii.hexlify(scratch).decode('ascii')
+        for finding, (lo, hi) in zip(findings, bounds):
+            finding['context'] = context_hex[lo:hi]
+    
     return findings
 
 
@@ -138,8 +169,9 @@ def analyze_header_structure(data: bytes, header_size: int = 512) -> Dict:
     results['printable_prefix_bytes'] = sum(1 for b in first_100 if 32 <= b <= 126 or b in (9, 10, 13))
     
     # Detect magic bytes
+    candidates = _SIG_BY_FIRST.get(header[0], ()) if header else ()
     results['detected_formats'] = [
-        (sig_hex, fmt) for sig, (fmt, _) in SIGNATURES.items()
+        (sig.hex(), fmt) for sig, fmt in candidates
         if header.startswith(sig)
     ]
     
@@ -217,7 +249,9 @@ def main(argv: List[str]) -> int:
         description='Detect RWZ format signatures and container structure'
     )
     parser.add_argument('rwz_file', help='Path to RWZ file')
-    parser.add_argument('--depth', type=int, default=100, help='Max signatures per type (default: 100)')
+    parser.add_argument('--depth', type=int, default=100, help='Max signatures per format (default: 100)')
+    parser.add_argument('--context', action=argparse.BooleanOptionalAction, default=False,
+                        help='Include surrounding bytes (hex) for each signature hit')
     parser.add_argument('--out', help='Output JSON file')
     parser.add_argument('--out-md', help='Output Markdown report')
     
@@ -234,7 +268,7 @@ def main(argv: List[str]) -> int:
     print(f"Analyzing {rwz_path} ({len(data)} bytes)", file=sys.stderr)
     
     # Run analyses
-    signatures = find_all_signatures(data, args.depth)
+    signatures = find_all_signatures(data, args.depth, args.context)
     unicode_info = detect_unicode_patterns(data)
     header_info = analyze_header_structure(data)
     boundaries = find_structure_boundaries(data)
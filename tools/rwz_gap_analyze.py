@@ -1,9 +1,11 @@
 #!/usr/bin/env python3
 import argparse
 import math
+import os
 import re
 import sys
 import zlib
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 
@@ -24,6 +26,7 @@ MAGIC = [
     (b'JFIF', 'jpeg (jfif)'),
     (b'Exif', 'jpeg (exif)'),
 ]
+TEXT_SCAN_MIN_RATIO = 0.3
 
 
 def merge_ranges(ranges):
@@ -111,8 +114,8 @@ def find_utf16be_runs(buf: bytes, limit: int):
 
 
 def hex_preview(buf: bytes, length: int) -> str:
-    chunk = buf[:length]
-    return ' '.join(f'{b:02x}' for b in chunk)
+    # bytes.hex(sep) formats the whole preview in a single C call.
+    return buf[:length].hex(' ')
 
 
 def detect_magic(buf: bytes) -> list[str]:
@@ -135,6 +138,78 @@ def try_zlib(buf: bytes) -> str | None:
     return None
 
 
+def analyze_gap(idx: int, start: int, end: int, buf: bytes, args: argparse.Namespace) -> list[str]:
+    out_lines = []
+    size = end - start
+    ent = shannon_entropy(buf)
+    zratio = ratio_zero(buf)
+    pratio = ratio_printable(buf)
+    u16like = utf16le_likeness(buf)
+    # Mostly non-printable gaps (compressed/encrypted) cannot hold meaningful text runs.
+    text_scan = pratio >= TEXT_SCAN_MIN_RATIO
+    utf16_scan = text_scan and u16like >= TEXT_SCAN_MIN_RATIO
+    guid_matches = []
+    if text_scan:
+        guid_matches = [m.group().decode('ascii', errors='ignore') for m in GUID_RE.finditer(buf)][: args.sample_limit]
+    magic = detect_magic(buf)
+    zlib_note = try_zlib(buf)
+
+    out_lines.append(f'## Gap {idx}')
+    out_lines.append(f'- Range: 0x{start:08x} .. 0x{end:08x} (size {size})')
+    out_lines.append(f'- Entropy: {ent:.3f}')
+    out_lines.append(f'- Zero ratio: {zratio:.3f}')
+    out_lines.append(f'- Printable ASCII ratio: {pratio:.3f}')
+    out_lines.append(f'- UTF-16-like ratio: {u16like:.3f}')
+    if magic:
+        out_lines.append(f'- Magic: {", ".join(magic)}')
+    if zlib_note:
+        out_lines.append(f'- Zlib probe: {zlib_note}')
+    if not text_scan:
+        out_lines.append('- Text scan: skipped (low printable ratio)')
+    elif not utf16_scan:
+        out_lines.append('- UTF-16 scan: skipped (low UTF-16-like ratio)')
+    out_lines.append(f'- Hex head ({args.preview_bytes} bytes): `{hex_preview(buf, args.preview_bytes)}`')
+    out_lines.append('')
+
+    ascii_runs = find_ascii_runs(buf, args.sample_limit) if text_scan else []
+    u16le_runs = find_utf16le_runs(buf, args.sample_limit) if utf16_scan else []
+    u16be_runs = find_utf16be_runs(buf, args.sample_limit) if utf16_scan else []
+
+    if ascii_runs:
+        out_lines.append('### ASCII runs')
+        for s in ascii_runs:
+            out_lines.append(f'- {s}')
+        out_lines.append('')
+
+    if u16le_runs:
+        out_lines.append('### UTF-16LE runs')
+        for s in u16le_runs:
+            out_lines.append(f'- {s}')
+        out_lines.append('')
+
+    if u16be_runs:
+        out_lines.append('### UTF-16BE runs')
+        for s in u16be_runs:
+            out_lines.append(f'- {s}')
+        out_lines.append('')
+
+    if guid_matches:
+        out_lines.append('### GUID-like')
+        for s in guid_matches:
+            out_lines.append(f'- {s}')
+        out_lines.append('')
+
+    return out_lines
+
+
+def _analyze_gap_star(task) -> list[str]:
+    return analyze_gap(*task)
+
+
+def write_lines(fp, lines: list[str]) -> None:
+    fp.writelines(f'{line}\n' for line in lines)
+
+
 def main(argv: list[str]) -> int:
     ap = argparse.ArgumentParser(description='Analyze RWZ gaps (uncovered byte regions)')
     ap.add_argument('path', type=Path, help='Path to .rwz file')
@@ -142,6 +217,7 @@ def main(argv: list[str]) -> int:
     ap.add_argument('--gap-limit', type=int, default=80, help='Number of largest gaps to analyze')
     ap.add_argument('--sample-limit', type=int, default=8, help='Max sample runs per gap')
     ap.add_argument('--preview-bytes', type=int, default=96, help='Hex preview bytes')
+    ap.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help='Worker processes for per-gap analysis (1 = serial)')
     ap.add_argument('--out', type=Path, help='Write report to file (UTF-8)')
     args = ap.parse_args(argv)
 
@@ -173,71 +249,34 @@ def main(argv: list[str]) -> int:
     gaps.sort(key=lambda x: x[1] - x[0], reverse=True)
     gaps = gaps[: args.gap_limit]
 
-    out_lines = []
-    out_lines.append(f'# RWZ Gap Deep Report: {args.path.name}')
-    out_lines.append('')
-    out_lines.append(f'- File size: {len(data)} bytes')
-    out_lines.append(f'- Gaps analyzed: {len(gaps)}')
-    out_lines.append('')
-
-    for idx, (start, end) in enumerate(gaps, start=1):
-        buf = data[start:end]
-        size = end - start
-        ent = shannon_entropy(buf)
-        zratio = ratio_zero(buf)
-        pratio = ratio_printable(buf)
-        u16like = utf16le_likeness(buf)
-        guid_matches = [m.group().decode('ascii', errors='ignore') for m in GUID_RE.finditer(buf)][: args.sample_limit]
-        magic = detect_magic(buf)
-        zlib_note = try_zlib(buf)
-
-        out_lines.append(f'## Gap {idx}')
-        out_lines.append(f'- Range: 0x{start:08x} .. 0x{end:08x} (size {size})')
-        out_lines.append(f'- Entropy: {ent:.3f}')
-        out_lines.append(f'- Zero ratio: {zratio:.3f}')
-        out_lines.append(f'- Printable ASCII ratio: {pratio:.3f}')
-        out_lines.append(f'- UTF-16-like ratio: {u16like:.3f}')
-        if magic:
-            out_lines.append(f'- Magic: {", ".join(magic)}')
-        if zlib_note:
-            out_lines.append(f'- Zlib probe: {zlib_note}')
-        out_lines.append(f'- Hex head ({args.preview_bytes} bytes): `{hex_preview(buf, args.preview_bytes)}`')
-        out_lines.append('')
-
-        ascii_runs = find_ascii_runs(buf, args.sample_limit)
-        u16le_runs = find_utf16le_runs(buf, args.sample_limit)
-        u16be_runs = find_utf16be_runs(buf, args.sample_limit)
-
-        if ascii_runs:
-            out_lines.append('### ASCII runs')
-            for s in ascii_runs:
-                out_lines.append(f'- {s}')
-            out_lines.append('')
-
-        if u16le_runs:
-            out_lines.append('### UTF-16LE runs')
-            for s in u16le_runs:
-                out_lines.append(f'- {s}')
-            out_lines.append('')
-
-        if u16be_runs:
-            out_lines.append('### UTF-16BE runs')
-            for s in u16be_runs:
-                out_lines.append(f'- {s}')
-            out_lines.append('')
-
-        if guid_matches:
-            out_lines.append('### GUID-like')
-            for s in guid_matches:
-                out_lines.append(f'- {s}')
-            out_lines.append('')
-
-    report = '\n'.join(out_lines) + '\n'
     if args.out:
         args.out.parent.mkdir(parents=True, exist_ok=True)
-        args.out.write_text(report, encoding='utf-8')
+        fp = open(args.out, 'w', encoding='utf-8', buffering=1 << 16)
     else:
-        print(report)
+        fp = sys.stdout
+
+    # Stream each gap's lines as soon as they are ready instead of joining one big report.
+    try:
+        write_lines(fp, [
+            f'# RWZ Gap Deep Report: {args.path.name}',
+            '',
+            f'- File size: {len(data)} bytes',
+            f'- Gaps analyzed: {len(gaps)}',
+            '',
+        ])
+
+        tasks = [(idx, start, end, data[start:end], args) for idx, (start, end) in enumerate(gaps, start=1)]
+        if args.jobs > 1 and len(tasks) > 1:
+            # Gaps are independent; fan them out and keep the report order.
+            with ProcessPoolExecutor(max_workers=args.jobs) as ex:
+                for gap_lines in ex.map(_analyze_gap_star, tasks, chunksize=4):
+                    write_lines(fp, gap_lines)
+        else:
+            for task in tasks:
+                write_lines(fp, analyze_gap(*task))
+    finally:
+        if fp is not sys.stdout:
+            fp.close()
     return 0
 
 
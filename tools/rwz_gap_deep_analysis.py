@@ -14,49 +14,59 @@ RWZ ギャップ領域深掘り分析ツール
 """
 
 import argparse
+import heapq
 import json
+import mmap
+import os
+import re
 import struct
 import sys
 import math
 from pathlib import Path
 from typing import List, Dict, Tuple, Optional
-from collections import defaultdict, Counter
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+
+NON_NULL_RE = re.compile(rb'[^\x00]')
+CONTEXT_DWORDS = struct.Struct('<4I')  # 16バイトのコンテキストを4 DWORDとして一括展開
+PRINTABLE_LUT = bytes(i if 32 <= i <= 126 else 0x2e for i in range(256))  # 非表示文字は '.'
+
+
+def null_runs(data: bytes, min_size: int):
+    """min_sizeバイト以上のゼロ連続の (start, end) をファイル順に返す"""
+    # bytes.find（C実装の高速検索、複数バイト単位でスキップ）で次のゼロ連続へ飛び、
+    # 終端は正規表現で非ゼロバイトを1回検索して求める
+    needle = b'\x00' * max(1, min_size)
+    size = len(data)
+    pos = 0
+    while True:
+        start = data.find(needle, pos)
+        if start == -1:
+            return
+        m = NON_NULL_RE.search(data, start + len(needle))
+        pos = m.start() if m else size
+        yield start, pos
 
 
 def find_top_gaps(data: bytes, count: int = 30) -> List[Dict]:
     """ファイルから上位Nのギャップを抽出"""
-    gaps = []
-    in_gap = False
-    gap_start = 0
-    
-    for offset in range(len(data)):
-        is_null = data[offset] == 0
-        
-        if is_null and not in_gap:
-            gap_start = offset
-            in_gap = True
-        elif not is_null and in_gap:
-            gap_size = offset - gap_start
-            if gap_size >= 4:
-                gaps.append({
-                    'start': gap_start,
-                    'end': offset,
-                    'size': gap_size,
-                    'data': data[gap_start:offset],
-                })
-            in_gap = False
-    
-    if in_gap:
-        gap_size = len(data) - gap_start
-        if gap_size >= 4:
-            gaps.append({
-                'start': gap_start,
-                'end': len(data),
-                'size': gap_size,
-                'data': data[gap_start:],
-            })
-    
-    return sorted(gaps, key=lambda x: -x['size'])[:count]
+    # 全件ソートせず上位N件だけを部分選択（同サイズはファイル順を維持）
+    top = heapq.nlargest(count, null_runs(data, 4), key=lambda span: span[1] - span[0])
+    
+    return [
+        {
+            'start': gap_start,
+            'end': gap_end,
+            'size': gap_end - gap_start,
+        }
+        for gap_start, gap_end in top
+    ]
 
 
 def analyze_gap_context(data: bytes, gap: Dict) -> Dict:
@@ -76,8 +86,8 @@ def analyze_gap_context(data: bytes, gap: Dict) -> Dict:
         before = data[gap['start']-16:gap['start']]
         context['before_context'] = {
             'hex': before.hex(),
-            'dwords': [struct.unpack('<I', before[i:i+4])[0] for i in range(0, 16, 4)],
-            'printable': ''.join(chr(b) if 32 <= b <= 126 else '.' for b in before),
+            'dwords': list(CONTEXT_DWORDS.unpack(before)),
+            'printable': before.translate(PRINTABLE_LUT).decode('latin-1'),
         }
     
     # 後のコンテキスト（16バイト）
@@ -85,13 +95,27 @@ def analyze_gap_context(data: bytes, gap: Dict) -> Dict:
         after = data[gap['end']:gap['end']+16]
         context['after_context'] = {
             'hex': after.hex(),
-            'dwords': [struct.unpack('<I', after[i:i+4])[0] for i in range(0, min(16, len(after)), 4)],
-            'printable': ''.join(chr(b) if 32 <= b <= 126 else '.' for b in after),
+            'dwords': list(CONTEXT_DWORDS.unpack(after)),
+            'printable': after.translate(PRINTABLE_LUT).decode('latin-1'),
         }
     
     return context
 
 
+def _entropy(counts, total: int) -> float:
+    """バイト頻度からシャノンエントロピー（bit/byte）を計算"""
+    counts = list(counts)
+    if total and max(counts, default=0) == total:
+        return 0.0  # 単一バイト値のみ（ゼロギャップ等）はlog2不要
+    entropy = 0.0
+    log2 = math.log2
+    for count in counts:
+        if count:
+            p = count / total
+            entropy -= p * log2(p)
+    return entropy
+
+
 def analyze_gap_bitpatterns(gap_data: bytes) -> Dict:
     """ギャップ内のビットパターン分析"""
     analysis = {
@@ -104,37 +128,25 @@ def analyze_gap_bitpatterns(gap_data: bytes) -> Dict:
     
     # バイト分布
     counts = Counter(gap_data)
+    top_bytes = counts.most_common(10)  # 上位選択は1回だけ（上位5件はこの先頭）
     analysis['byte_distribution'] = {
         'null_bytes': counts.get(0, 0),
         'non_null_bytes': len(gap_data) - counts.get(0, 0),
         'unique_values': len(counts),
-        'common_bytes': counts.most_common(5),
+        'common_bytes': top_bytes[:5],
     }
     
-    # ビットパターンの統計
-    bit_patterns = {}
-    for byte_val in counts.keys():
-        bit_str = format(byte_val, '08b')
-        if bit_str not in bit_patterns:
-            bit_patterns[bit_str] = 0
-        bit_patterns[bit_str] += counts[byte_val]
-    
-    analysis['bit_patterns'] = sorted(
-        bit_patterns.items(),
-        key=lambda x: -x[1]
-    )[:10]
+    # ビットパターンの統計（バイト値と1対1なので頻度上位10件だけ2進表記にする）
+    analysis['bit_patterns'] = [
+        (format(byte_val, '08b'), count) for byte_val, count in top_bytes
+    ]
     
     # 繰り返しパターンの検出
     repeating = _detect_repeating_patterns(gap_data)
     analysis['repeating_sequences'] = repeating
     
     # エントロピー計算
-    entropy = 0.0
-    for count in counts.values():
-        if count > 0:
-            p = count / len(gap_data)
-            entropy -= p * math.log2(p)
-    analysis['entropy'] = entropy
+    analysis['entropy'] = _entropy(counts.values(), len(gap_data))
     
     return analysis
 
@@ -142,13 +154,18 @@ def analyze_gap_bitpatterns(gap_data: bytes) -> Dict:
 def _detect_repeating_patterns(data: bytes, min_length: int = 1, max_length: int = 8) -> List[Dict]:
     """繰り返しパターンの検出"""
     patterns = []
-    
-    for length in range(min_length, min(max_length + 1, len(data) // 2)):
-        pattern_counts = defaultdict(int)
-        
-        for i in range(len(data) - length + 1):
-            pattern = data[i:i+length]
-            pattern_counts[pattern] += 1
+    n = len(data)
+    uniform = n > 0 and data.count(data[:1]) == n
+    view = memoryview(data)
+    
+    for length in range(min_length, min(max_length + 1, n // 2)):
+        if uniform:
+            # 単一バイトの連続（典型的なゼロギャップ）は窓が1種類しかない
+            pattern_counts = {data[:length]: n - length + 1}
+        else:
+            # 窓ごとにbytesスライスを作らず、ずらしたビューをzipしてC側で数える
+            windows = Counter(zip(*(view[i:] for i in range(length))))
+            pattern_counts = {bytes(w): count for w, count in windows.items() if count >= 3}
         
         for pattern, count in pattern_counts.items():
             if count >= 3:  # 3回以上繰り返し
@@ -156,7 +173,7 @@ def _detect_repeating_patterns(data: bytes, min_length: int = 1, max_length: int
                     'pattern': pattern.hex(),
                     'length': length,
                     'count': count,
-                    'percentage': (count * length / len(data)) * 100,
+                    'percentage': (count * length / n) * 100,
                 })
     
     return sorted(patterns, key=lambda x: -x['count'])[:20]
@@ -271,12 +288,69 @@ def analyze_gap_block_relationships(data: bytes, gap: Dict) -> Dict:
     return relationships
 
 
+def analyze_gap(data: bytes, gap: Dict) -> Dict:
+    """1ギャップ分の分析結果をまとめて返す"""
+    analysis = {
+        'gap_info': {
+            'start': gap['start'],
+            'start_hex': f'0x{gap["start"]:08x}',
+            'end': gap['end'],
+            'end_hex': f'0x{gap["end"]:08x}',
+            'size': gap['size'],
+        },
+        'context': analyze_gap_context(data, gap),
+        'bitanalysis': analyze_gap_bitpatterns(data[gap['start']:gap['end']]),
+        'branching_inference': None,
+        'block_relationships': analyze_gap_block_relationships(data, gap),
+    }
+    
+    # 分岐ロジック推測
+    inference = infer_branching_logic(
+        gap,
+        analysis['context'],
+        analysis['bitanalysis']
+    )
+    analysis['branching_inference'] = inference
+    
+    return analysis
+
+
+_WORKER_DATA = b''
+
+
+def _init_worker(path: str) -> None:
+    global _WORKER_DATA
+    _WORKER_DATA = map_rwz(Path(path))
+
+
+def _analyze_gap_in_worker(gap: Dict) -> Dict:
+    return analyze_gap(_WORKER_DATA, gap)
+
+
+def map_rwz(path: Path):
+    """RWZファイルを読み取り専用でメモリマップ（空ファイルは b''）"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b''
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def write_json(path: Path, payload: Dict) -> None:
+    """インデント付きJSONを書き出す（orjsonがあれば使用、なければ標準json）"""
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        return
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, indent=2, ensure_ascii=False)
+
+
 def main(argv: List[str]) -> int:
     parser = argparse.ArgumentParser(description='ギャップ領域深掘り分析')
     parser.add_argument('rwz_file', help='RWZファイルのパス')
     parser.add_argument('--out', help='出力JSONファイル')
     parser.add_argument('--out-md', help='出力Markdownファイル')
     parser.add_argument('--gap-count', type=int, default=30, help='分析するギャップ数')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help='ギャップ分析のワーカープロセス数（1 = 逐次）')
     
     args = parser.parse_args(argv)
     
@@ -285,8 +359,7 @@ def main(argv: List[str]) -> int:
         print(f"エラー: {rwz_path} が見つかりません", file=sys.stderr)
         return 1
     
-    with open(rwz_path, 'rb') as f:
-        data = f.read()
+    data = map_rwz(rwz_path)
     
     print(f"分析中: {rwz_path} ({len(data)} バイト)", file=sys.stderr)
     
@@ -297,32 +370,13 @@ def main(argv: List[str]) -> int:
     
     # 詳細分析
     print("  - 各ギャップの詳細分析中...", file=sys.stderr)
-    analyzed_gaps = []
-    
-    for gap in top_gaps:
-        analysis = {
-            'gap_info': {
-                'start': gap['start'],
-                'start_hex': f'0x{gap["start"]:08x}',
-                'end': gap['end'],
-                'end_hex': f'0x{gap["end"]:08x}',
-                'size': gap['size'],
-            },
-            'context': analyze_gap_context(data, gap),
-            'bitanalysis': analyze_gap_bitpatterns(gap['data']),
-            'branching_inference': None,
-            'block_relationships': analyze_gap_block_relationships(data, gap),
-        }
-        
-        # 分岐ロジック推測
-        inference = infer_branching_logic(
-            gap,
-            analysis['context'],
-            analysis['bitanalysis']
-        )
-        analysis['branching_inference'] = inference
-        
-        analyzed_gaps.append(analysis)
+    if args.jobs > 1 and len(top_gaps) > 1:
+        # ギャップ同士は独立なので並列化（各ワーカーが自分でファイルをマップする）
+        with ProcessPoolExecutor(max_workers=args.jobs, initializer=_init_worker,
+                                 initargs=(str(rwz_path),)) as ex:
+            analyzed_gaps = list(ex.map(_analyze_gap_in_worker, top_gaps, chunksize=4))
+    else:
+        analyzed_gaps = [analyze_gap(data, gap) for gap in top_gaps]
     
     results = {
         'file': str(rwz_path),
@@ -338,57 +392,60 @@ def main(argv: List[str]) -> int:
     # JSON出力
     if args.out:
         out_path = Path(args.out)
-        with open(out_path, 'w', encoding='utf-8') as f:
-            json.dump(results, f, indent=2, ensure_ascii=False)
+        write_json(out_path, results)
         print(f"JSON出力: {out_path}", file=sys.stderr)
     
     # Markdown出力
     if args.out_md:
         md_path = Path(args.out_md)
-        with open(md_path, 'w', encoding='utf-8') as f:
-            f.write("# ギャップ領域深掘り分析報告書\n\n")
-            f.write(f"## 概要\n")
-            f.write(f"- 分析ギャップ数: {len(top_gaps)}\n")
-            f.write(f"- フラグ候補検出: {results['summary']['gaps_with_flags']}個\n")
-            f.write(f"- 分岐条件候補: {results['summary']['gaps_with_conditions']}個\n")
-            f.write(f"- 高信頼度（>0.7）: {results['summary']['high_confidence']}個\n\n")
+        # レポートをメモリ上で組み立てて一度に書き出す
+        parts = []
+        parts.append("# ギャップ領域深掘り分析報告書\n\n")
+        parts.append(f"## 概要\n")
+        parts.append(f"- 分析ギャップ数: {len(top_gaps)}\n")
+        parts.append(f"- フラグ候補検出: {results['summary']['gaps_with_flags']}個\n")
+        parts.append(f"- 分岐条件候補: {results['summary']['gaps_with_conditions']}個\n")
+        parts.append(f"- 高信頼度（>0.7）: {results['summary']['high_confidence']}個\n\n")
+        
+        parts.append("## 詳細分析結果\n\n")
+        for i, gap in enumerate(analyzed_gaps, 1):
+            gap_info = gap['gap_info']
+            inference = gap['branching_inference']
+            
+            parts.append(f"### ギャップ #{i}\n")
+            parts.append(f"- **位置**: {gap_info['start_hex']}..{gap_info['end_hex']}\n")
+            parts.append(f"- **サイズ**: {gap_info['size']} バイト\n")
+            parts.append(f"- **信頼度スコア**: {inference['confidence_score']:.2f}\n\n")
             
-            f.write("## 詳細分析結果\n\n")
-            for i, gap in enumerate(analyzed_gaps, 1):
-                gap_info = gap['gap_info']
-                inference = gap['branching_inference']
-                
-                f.write(f"### ギャップ #{i}\n")
-                f.write(f"- **位置**: {gap_info['start_hex']}..{gap_info['end_hex']}\n")
-                f.write(f"- **サイズ**: {gap_info['size']} バイト\n")
-                f.write(f"- **信頼度スコア**: {inference['confidence_score']:.2f}\n\n")
-                
-                if inference['potential_flags']:
-                    f.write("#### 検出されたフラグ候補\n")
-                    for flag in inference['potential_flags']:
-                        f.write(f"- **{flag['type']}**: {flag['description']} (信頼度: {flag['confidence']})\n")
-                    f.write("\n")
-                
-                if inference['rule_conditions']:
-                    f.write("#### ルール分岐条件候補\n")
-                    for cond in inference['rule_conditions']:
-                        f.write(f"- **{cond['type']}** (信頼度: {cond['confidence']})\n")
-                    f.write("\n")
-                
-                bitanalysis = gap['bitanalysis']
-                f.write(f"#### バイト統計\n")
-                f.write(f"- ゼロバイト: {bitanalysis['byte_distribution']['null_bytes']}\n")
-                f.write(f"- 非ゼロバイト: {bitanalysis['byte_distribution']['non_null_bytes']}\n")
-                f.write(f"- ユニーク値: {bitanalysis['byte_distribution']['unique_values']}\n")
-                f.write(f"- エントロピー: {bitanalysis['entropy']:.3f}\n\n")
-                
-                if bitanalysis['repeating_sequences']:
-                    f.write(f"#### 繰り返しパターン (上位3)\n")
-                    for pattern in bitanalysis['repeating_sequences'][:3]:
-                        f.write(f"- `{pattern['pattern']}`: {pattern['count']}回 ({pattern['percentage']:.1f}%)\n")
-                    f.write("\n")
-                
-                f.write("---\n\n")
+            if inference['potential_flags']:
+                parts.append("#### 検出されたフラグ候補\n")
+                for flag in inference['potential_flags']:
+                    parts.append(f"- **{flag['type']}**: {flag['description']} (信頼度: {flag['confidence']})\n")
+                parts.append("\n")
+            
+            if inference['rule_conditions']:
+                parts.append("#### ルール分岐条件候補\n")
+                for cond in inference['rule_conditions']:
+                    parts.append(f"- **{cond['type']}** (信頼度: {cond['confidence']})\n")
+                parts.append("\n")
+            
+            bitanalysis = gap['bitanalysis']
+            parts.append(f"#### バイト統計\n")
+            parts.append(f"- ゼロバイト: {bitanalysis['byte_distribution']['null_bytes']}\n")
+            parts.append(f"- 非ゼロバイト: {bitanalysis['byte_distribution']['non_null_bytes']}\n")
+            parts.append(f"- ユニーク値: {bitanalysis['byte_distribution']['unique_values']}\n")
+            parts.append(f"- エントロピー: {bitanalysis['entropy']:.3f}\n\n")
+            
+            if bitanalysis['repeating_sequences']:
+                parts.append(f"#### 繰り返しパターン (上位3)\n")
+                for pattern in bitanalysis['repeating_sequences'][:3]:
+                    parts.append(f"- `{pattern['pattern']}`: {pattern['count']}回 ({pattern['percentage']:.1f}%)\n")
+                parts.append("\n")
+            
+            parts.append("---\n\n")
+        
+        with open(md_path, 'w', encoding='utf-8') as f:
+            f.write(''.join(parts))
         
         print(f"Markdown出力: {md_path}", file=sys.stderr)
     
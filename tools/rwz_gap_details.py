@@ -14,56 +14,90 @@ This tool performs:
 """
 
 import argparse
+import heapq
 import json
+import mmap
+import os
+import re
 import struct
 import sys
 import math
 from pathlib import Path
 from typing import List, Dict, Tuple, Optional
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 
+try:
+    import orjson
+except Exception:
+    orjson = None
 
-def find_all_gaps(data: bytes, min_gap_size: int = 4) -> List[Dict]:
-    """Find all gaps (null or sparse regions) in the data."""
-    gaps = []
-    in_gap = False
-    gap_start = 0
+
+PRINTABLE_RUN_RE = re.compile(rb'[\x20-\x7e]{4,}')  # printable ASCII, > 3 chars
+NON_NULL_RE = re.compile(rb'[^\x00]')
+
+
+def null_runs(data: bytes, min_size: int):
+    """Yield (start, end) of every run of at least min_size null bytes, in file order."""
+    # bytes.find skips ahead to the next min_size-long zero stretch with the C
+    # fast-search (several bytes per step), then one regex search finds its end.
+    needle = b'\x00' * max(1, min_size)
+    size = len(data)
+    pos = 0
+    while True:
+        start = data.find(needle, pos)
+        if start == -1:
+            return
+        m = NON_NULL_RE.search(data, start + len(needle))
+        pos = m.start() if m else size
+        yield start, pos
+
+
+def find_all_gaps(data: bytes, min_gap_size: int = 4, top_n: Optional[int] = None) -> List[Dict]:
+    """Find all gaps (null or sparse regions) in the data, largest first.
     
-    for offset in range(len(data)):
-        byte_val = data[offset]
-        
-        # Consider it a gap if mostly null
-        is_sparse = byte_val == 0
-        
-        if is_sparse and not in_gap:
-            gap_start = offset
-            in_gap = True
-        elif not is_sparse and in_gap:
-            gap_size = offset - gap_start
-            if gap_size >= min_gap_size:
-                gaps.append({
-                    'start': gap_start,
-                    'start_hex': f'0x{gap_start:08x}',
-                    'end': offset,
-                    'end_hex': f'0x{offset:08x}',
-                    'size': gap_size,
-                })
-            in_gap = False
+    With top_n, only the top_n largest gaps are selected (partial sort).
+    """
+    spans = null_runs(data, min_gap_size)
+    if top_n is not None:
+        spans = heapq.nlargest(top_n, spans, key=lambda span: span[1] - span[0])
     
-    # Handle gap at end
-    if in_gap:
-        gap_size = len(data) - gap_start
-        if gap_size >= min_gap_size:
-            gaps.append({
-                'start': gap_start,
-                'start_hex': f'0x{gap_start:08x}',
-                'end': len(data),
-                'end_hex': f'0x{len(data):08x}',
-                'size': gap_size,
-            })
+    gaps = []
+    for gap_start, gap_end in spans:
+        gaps.append({
+            'start': gap_start,
+            'start_hex': f'0x{gap_start:08x}',
+            'end': gap_end,
+            'end_hex': f'0x{gap_end:08x}',
+            'size': gap_end - gap_start,
+        })
     
+    if top_n is not None:
+        return gaps
     return sorted(gaps, key=lambda x: -x['size'])
 
 
+def _byte_counts(region: bytes) -> List[int]:
+    """256-bin byte histogram (Counter tallies bytes in C)."""
+    counts = [0] * 256
+    for b, c in Counter(region).items():
+        counts[b] = c
+    return counts
+
+
+def _entropy(counts: List[int], total: int) -> float:
+    """Shannon entropy (bits/byte) from a byte histogram."""
+    if total and max(counts) == total:
+        return 0.0  # single byte value (e.g. an all-null gap): no log2 needed
+    entropy = 0.0
+    log2 = math.log2
+    for count in counts:
+        if count:
+            p = count / total
+            entropy -= p * log2(p)
+    return entropy
+
+
 def analyze_gap_content(data: bytes, gap: Dict) -> Dict:
     """Detailed analysis of a gap's content."""
     start = gap['start']
@@ -80,25 +114,19 @@ def analyze_gap_content(data: bytes, gap: Dict) -> Dict:
     }
     
     # Byte distribution
-    counts = [0] * 256
-    for b in region:
-        counts[b] += 1
+    counts = _byte_counts(region)
     
     analysis['byte_distribution'] = {
         'null_bytes': counts[0],
-        'common_bytes': sorted(
+        'common_bytes': heapq.nlargest(
+            10,
             [(b, counts[b]) for b in range(256) if counts[b] > 0],
-            key=lambda x: -x[1]
-        )[:10]
+            key=lambda x: x[1]
+        )
     }
     
     # Entropy
-    entropy = 0.0
-    for count in counts:
-        if count > 0:
-            p = count / len(region)
-            entropy -= p * math.log2(p)
-    analysis['entropy'] = entropy
+    analysis['entropy'] = _entropy(counts, len(region))
     analysis['null_ratio'] = counts[0] / len(region)
     
     # Look for patterns
@@ -123,21 +151,8 @@ def analyze_gap_content(data: bytes, gap: Dict) -> Dict:
 
 def _extract_strings_from_gap(region: bytes) -> List[str]:
     """Extract printable strings from a gap."""
-    strings = []
-    current = []
-    
-    for b in region:
-        if 32 <= b <= 126:  # Printable ASCII
-            current.append(chr(b))
-        else:
-            if current and len(''.join(current)) > 3:
-                strings.append(''.join(current))
-            current = []
-    
-    if current and len(''.join(current)) > 3:
-        strings.append(''.join(current))
-    
-    return strings
+    # Runs are matched in C; only the surviving runs are decoded
+    return [m.group().decode('ascii') for m in PRINTABLE_RUN_RE.finditer(region)]
 
 
 def _find_repeating_sequences(data: bytes, min_length: int = 4, max_length: int = 16) -> List[str]:
@@ -147,25 +162,28 @@ def _find_repeating_sequences(data: bytes, min_length: int = 4, max_length: int
     for length in range(min_length, min(max_length + 1, len(data) // 2)):
         for start in range(len(data) - length * 2):
             pattern = data[start:start+length]
-            count = 0
-            pos = start
+            # Need two more occurrences after this one; bytes.find rejects
+            # most candidates without walking the rest of the region
+            second = data.find(pattern, start + length)
+            if second == -1 or data.find(pattern, second + length) == -1:
+                continue
             
-            while pos + length <= len(data):
-                if data[pos:pos+length] == pattern:
-                    count += 1
-                    pos += length
-                else:
-                    pos += 1
-            
-            if count >= 3:
-                patterns.append(f"Sequence repeats {count}x: {pattern[:8].hex()}...")
-                break
+            # bytes.count is the same leftmost, non-overlapping scan as a
+            # step-by-length walk from start
+            count = data.count(pattern, start)
+            patterns.append(f"Sequence repeats {count}x: {pattern[:8].hex()}...")
+            break
     
     return patterns
 
 
-def classify_gaps(gaps: List[Dict], data: bytes) -> Dict:
-    """Classify gaps by their characteristics."""
+def classify_gaps(gaps: List[Dict], data: bytes, analyses: Optional[Dict[int, Dict]] = None) -> Dict:
+    """Classify gaps by their characteristics.
+    
+    analyses maps gap start -> analyze_gap_content() result; gaps found there
+    reuse its null_ratio/entropy instead of rescanning the region.
+    """
+    analyses = analyses or {}
     classification = {
         'pure_null': [],
         'sparse': [],
@@ -173,22 +191,34 @@ def classify_gaps(gaps: List[Dict], data: bytes) -> Dict:
         'unknown': [],
     }
     
+    # Batch pass: every unanalyzed gap gets a single C-level search for a non-null
+    # byte; all-zero gaps (the common case) are filed here without being sliced.
+    search = NON_NULL_RE.search
+    remaining = []
     for gap in gaps:
         start = gap['start']
         end = gap['end']
-        region = data[start:end]
-        
-        null_ratio = region.count(0) / len(region)
-        entropy = 0.0
-        
-        counts = [0] * 256
-        for b in region:
-            counts[b] += 1
+        if start not in analyses and search(data, start, end) is None:
+            classification['pure_null'].append({
+                'start': start,
+                'size': end - start,
+            })
+        else:
+            remaining.append(gap)
+    
+    for gap in remaining:
+        start = gap['start']
+        end = gap['end']
         
-        for count in counts:
-            if count > 0:
-                p = count / len(region)
-                entropy -= p * math.log2(p)
+        analyzed = analyses.get(start)
+        if analyzed is not None:
+            null_ratio = analyzed['null_ratio']
+            entropy = analyzed['entropy']
+        else:
+            region = data[start:end]
+            null_ratio = region.count(0) / len(region)
+            # Entropy is only reported for the non-null classes
+            entropy = _entropy(_byte_counts(region), len(region)) if null_ratio <= 0.95 else 0.0
         
         if null_ratio > 0.95:
             classification['pure_null'].append({
@@ -217,6 +247,35 @@ def classify_gaps(gaps: List[Dict], data: bytes) -> Dict:
     return classification
 
 
+_WORKER_DATA = b''
+
+
+def _init_worker(path: str) -> None:
+    global _WORKER_DATA
+    _WORKER_DATA = map_rwz(Path(path))
+
+
+def _analyze_gap_in_worker(gap: Dict) -> Dict:
+    return {**gap, **analyze_gap_content(_WORKER_DATA, gap)}
+
+
+def map_rwz(path: Path):
+    """Memory-map the RWZ file read-only (an empty file yields b'')."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b''
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def write_json(path: Path, payload: Dict) -> None:
+    """Write payload as indented JSON (orjson when installed, else stdlib)."""
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS, default=str))
+        return
+    with open(path, 'w') as f:
+        json.dump(payload, f, indent=2, default=str)
+
+
 def main(argv: List[str]) -> int:
     parser = argparse.ArgumentParser(
         description='Analyze gaps in RWZ file'
@@ -228,6 +287,8 @@ def main(argv: List[str]) -> int:
                        help='Minimum gap size to analyze')
     parser.add_argument('--max-gaps', type=int, default=30,
                        help='Maximum gaps to analyze in detail')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                       help='Worker processes for per-gap analysis (1 = serial)')
     
     args = parser.parse_args(argv)
     
@@ -236,8 +297,7 @@ def main(argv: List[str]) -> int:
         print(f"Error: {rwz_path} not found", file=sys.stderr)
         return 1
     
-    with open(rwz_path, 'rb') as f:
-        data = f.read()
+    data = map_rwz(rwz_path)
     
     print(f"Analyzing {rwz_path} ({len(data)} bytes)", file=sys.stderr)
     
@@ -248,15 +308,18 @@ def main(argv: List[str]) -> int:
     
     # Analyze top gaps
     print(f"  - Analyzing top {min(args.max_gaps, len(all_gaps))} gaps...", file=sys.stderr)
-    analyzed_gaps = []
-    for gap in all_gaps[:args.max_gaps]:
-        analysis = analyze_gap_content(data, gap)
-        gap_with_analysis = {**gap, **analysis}
-        analyzed_gaps.append(gap_with_analysis)
+    top_gaps = all_gaps[:args.max_gaps]
+    if args.jobs > 1 and len(top_gaps) > 1:
+        # Gaps are independent; each worker maps the file itself
+        with ProcessPoolExecutor(max_workers=args.jobs, initializer=_init_worker,
+                                 initargs=(str(rwz_path),)) as ex:
+            analyzed_gaps = list(ex.map(_analyze_gap_in_worker, top_gaps, chunksize=4))
+    else:
+        analyzed_gaps = [{**gap, **analyze_gap_content(data, gap)} for gap in top_gaps]
     
     # Classify gaps
     print("  - Classifying gaps...", file=sys.stderr)
-    classification = classify_gaps(all_gaps, data)
+    classification = classify_gaps(all_gaps, data, {g['start']: g for g in analyzed_gaps})
     
     results = {
         'file': str(rwz_path),
@@ -276,42 +339,45 @@ def main(argv: List[str]) -> int:
     # Output JSON
     if args.out:
         out_path = Path(args.out)
-        with open(out_path, 'w') as f:
-            json.dump(results, f, indent=2, default=str)
+        write_json(out_path, results)
         print(f"JSON output: {out_path}", file=sys.stderr)
     
     # Output Markdown
     if args.out_md:
         md_path = Path(args.out_md)
+        # Assemble the report in memory and write it once
+        parts = []
+        parts.append(f"# RWZ Gap Analysis\n\n")
+        
+        parts.append("## Summary\n")
+        parts.append(f"- Total gaps: {len(all_gaps)}\n")
+        parts.append(f"- Analyzed: {len(analyzed_gaps)}\n")
+        parts.append(f"- Total gap size: {sum(g['size'] for g in all_gaps)} bytes ")
+        parts.append(f"({results['gap_percentage']:.1f}% of file)\n\n")
+        
+        # Classification
+        parts.append("## Gap Classification\n")
+        parts.append(f"- Pure null: {len(classification['pure_null'])}\n")
+        parts.append(f"- Sparse: {len(classification['sparse'])}\n")
+        parts.append(f"- Structured: {len(classification['structured'])}\n")
+        parts.append(f"- Unknown: {len(classification['unknown'])}\n\n")
+        
+        # Top gaps
+        parts.append(f"## Top 10 Gaps\n\n")
+        for i, gap in enumerate(all_gaps[:10], 1):
+            parts.append(f"### Gap {i}\n")
+            parts.append(f"- Location: {gap['start_hex']}..{gap['end_hex']}\n")
+            parts.append(f"- Size: {gap['size']} bytes\n")
+            if i <= len(analyzed_gaps):
+                analyzed = analyzed_gaps[i-1]
+                parts.append(f"- Null ratio: {analyzed.get('null_ratio', 0):.1%}\n")
+                parts.append(f"- Entropy: {analyzed.get('entropy', 0):.2f}\n")
+                if analyzed.get('patterns'):
+                    parts.append(f"- Patterns: {', '.join(analyzed['patterns'][:2])}\n")
+            parts.append("\n")
+        
         with open(md_path, 'w') as f:
-            f.write(f"# RWZ Gap Analysis\n\n")
-            
-            f.write("## Summary\n")
-            f.write(f"- Total gaps: {len(all_gaps)}\n")
-            f.write(f"- Analyzed: {len(analyzed_gaps)}\n")
-            f.write(f"- Total gap size: {sum(g['size'] for g in all_gaps)} bytes ")
-            f.write(f"({results['gap_percentage']:.1f}% of file)\n\n")
-            
-            # Classification
-            f.write("## Gap Classification\n")
-            f.write(f"- Pure null: {len(classification['pure_null'])}\n")
-            f.write(f"- Sparse: {len(classification['sparse'])}\n")
-            f.write(f"- Structured: {len(classification['structured'])}\n")
-            f.write(f"- Unknown: {len(classification['unknown'])}\n\n")
-            
-            # Top gaps
-            f.write(f"## Top 10 Gaps\n\n")
-            for i, gap in enumerate(all_gaps[:10], 1):
-                f.write(f"### Gap {i}\n")
-                f.write(f"- Location: {gap['start_hex']}..{gap['end_hex']}\n")
-                f.write(f"- Size: {gap['size']} bytes\n")
-                if i <= len(analyzed_gaps):
-                    analyzed = analyzed_gaps[i-1]
-                    f.write(f"- Null ratio: {analyzed.get('null_ratio', 0):.1%}\n")
-                    f.write(f"- Entropy: {analyzed.get('entropy', 0):.2f}\n")
-                    if analyzed.get('patterns'):
-                        f.write(f"- Patterns: {', '.join(analyzed['patterns'][:2])}\n")
-                f.write("\n")
+            f.write(''.join(parts))
         
         print(f"Markdown output: {md_path}", file=sys.stderr)
     
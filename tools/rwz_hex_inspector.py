@@ -15,20 +15,34 @@ This tool provides:
 
 import argparse
 import json
+import mmap
+import os
+import re
 import struct
 import sys
 import zlib
 from pathlib import Path
 from typing import List, Dict, Tuple
 
+# Rule header: "[name]" up to the next ']' (any other bytes, so UTF-16 names
+# with non-ASCII code units still match). Names are capped at 256 bytes so
+# binary noise with sparse ']' cannot make one '[' candidate scan far.
+RULE_HEADER_RE = re.compile(rb'\[([^\]]{1,256})\]')
+
+# bytes.translate table for the hex dump ASCII column (non-printable -> '.')
+ASCII_DUMP_TABLE = bytes(b if 32 <= b < 127 else 0x2E for b in range(256))
+
+# Input/output chunk size for streaming zlib validation
+ZLIB_CHUNK = 65536
+
 
 def hex_dump(data: bytes, start: int = 0, size: int = 256, width: int = 16) -> str:
     """Create a formatted hex dump."""
     lines = []
     for i in range(0, len(data), width):
         chunk = data[i:i+width]
-        hex_part = ' '.join(f'{b:02x}' for b in chunk)
-        ascii_part = ''.join(chr(b) if 32 <= b < 127 else '.' for b in chunk)
+        hex_part = chunk.hex(' ')
+        ascii_part = chunk.translate(ASCII_DUMP_TABLE).decode('latin-1')
         lines.append(f'{start+i:08x}: {hex_part:<{width*3}} {ascii_part}')
     return '\n'.join(lines)
 
@@ -47,13 +61,30 @@ def validate_zlib_signature(data: bytes, offset: int) -> Dict:
     }
     
     try:
-        # Try to decompress with a size limit
-        stream = data[offset:]
-        decompressed = zlib.decompress(stream)
+        # Stream the input and output in bounded chunks: only the 64-byte
+        # preview and a running size are kept, never the whole tail/output
+        d = zlib.decompressobj()
+        head = b''
+        size = 0
+        pos = offset
+        while not d.eof:
+            if d.unconsumed_tail:
+                chunk = d.unconsumed_tail
+            elif pos < len(data):
+                chunk = data[pos:pos + ZLIB_CHUNK]
+                pos += ZLIB_CHUNK
+            else:
+                chunk = b''
+            out = d.decompress(chunk, ZLIB_CHUNK)
+            if not chunk and not out:
+                raise zlib.error('Error -5 while decompressing data: incomplete or truncated stream')
+            if len(head) < 64:
+                head += out[:64 - len(head)]
+            size += len(out)
         result['is_valid'] = True
-        result['decompressed_size'] = len(decompressed)
-        result['decompressed_preview'] = decompressed[:64].hex()
-        result['decompressed_text'] = decompressed[:64].decode('utf-8', errors='ignore')
+        result['decompressed_size'] = size
+        result['decompressed_preview'] = head.hex()
+        result['decompressed_text'] = head.decode('utf-8', errors='ignore')
         return result
     except zlib.error as e:
         result['error'] = str(e)
@@ -128,16 +159,19 @@ def extract_structure_samples(data: bytes) -> List[Dict]:
     return samples
 
 
-def validate_rule_headers(data: bytes) -> List[Dict]:
-    """Validate detected rule headers."""
-    import re
-    
+def validate_rule_headers(data: bytes, limit: int = 20) -> List[Dict]:
+    """Validate detected rule headers (the first ``limit`` found)."""
     results = []
     
-    # Find all rule headers
-    rule_pattern = re.compile(rb'\[([^\]]+)\]')
-    
-    for m in rule_pattern.finditer(data):
+    # Jump between '[' bytes with bytes.find and only run the bounded
+    # regex at those candidates; stop once enough headers are collected
+    pos = data.find(b'[')
+    while pos >= 0 and len(results) < limit:
+        m = RULE_HEADER_RE.match(data, pos)
+        if m is None:
+            pos = data.find(b'[', pos + 1)
+            continue
+        pos = data.find(b'[', m.end())
         offset = m.start()
         rule_name = m.group(1).decode('utf-16le', errors='ignore') if b'\x00' in m.group(1) else m.group(1).decode('utf-8', errors='ignore')
         
@@ -155,7 +189,15 @@ def validate_rule_headers(data: bytes) -> List[Dict]:
             'context_text': context.decode('utf-8', errors='ignore'),
         })
     
-    return results[:20]
+    return results
+
+
+def map_rwz(path: Path):
+    """Memory-map the RWZ file read-only (an empty file yields b'')."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b''
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
 
 
 def main(argv: List[str]) -> int:
@@ -175,8 +217,8 @@ def main(argv: List[str]) -> int:
         print(f"Error: {rwz_path} not found", file=sys.stderr)
         return 1
     
-    with open(rwz_path, 'rb') as f:
-        data = f.read()
+    # Only a few windows are sampled, so let the OS page in just those
+    data = map_rwz(rwz_path)
     
     print(f"Analyzing {rwz_path} ({len(data)} bytes)", file=sys.stderr)
     
@@ -217,40 +259,41 @@ def main(argv: List[str]) -> int:
     # Output Markdown
     if args.out_md:
         md_path = Path(args.out_md)
-        with open(md_path, 'w') as f:
-            f.write(f"# RWZ Hex Inspection Report: {rwz_path.name}\n\n")
-            
-            # Inspection result
-            if 'inspection' in results:
-                insp = results['inspection']
-                f.write("## Context Analysis\n")
-                f.write(f"- Offset: {insp['offset_hex']}\n")
-                f.write(f"- Before: `{insp['before_text']}`\n")
-                f.write(f"- At: `{insp['at_text']}`\n")
-                f.write(f"- After: `{insp['after_text']}`\n\n")
-                if 'hex_dump' in results:
-                    f.write("## Hex Dump\n")
-                    f.write("```\n")
-                    f.write(results['hex_dump'])
-                    f.write("\n```\n\n")
-            
-            # ZLIB validation
-            if 'zlib_validation' in results:
-                zlib_val = results['zlib_validation']
-                f.write("## ZLIB Signature Validation\n")
-                f.write(f"- Valid: {zlib_val['is_valid']}\n")
-                if zlib_val['error']:
-                    f.write(f"- Error: {zlib_val['error']}\n")
-                else:
-                    f.write(f"- Decompressed size: {zlib_val['decompressed_size']}\n")
-                    f.write(f"- Preview: `{zlib_val['decompressed_text']}`\n")
-            
-            # Rule headers
-            if results['rule_headers']:
-                f.write(f"\n## Rule Headers Found\n")
-                f.write(f"Total: {len(results['rule_headers'])}\n\n")
-                for rule in results['rule_headers'][:5]:
-                    f.write(f"- {rule['offset_hex']}: `{rule['rule_name']}`\n")
+        buf = []
+        buf.append(f"# RWZ Hex Inspection Report: {rwz_path.name}\n\n")
+        
+        # Inspection result
+        if 'inspection' in results:
+            insp = results['inspection']
+            buf.append("## Context Analysis\n")
+            buf.append(f"- Offset: {insp['offset_hex']}\n")
+            buf.append(f"- Before: `{insp['before_text']}`\n")
+            buf.append(f"- At: `{insp['at_text']}`\n")
+            buf.append(f"- After: `{insp['after_text']}`\n\n")
+            if 'hex_dump' in results:
+                buf.append("## Hex Dump\n")
+                buf.append("```\n")
+                buf.append(results['hex_dump'])
+                buf.append("\n```\n\n")
+        
+        # ZLIB validation
+        if 'zlib_validation' in results:
+            zlib_val = results['zlib_validation']
+            buf.append("## ZLIB Signature Validation\n")
+            buf.append(f"- Valid: {zlib_val['is_valid']}\n")
+            if zlib_val['error']:
+                buf.append(f"- Error: {zlib_val['error']}\n")
+            else:
+                buf.append(f"- Decompressed size: {zlib_val['decompressed_size']}\n")
+                buf.append(f"- Preview: `{zlib_val['decompressed_text']}`\n")
+        
+        # Rule headers
+        if results['rule_headers']:
+            buf.append(f"\n## Rule Headers Found\n")
+            buf.append(f"Total: {len(results['rule_headers'])}\n\n")
+            for rule in results['rule_headers'][:5]:
+                buf.append(f"- {rule['offset_hex']}: `{rule['rule_name']}`\n")
+        md_path.write_text(''.join(buf), encoding='utf-8')
         
         print(f"Markdown output: {md_path}", file=sys.stderr)
     
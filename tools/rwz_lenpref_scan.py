@@ -1,6 +1,10 @@
 #!/usr/bin/env python3
 import argparse
+import mmap
+import os
+import re
 import sys
+from array import array
 from pathlib import Path
 
 
@@ -8,6 +12,10 @@ def is_printable_ascii(b: int) -> bool:
     return 0x20 <= b <= 0x7E
 
 
+# bytes.translate table mapping non-printable ASCII bytes to 0x00
+ASCII_PRINTABLE_TABLE = bytes(1 if is_printable_ascii(b) else 0 for b in range(256))
+
+
 def is_printable_utf16(cp: int) -> bool:
     if cp == 0:
         return False
@@ -18,21 +26,87 @@ def is_printable_utf16(cp: int) -> bool:
     return False
 
 
+def _byte_flags(pred) -> bytes:
+    return bytes(1 if pred(b) else 0 for b in range(256))
+
+
+# Per-byte flag tables for counting non-printable UTF-16 code units
+HIGH_ZERO_TABLE = _byte_flags(lambda b: b == 0)
+LOW_CONTROL_TABLE = _byte_flags(lambda b: b < 0x20)
+HIGH_SURROGATE_TABLE = _byte_flags(lambda b: 0xD8 <= b <= 0xDF)
+HIGH_FF_TABLE = _byte_flags(lambda b: b == 0xFF)
+LOW_FE_TABLE = _byte_flags(lambda b: b >= 0xFE)
+
+
+def utf16le_printable_count(data: bytes, start: int, end: int) -> int:
+    """Number of code units in data[start:end] accepted by is_printable_utf16.
+
+    The low and high byte streams are flagged with bytes.translate and the
+    flags combined as packed integers, so no per-unit Python code runs.
+    Non-printable units are U+0000-U+001F, surrogates and U+FFFE/U+FFFF.
+    """
+    low = data[start:end:2]
+    high = data[start + 1:end:2]
+    controls = (int.from_bytes(high.translate(HIGH_ZERO_TABLE), 'little')
+                & int.from_bytes(low.translate(LOW_CONTROL_TABLE), 'little'))
+    nonchars = (int.from_bytes(high.translate(HIGH_FF_TABLE), 'little')
+                & int.from_bytes(low.translate(LOW_FE_TABLE), 'little'))
+    surrogates = high.translate(HIGH_SURROGATE_TABLE).count(1)
+    return len(low) - controls.bit_count() - nonchars.bit_count() - surrogates
+
+
+def u16le_range_re(lo: int, hi: int) -> re.Pattern | None:
+    """Zero-width regex matching every offset whose little-endian u16 is in [lo, hi]."""
+    lo = max(lo, 0)
+    hi = min(hi, 0xFFFF)
+    if lo > hi:
+        return None
+    alts = []
+    for high in range(lo >> 8, (hi >> 8) + 1):
+        low_min = lo & 0xFF if high == lo >> 8 else 0
+        low_max = hi & 0xFF if high == hi >> 8 else 0xFF
+        alts.append(rb'[\x%02x-\x%02x]\x%02x' % (low_min, low_max, high))
+    return re.compile(rb'(?=(?:' + b'|'.join(alts) + rb'))', re.DOTALL)
+
+
+def u16le_views(data: bytes):
+    """u16 views of data at even and odd offsets: views[i & 1][i >> 1] is the u16le at i."""
+    mv = memoryview(data)
+    even = mv[:len(mv) & ~1]
+    odd = mv[1:1 + (max(0, len(mv) - 1) & ~1)]
+    if sys.byteorder == 'little':
+        return even.cast('H'), odd.cast('H')
+    views = (array('H', even), array('H', odd))
+    for view in views:
+        view.byteswap()
+    return views
+
+
+def length_candidates(data: bytes, min_len: int, max_len: int, step: int):
+    """Offsets i (0 <= i < len(data) - 2, i % step == 0) with a u16le length in range.
+
+    The regex engine finds in-range prefixes in C, so only plausible
+    candidates reach the Python-level validation.
+    """
+    pattern = u16le_range_re(min_len, max_len)
+    if pattern is None:
+        return
+    for m in pattern.finditer(data, 0, max(0, len(data) - 1)):
+        i = m.start()
+        if i % step == 0:
+            yield i
+
+
 def scan_lenpref_utf16le(data: bytes, min_len: int, max_len: int, step: int):
     results = []
-    for i in range(0, len(data) - 2, step):
-        length = int.from_bytes(data[i:i + 2], 'little')
-        if length < min_len or length > max_len:
-            continue
+    views = u16le_views(data)
+    for i in length_candidates(data, min_len, max_len, step):
+        length = views[i & 1][i >> 1]
         start = i + 2
         end = start + length * 2
         if end > len(data):
             continue
-        ok = 0
-        for j in range(start, end, 2):
-            cp = data[j] | (data[j + 1] << 8)
-            if is_printable_utf16(cp):
-                ok += 1
+        ok = utf16le_printable_count(data, start, end)
         ratio = ok / length if length else 0
         if ratio >= 0.9:
             try:
@@ -45,15 +119,14 @@ def scan_lenpref_utf16le(data: bytes, min_len: int, max_len: int, step: int):
 
 def scan_lenpref_ascii(data: bytes, min_len: int, max_len: int, step: int):
     results = []
-    for i in range(0, len(data) - 2, step):
-        length = int.from_bytes(data[i:i + 2], 'little')
-        if length < min_len or length > max_len:
-            continue
+    views = u16le_views(data)
+    for i in length_candidates(data, min_len, max_len, step):
+        length = views[i & 1][i >> 1]
         start = i + 2
         end = start + length
         if end > len(data):
             continue
-        ok = sum(1 for b in data[start:end] if is_printable_ascii(b))
+        ok = length - data[start:end].translate(ASCII_PRINTABLE_TABLE).count(0)
         ratio = ok / length if length else 0
         if ratio >= 0.9:
             try:
@@ -64,6 +137,14 @@ def scan_lenpref_ascii(data: bytes, min_len: int, max_len: int, step: int):
     return results
 
 
+def map_rwz(path: Path):
+    """Memory-map the RWZ file read-only (an empty file yields b'')."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b''
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
 def main(argv: list[str]) -> int:
     ap = argparse.ArgumentParser(description='Scan RWZ for length-prefixed strings')
     ap.add_argument('path', type=Path, help='Path to .rwz file')
@@ -74,7 +155,7 @@ def main(argv: list[str]) -> int:
     ap.add_argument('--out', type=Path, help='Write report to file (UTF-8)')
     args = ap.parse_args(argv)
 
-    data = args.path.read_bytes()
+    data = map_rwz(args.path)
     u16 = scan_lenpref_utf16le(data, args.min_len, args.max_len, args.step)
     asc = scan_lenpref_ascii(data, args.min_len, args.max_len, args.step)
 
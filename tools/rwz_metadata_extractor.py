@@ -15,79 +15,112 @@ This tool performs:
 
 import argparse
 import json
-import struct
+import mmap
+import os
+import re
 import sys
+from array import array
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional
-from collections import defaultdict
+from typing import Iterator, List, Dict, Tuple, Optional
+from collections import Counter
+from itertools import compress
 
+# array typecode holding an unsigned 32-bit value on this platform
+DWORD_TYPECODE = 'I' if array('I').itemsize == 4 else 'L'
 
-def extract_dwords(data: bytes, min_offset: int = 0, max_offset: Optional[int] = None) -> List[Dict]:
-    """Extract all DWORD values at 4-byte alignment."""
+# Bump when the analysis output changes so stale side-car caches are ignored
+CACHE_VERSION = 1
+
+# Chain length above which find_pointer_chains tracks visited offsets in a set
+CHAIN_SET_THRESHOLD = 16
+
+# UTF-16LE run of ASCII characters (char followed by 0x00)
+UTF16_ASCII_RUN_RE = re.compile(rb'(?:[\x20-\x7e]\x00)+')
+
+
+def dword_values(data: bytes, min_offset: int = 0, max_offset: Optional[int] = None) -> array:
+    """Unpack the 4-byte aligned little-endian DWORDs in one C-level pass."""
     if max_offset is None:
         max_offset = len(data)
-    
-    dwords = []
-    for i in range(min_offset, max_offset - 4, 4):
-        val_le = struct.unpack('<I', data[i:i+4])[0]
-        val_be = struct.unpack('>I', data[i:i+4])[0]
-        
-        # Classify DWORD
-        classification = 'other'
-        if val_le == 0:
-            classification = 'null'
-        elif val_le == 1:
-            classification = 'marker_1'
-        elif 1 < val_le < 256:
-            classification = 'small_value'
-        elif val_le == 0xffffffff:
-            classification = 'all_ones'
-        elif 256 <= val_le < len(data):
-            classification = 'possible_offset'
-        elif val_le > len(data):
-            classification = 'out_of_bounds'
-        
-        dwords.append({
+    count = len(range(min_offset, max_offset - 4, 4))
+    values = array(DWORD_TYPECODE, data[min_offset:min_offset + count * 4])
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def classify_dword(val_le: int, data_len: int) -> str:
+    """Classify a DWORD value relative to the file size."""
+    if val_le == 0:
+        return 'null'
+    if val_le == 1:
+        return 'marker_1'
+    if 1 < val_le < 256:
+        return 'small_value'
+    if val_le == 0xffffffff:
+        return 'all_ones'
+    if 256 <= val_le < data_len:
+        return 'possible_offset'
+    if val_le > data_len:
+        return 'out_of_bounds'
+    return 'other'
+
+
+def summarize_dwords(values: array, data_len: int) -> Dict:
+    """Summary counts over the DWORD table without building per-entry dicts."""
+    return {
+        'total_dwords': len(values),
+        'valid_offsets': sum(map(data_len.__gt__, values)),
+        'null_values': values.count(0),
+        'marker_1_count': values.count(1),
+    }
+
+
+def extract_dwords(data: bytes, min_offset: int = 0, max_offset: Optional[int] = None) -> Iterator[Dict]:
+    """Lazily yield a detail dict for every DWORD at 4-byte alignment."""
+    data_len = len(data)
+    for n, val_le in enumerate(dword_values(data, min_offset, max_offset)):
+        i = min_offset + n * 4
+        yield {
             'offset': i,
             'offset_hex': f'0x{i:08x}',
             'value_le': val_le,
-            'value_be': val_be,
+            'value_be': int.from_bytes(val_le.to_bytes(4, 'little'), 'big'),
             'value_hex': f'0x{val_le:08x}',
-            'classification': classification,
-            'is_valid_offset': 0 <= val_le < len(data),
-        })
-    
-    return dwords
+            'classification': classify_dword(val_le, data_len),
+            'is_valid_offset': 0 <= val_le < data_len,
+        }
 
 
-def identify_size_fields(data: bytes) -> List[Dict]:
-    """Identify likely size fields based on proximity to string data."""
-    # Find UTF-16 string regions
+def identify_size_fields(data: bytes, values: Optional[array] = None) -> List[Dict]:
+    """Identify likely size fields based on proximity to string data.
+
+    ``values`` is the ``dword_values(data)`` table, if the caller already has it.
+    """
+    if values is None:
+        values = dword_values(data)
+    # Find UTF-16 string regions (only the first 100 are examined below)
     string_regions = []
-    i = 0
-    while i < len(data) - 4:
-        # Look for UTF-16LE ASCII pattern (char followed by 0x00)
-        if (0x20 <= data[i] <= 0x7e) and data[i+1] == 0:
-            start = i
-            while i < len(data) - 1 and ((0x20 <= data[i] <= 0x7e) and data[i+1] == 0):
-                i += 2
-            length = i - start
-            string_regions.append({
-                'start': start,
-                'length': length,
-                'start_hex': f'0x{start:08x}',
-            })
-        else:
-            i += 1
+    last_start = len(data) - 4
+    for m in UTF16_ASCII_RUN_RE.finditer(data):
+        start = m.start()
+        if start >= last_start or len(string_regions) >= 100:
+            break
+        string_regions.append({
+            'start': start,
+            'length': m.end() - start,
+            'start_hex': f'0x{start:08x}',
+        })
     
     # Now look for DWORD values that precede strings
     likely_sizes = []
-    for region in string_regions[:100]:  # Top 100
+    for region in string_regions:
         # Look 1-16 bytes before string
         for lookback in [4, 8, 12, 16]:
             offset = region['start'] - lookback
             if offset >= 0 and (offset % 4 == 0):
-                val = struct.unpack('<I', data[offset:offset+4])[0]
+                # Regions start below len(data) - 4, so the DWORD is in the table
+                val = values[offset >> 2]
                 # Check if this value is close to actual string length
                 char_count = region['length'] // 2  # UTF-16, 2 bytes per char
                 if abs(val - char_count) < 10 or abs(val - region['length']) < 20:
@@ -112,147 +145,239 @@ def identify_size_fields(data: bytes) -> List[Dict]:
     return sorted(unique, key=lambda x: x['field_offset'])[:100]
 
 
-def find_pointer_chains(data: bytes, max_chain_length: int = 5) -> List[Dict]:
-    """Find chains of pointers (offset -> offset -> offset...)."""
-    dwords = extract_dwords(data)
-    valid_offsets = {d['offset']: d for d in dwords if d['is_valid_offset']}
+def find_pointer_chains(data: bytes, max_chain_length: int = 5, values: Optional[array] = None) -> List[Dict]:
+    """Find chains of pointers (offset -> offset -> offset...).
+
+    ``values`` is the ``dword_values(data)`` table, if the caller already has it.
+    """
+    data_len = len(data)
+    if values is None:
+        values = dword_values(data)
+    valid_offsets = dict(compress(zip(range(0, len(values) * 4, 4), values), map(data_len.__gt__, values)))
+    
+    # A start whose first hop misses every valid offset can only give a
+    # length-1 chain; drop those with C-level map/compress before walking.
+    starts = compress(valid_offsets.items(), map(valid_offsets.__contains__, valid_offsets.values()))
     
+    # Short chains are cheapest to scan as a list; long ones get a visited set
+    use_set = max_chain_length > CHAIN_SET_THRESHOLD
     chains = []
-    for start_offset, dword in valid_offsets.items():
+    for start_offset, value in starts:
         chain = [start_offset]
-        current = dword['value_le']
+        visited = {start_offset} if use_set else chain
+        current = value
         
         for _ in range(max_chain_length - 1):
             if current in valid_offsets:
                 chain.append(current)
-                current = valid_offsets[current]['value_le']
-                if current in chain:  # Cycle detected
+                if use_set:
+                    visited.add(current)
+                current = valid_offsets[current]
+                if current in visited:  # Cycle detected
                     break
             else:
                 break
         
         if len(chain) >= 2:
-            chains.append({
-                'chain': [f'0x{o:08x}' for o in chain],
-                'length': len(chain),
-                'terminates_at': f'0x{chain[-1]:08x}',
-            })
+            chains.append(chain)
     
-    return sorted(chains, key=lambda x: -x['length'])[:50]
+    # Only the reported chains are formatted
+    longest = sorted(chains, key=lambda c: -len(c))[:50]
+    return [
+        {
+            'chain': [f'0x{o:08x}' for o in chain],
+            'length': len(chain),
+            'terminates_at': f'0x{chain[-1]:08x}',
+        }
+        for chain in longest
+    ]
 
 
 def analyze_repeating_structures(data: bytes, struct_size: int = 192) -> List[Dict]:
     """Identify repeating data structures."""
-    # Look for identical or similar blocks
-    blocks = defaultdict(list)
+    # Use first few bytes as signature; slice them straight from the file
+    # rather than copying each whole block first
+    sig_len = min(16, struct_size)
+    block_offsets = range(0, len(data) - struct_size, struct_size)
+    sigs = [data[i:i+sig_len] for i in block_offsets]
     
-    for i in range(0, len(data) - struct_size, struct_size):
-        block = data[i:i+struct_size]
-        # Use first few bytes as signature
-        sig = block[:16]
-        blocks[sig].append(i)
+    # Count identical signatures in C, then collect offsets only for the
+    # ones that actually repeat
+    counts = Counter(sigs)
+    offsets = {sig: [] for sig, count in counts.items() if count >= 3}
+    for i, sig in zip(block_offsets, sigs):
+        group = offsets.get(sig)
+        if group is not None and len(group) < 10:
+            group.append(i)
     
     repeating = []
-    for sig, offsets in blocks.items():
-        if len(offsets) >= 3:
-            repeating.append({
-                'signature': sig.hex(),
-                'count': len(offsets),
-                'offsets': [f'0x{o:08x}' for o in offsets[:10]],
-                'struct_size': struct_size,
-            })
+    for sig, group in offsets.items():
+        repeating.append({
+            'signature': sig.hex(),
+            'count': counts[sig],
+            'offsets': [f'0x{o:08x}' for o in group],
+            'struct_size': struct_size,
+        })
     
     return sorted(repeating, key=lambda x: -x['count'])[:20]
 
 
-def detect_vtable_patterns(data: bytes) -> List[Dict]:
-    """Detect possible vtable or function pointer tables."""
-    # Look for aligned sequences of pointers
-    patterns = []
+def detect_vtable_patterns(data: bytes, values: Optional[array] = None, limit: int = 20) -> List[Dict]:
+    """Detect possible vtable or function pointer tables.
+
+    ``values`` is the ``dword_values(data)`` table, if the caller already has it.
+    """
+    data_len = len(data)
+    if values is None:
+        values = dword_values(data)
+    # One flag byte per DWORD: 1 when it could point into the file
+    flags = bytes(map(range(1, data_len).__contains__, values))
+    # Candidate starts are the DWORD indexes below len(data) - 32
+    scan_end = len(range(0, data_len - 32, 4)) + 3
     
+    # Look for aligned sequences of pointers (at least 4 of up to 8)
+    patterns = []
     for alignment in [4, 8, 16]:
-        for start in range(0, len(data) - 32, alignment):
-            if start % alignment != 0:
+        stride = alignment // 4
+        k = flags.find(b'\x01\x01\x01\x01', 0, scan_end)
+        while k >= 0:
+            if k % stride:
+                k = flags.find(b'\x01\x01\x01\x01', k + stride - k % stride, scan_end)
                 continue
-            
-            # Try to read 8 consecutive pointers
-            try:
-                ptrs = []
-                for i in range(8):
-                    offset = start + i * 4
-                    if offset + 4 <= len(data):
-                        val = struct.unpack('<I', data[offset:offset+4])[0]
-                        if 0 < val < len(data):
-                            ptrs.append(val)
-                        else:
-                            break
-                
-                if len(ptrs) >= 4:
-                    # This might be a vtable
-                    patterns.append({
-                        'offset': start,
-                        'offset_hex': f'0x{start:08x}',
-                        'alignment': alignment,
-                        'pointer_count': len(ptrs),
-                        'pointers': [f'0x{p:08x}' for p in ptrs],
-                    })
-            except:
-                pass
+            run = flags.find(0, k, k + 8)
+            ptrs = values[k:k + 8] if run < 0 else values[k:run]
+            start = k * 4
+            # This might be a vtable
+            patterns.append({
+                'offset': start,
+                'offset_hex': f'0x{start:08x}',
+                'alignment': alignment,
+                'pointer_count': len(ptrs),
+                'pointers': [f'0x{p:08x}' for p in ptrs],
+            })
+            if len(patterns) >= limit:
+                return patterns
+            k = flags.find(b'\x01\x01\x01\x01', k + stride, scan_end)
     
-    return patterns[:20]
+    return patterns
 
 
-def main(argv: List[str]) -> int:
-    parser = argparse.ArgumentParser(
-        description='Extract metadata and objects from RWZ file'
-    )
-    parser.add_argument('rwz_file', help='Path to RWZ file')
-    parser.add_argument('--out', help='Output JSON file')
-    parser.add_argument('--out-md', help='Output Markdown report')
-    parser.add_argument('--dwords', action='store_true', help='Include all DWORD analysis')
-    
-    args = parser.parse_args(argv)
-    
-    rwz_path = Path(args.rwz_file)
-    if not rwz_path.exists():
-        print(f"Error: {rwz_path} not found", file=sys.stderr)
-        return 1
-    
-    with open(rwz_path, 'rb') as f:
-        data = f.read()
+def map_rwz(path: Path):
+    """Memory-map the RWZ file read-only (an empty file yields b'')."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b''
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def run_analyses(rwz_path: Path, include_dwords: bool = False) -> Dict:
+    """Run every metadata analysis on the RWZ file and collect the results."""
+    data = map_rwz(rwz_path)
     
     print(f"Analyzing {rwz_path} ({len(data)} bytes)", file=sys.stderr)
     
     # Run analyses
     print("  - Extracting DWORD values...", file=sys.stderr)
-    dwords = extract_dwords(data)
+    values = dword_values(data)
+    dword_summary = summarize_dwords(values, len(data))
     
     print("  - Identifying size fields...", file=sys.stderr)
-    sizes = identify_size_fields(data)
+    sizes = identify_size_fields(data, values)
     
     print("  - Finding pointer chains...", file=sys.stderr)
-    chains = find_pointer_chains(data)
+    chains = find_pointer_chains(data, values=values)
     
     print("  - Detecting repeating structures...", file=sys.stderr)
     structs = analyze_repeating_structures(data, 192)
     
     print("  - Finding vtable patterns...", file=sys.stderr)
-    vtables = detect_vtable_patterns(data)
+    vtables = detect_vtable_patterns(data, values)
     
     results = {
         'file': str(rwz_path),
         'size': len(data),
-        'dword_summary': {
-            'total_dwords': len(dwords),
-            'valid_offsets': sum(1 for d in dwords if d['is_valid_offset']),
-            'null_values': sum(1 for d in dwords if d['classification'] == 'null'),
-            'marker_1_count': sum(1 for d in dwords if d['classification'] == 'marker_1'),
-        },
+        'dword_summary': dword_summary,
         'size_fields': sizes,
         'pointer_chains': chains,
         'repeating_structures': structs,
         'vtable_patterns': vtables,
     }
+    if include_dwords:
+        results['dwords'] = list(extract_dwords(data))
+    return results
+
+
+def cache_path_for(rwz_path: Path) -> Path:
+    """Side-car cache file stored next to the RWZ file."""
+    return rwz_path.with_name(rwz_path.name + '.metadata-cache.json')
+
+
+def make_cache_key(rwz_path: Path, include_dwords: bool) -> Dict:
+    """Identify the RWZ file state (and options) a cached analysis belongs to."""
+    st = rwz_path.stat()
+    return {
+        'version': CACHE_VERSION,
+        'size': st.st_size,
+        'mtime_ns': st.st_mtime_ns,
+        'dwords': include_dwords,
+    }
+
+
+def load_cached_results(cache_file: Path, key: Dict) -> Optional[Dict]:
+    """Return cached results when they were computed for the same file state."""
+    try:
+        with open(cache_file, encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(cached, dict) or cached.get('key') != key:
+        return None
+    return cached.get('results')
+
+
+def save_cached_results(cache_file: Path, key: Dict, results: Dict) -> None:
+    try:
+        with open(cache_file, 'w', encoding='utf-8') as f:
+            json.dump({'key': key, 'results': results}, f)
+    except OSError as e:
+        print(f"Warning: could not write cache {cache_file}: {e}", file=sys.stderr)
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(
+        description='Extract metadata and objects from RWZ file'
+    )
+    parser.add_argument('rwz_file', help='Path to RWZ file')
+    parser.add_argument('--out', help='Output JSON file')
+    parser.add_argument('--out-md', help='Output Markdown report')
+    parser.add_argument('--dwords', action='store_true', help='Include all DWORD analysis')
+    parser.add_argument('--cache', action='store_true',
+                        help='Reuse/store results in a side-car cache next to the RWZ file')
+    
+    args = parser.parse_args(argv)
+    
+    rwz_path = Path(args.rwz_file)
+    if not rwz_path.exists():
+        print(f"Error: {rwz_path} not found", file=sys.stderr)
+        return 1
+    
+    results = None
+    cache_file = cache_path_for(rwz_path)
+    cache_key = make_cache_key(rwz_path, args.dwords)
+    if args.cache:
+        results = load_cached_results(cache_file, cache_key)
+        if results is not None:
+            print(f"Using cached analysis: {cache_file}", file=sys.stderr)
+    
+    if results is None:
+        results = run_analyses(rwz_path, args.dwords)
+        if args.cache:
+            save_cached_results(cache_file, cache_key, results)
+    
+    sizes = results['size_fields']
+    chains = results['pointer_chains']
+    structs = results['repeating_structures']
+    vtables = results['vtable_patterns']
     
     # Output JSON
     if args.out:
@@ -264,45 +389,46 @@ def main(argv: List[str]) -> int:
     # Output Markdown
     if args.out_md:
         md_path = Path(args.out_md)
-        with open(md_path, 'w') as f:
-            f.write(f"# RWZ Metadata & Object Analysis: {rwz_path.name}\n\n")
-            
-            # DWORD Summary
-            f.write("## DWORD Values Analysis\n")
-            f.write(f"- Total DWORD-aligned values: {results['dword_summary']['total_dwords']}\n")
-            f.write(f"- Valid file offsets: {results['dword_summary']['valid_offsets']}\n")
-            f.write(f"- Null values (0x00000000): {results['dword_summary']['null_values']}\n")
-            f.write(f"- Marker values (0x00000001): {results['dword_summary']['marker_1_count']}\n")
-            
-            # Size fields
-            if sizes:
-                f.write(f"\n## Identified Size Fields\n")
-                f.write(f"Found {len(sizes)} likely size field candidates:\n")
-                for size in sizes[:10]:
-                    f.write(f"- {size['field_offset_hex']}: value={size['value']} ")
-                    f.write(f"({size['match_type']})\n")
-                    f.write(f"  - Points to: {size['string_start']}\n")
-            
-            # Pointer chains
-            if chains:
-                f.write(f"\n## Pointer Chains\n")
-                f.write(f"Found {len(chains)} pointer chains (max length {max(c['length'] for c in chains)}):\n")
-                for chain in chains[:10]:
-                    f.write(f"- Chain (length {chain['length']}): {' → '.join(chain['chain'][:5])}\n")
-            
-            # Repeating structures
-            if structs:
-                f.write(f"\n## Repeating Structures (192-byte blocks)\n")
-                for struct in structs[:10]:
-                    f.write(f"- Pattern `{struct['signature'][:16]}...`: {struct['count']} occurrences\n")
-                    f.write(f"  - Offsets: {', '.join(struct['offsets'][:3])}\n")
-            
-            # VTables
-            if vtables:
-                f.write(f"\n## VTable Candidates\n")
-                for vtable in vtables[:10]:
-                    f.write(f"- {vtable['offset_hex']} (alignment {vtable['alignment']}): ")
-                    f.write(f"{vtable['pointer_count']} pointers\n")
+        buf = []
+        buf.append(f"# RWZ Metadata & Object Analysis: {rwz_path.name}\n\n")
+        
+        # DWORD Summary
+        buf.append("## DWORD Values Analysis\n")
+        buf.append(f"- Total DWORD-aligned values: {results['dword_summary']['total_dwords']}\n")
+        buf.append(f"- Valid file offsets: {results['dword_summary']['valid_offsets']}\n")
+        buf.append(f"- Null values (0x00000000): {results['dword_summary']['null_values']}\n")
+        buf.append(f"- Marker values (0x00000001): {results['dword_summary']['marker_1_count']}\n")
+        
+        # Size fields
+        if sizes:
+            buf.append(f"\n## Identified Size Fields\n")
+            buf.append(f"Found {len(sizes)} likely size field candidates:\n")
+            for size in sizes[:10]:
+                buf.append(f"- {size['field_offset_hex']}: value={size['value']} ")
+                buf.append(f"({size['match_type']})\n")
+                buf.append(f"  - Points to: {size['string_start']}\n")
+        
+        # Pointer chains
+        if chains:
+            buf.append(f"\n## Pointer Chains\n")
+            buf.append(f"Found {len(chains)} pointer chains (max length {max(c['length'] for c in chains)}):\n")
+            for chain in chains[:10]:
+                buf.append(f"- Chain (length {chain['length']}): {' → '.join(chain['chain'][:5])}\n")
+        
+        # Repeating structures
+        if structs:
+            buf.append(f"\n## Repeating Structures (192-byte blocks)\n")
+            for struct in structs[:10]:
+                buf.append(f"- Pattern `{struct['signature'][:16]}...`: {struct['count']} occurrences\n")
+                buf.append(f"  - Offsets: {', '.join(struct['offsets'][:3])}\n")
+        
+        # VTables
+        if vtables:
+            buf.append(f"\n## VTable Candidates\n")
+            for vtable in vtables[:10]:
+                buf.append(f"- {vtable['offset_hex']} (alignment {vtable['alignment']}): ")
+                buf.append(f"{vtable['pointer_count']} pointers\n")
+        md_path.write_text(''.join(buf), encoding='utf-8')
         
         print(f"Markdown output: {md_path}", file=sys.stderr)
     
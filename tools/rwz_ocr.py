@@ -1,14 +1,19 @@
 #!/usr/bin/env python3
 import argparse
 import json
+import os
 import re
 import shutil
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 
 
 EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+# Token separators "|" and "/" folded into one so str.split can do the work
+TOKEN_SEP_TABLE = str.maketrans("/", "|")
 
 
 def collect_images(path: Path) -> list[Path]:
@@ -40,13 +45,37 @@ def clean_lines(text: str, min_len: int) -> list[str]:
 def extract_tokens(lines: list[str], min_len: int) -> list[str]:
     tokens = []
     for line in lines:
-        for part in re.split(r"[|/]", line):
+        if len(line) < min_len:
+            continue
+        for part in line.translate(TOKEN_SEP_TABLE).split("|"):
             s = part.strip()
             if len(s) >= min_len:
                 tokens.append(s)
     return tokens
 
 
+def ocr_image(img: Path, lang: str, line_min: int, token_min: int) -> dict:
+    try:
+        text = run_tesseract(img, lang)
+    except Exception as exc:
+        return {
+            "file": str(img),
+            "error": str(exc),
+            "lines": [],
+            "tokens": [],
+            "emails": [],
+        }
+    lines = clean_lines(text, line_min)
+    tokens = extract_tokens(lines, token_min)
+    emails = sorted({e for line in lines for e in EMAIL_RE.findall(line)})
+    return {
+        "file": str(img),
+        "lines": lines,
+        "tokens": tokens,
+        "emails": emails,
+    }
+
+
 def main(argv: list[str]) -> int:
     ap = argparse.ArgumentParser(description="OCR Outlook rule screenshots to JSON")
     ap.add_argument("path", type=Path, help="image file or directory")
@@ -54,6 +83,7 @@ def main(argv: list[str]) -> int:
     ap.add_argument("--line-min", type=int, default=3, help="minimum cleaned line length")
     ap.add_argument("--token-min", type=int, default=3, help="minimum token length")
     ap.add_argument("--limit", type=int, default=0, help="limit number of images (0 = no limit)")
+    ap.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="parallel tesseract processes (1 = serial)")
     ap.add_argument("--out", type=Path, help="write output JSON to file (UTF-8)")
     args = ap.parse_args(argv)
 
@@ -68,32 +98,14 @@ def main(argv: list[str]) -> int:
         print("no images found", file=sys.stderr)
         return 1
 
-    payload = {"source": str(args.path), "images": []}
-    for img in images:
-        try:
-            text = run_tesseract(img, args.lang)
-        except Exception as exc:
-            payload["images"].append(
-                {
-                    "file": str(img),
-                    "error": str(exc),
-                    "lines": [],
-                    "tokens": [],
-                    "emails": [],
-                }
-            )
-            continue
-        lines = clean_lines(text, args.line_min)
-        tokens = extract_tokens(lines, args.token_min)
-        emails = sorted({e for line in lines for e in EMAIL_RE.findall(line)})
-        payload["images"].append(
-            {
-                "file": str(img),
-                "lines": lines,
-                "tokens": tokens,
-                "emails": emails,
-            }
-        )
+    work = partial(ocr_image, lang=args.lang, line_min=args.line_min, token_min=args.token_min)
+    if args.jobs > 1 and len(images) > 1:
+        # Each image is its own tesseract process; threads only wait on them.
+        with ThreadPoolExecutor(max_workers=args.jobs) as ex:
+            entries = list(ex.map(work, images))
+    else:
+        entries = [work(img) for img in images]
+    payload = {"source": str(args.path), "images": entries}
 
     out_text = json.dumps(payload, ensure_ascii=False, indent=2)
     if args.out:
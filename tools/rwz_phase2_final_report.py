@@ -9,287 +9,413 @@ Consolidates all Phase 2 analysis into actionable findings and recommendations.
 """
 
 import argparse
+import hashlib
 import json
+import logging
+import mmap
+import os
+import pickle
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from pathlib import Path
 from typing import Dict, List, Optional
 
+try:
+    import orjson
+except Exception:
+    orjson = None
 
-def load_json(path: Path) -> Optional[Dict]:
-    """Load JSON file."""
+logger = logging.getLogger(__name__)
+
+# Inputs at least this large are memory-mapped instead of read into a buffer
+MMAP_MIN_SIZE = 4096
+
+
+# Analysis outputs the report is built from, by short name
+REPORT_INPUTS = {
+    'block': 'block_structure_analysis.json',
+    'pointer': 'pointer_network.json',
+    'size': 'size_fields.json',
+    'gap': 'gap_details.json',
+    'integration': 'phase2_integration.json',
+}
+
+# Static report prose; only the task sections below interpolate loaded data
+HEADER_TEXT = """\
+# RWZ Binary Format Reverse Engineering - Phase 2 Final Report
+
+**Session:** GitHub Copilot Phase 2 Deep Analysis
+**Date:** 2026-02-03
+**Input RWZ:** Provided at runtime (see run.ps1 -Rwz)
+
+## Executive Summary
+
+This Phase 2 analysis applies an integrated, multi-angle approach to reverse engineer
+the RWZ binary format through simultaneous investigation of:
+
+1. **Repeating block structures** (192-byte blocks)
+2. **Pointer networks and object graphs**
+3. **Size field-bounded regions** (implicit string containers)
+4. **Gap analysis** (identifying hidden data zones)
+
+### Coverage Achievement
+
+- **Data coverage:** 97.6% of file analyzed and classified
+- **Structures identified:** 452 repeating 192-byte blocks
+- **Pointers mapped:** 4,093 valid pointer references with 100 chains detected
+- **Size fields located:** 692 size-field patterns with 2,328 string extractions
+- **Gap analysis:** 175 gaps (2.4% of file, all null-filled)
+
+## Phase 2 Task Results
+
+### Task 1: 192-Byte Block Structure Analysis ✓ COMPLETE
+"""
+
+# Task 1 body (block_structure_analysis.json)
+BLOCK_SECTION_TMPL = """\
+- **Blocks found:** {block_count}
+- **Blocks analyzed (detail):** 10 representative samples
+- **Field boundaries detected:** 30
+- **Repeating patterns:** 20
+
+**Key Findings:**
+- Consistent 192-byte block structure throughout file
+- Internal field boundaries at regular intervals suggest structured data
+- UTF-16LE encoded strings detected within blocks
+- Metadata patterns (0x01 00 00 00 00 00 00 00) appear at specific offsets"""
+
+# Task 2 body (pointer_network.json)
+POINTER_SECTION_TMPL = """\
+- **Total pointers detected:** {total_pointers}
+- **Pointer chains:** 100 chains (max depth varies)
+- **Pointer clusters:** 162 clusters
+- **String pointers:** {string_pointers}
+- **Data pointers:** {data_pointers}
+
+**Key Findings:**
+- Pointer clustering suggests object-oriented data organization
+- String pointers comprise ~12% of all pointers
+- Pointer chains indicate nested or linked data structures
+- Cycle detection found in graph (potential linked lists)"""
+
+# Task 3 body (size_fields.json)
+SIZE_SECTION_TMPL = """\
+- **Size fields identified:** {size_fields_analyzed}
+- **String regions extracted:** {strings_extracted}
+- **Total string extractions:** {total_extractions}
+
+**Key Findings:**
+- Size fields reliably identify bounded string regions
+- UTF-8 and UTF-16 encodings both detected
+- Null-terminated string patterns identified
+- Regular spacing suggests consistent data structure layout"""
+
+# Task 4 body (gap_details.json)
+GAP_SECTION_TMPL = """\
+- **Total gaps found:** {total_gaps}
+- **Total gap size:** {total_gap_size} bytes ({gap_pct:.1f}% of file)
+- **Gap classification:** All pure null-filled regions
+
+**Key Findings:**
+- No hidden structured data in gaps
+- Gaps appear to be padding/alignment zones
+- Consistent null-filling pattern suggests intentional layout"""
+
+# Integrated findings, including the container diagram
+MIDDLE_TEXT = """\
+## Integrated Findings
+
+### Data Organization Model
+
+The RWZ file appears to use a hybrid data organization:
+
+```
+┌─────────────────────────────────────────────┐
+│       RWZ Container (86,842 bytes)          │
+├─────────────────────────────────────────────┤
+│  Header/Metadata (pointers to objects)      │ ← 4,093 pointers
+│  ┌────────────────────────────────────┐     │
+│  │  Object Pool                       │     │
+│  │  ┌──────────────────────────────┐  │     │
+│  │  │ 192-byte Block 1 (Metadata)  │  │     │ ← 452 blocks
+│  │  │ [DWORD pointers + size fields]   │     │
+│  │  └──────────────────────────────┘  │     │
+│  │  ┌──────────────────────────────┐  │     │
+│  │  │ String Data (size-bounded)   │  │     │ ← 692 size fields
+│  │  │ [UTF-8/UTF-16 strings]       │  │     │
+│  │  └──────────────────────────────┘  │     │
+│  └────────────────────────────────────┘     │
+│  Alignment/Padding Gaps (2.4%)          │ ← 175 null gaps
+└─────────────────────────────────────────────┘
+```
+"""
+
+# Recommendations, conclusion and appendix
+FOOTER_TEXT = """\
+## Recommendations for Phase 3
+
+### High Priority
+
+1. **Implement 192-byte block decoder**
+   - Use detected field boundaries as frame template
+   - Validate against OCR extracted rule values
+   - Map pointer references to string data
+
+2. **Build size field reference engine**
+   - Create mapping of all 692 size fields to extracted strings
+   - Identify field naming/categorization patterns
+   - Cross-validate against application behavior
+
+3. **Reconstruct object graph**
+   - Use 100 detected pointer chains to build object relationships
+   - Identify parent-child relationships
+   - Map to logical rule structure
+
+### Medium Priority
+
+4. **Validate with application hooking**
+   - Hook Outlook rule engine during import/export
+   - Compare reverse-engineered structure with runtime state
+   - Identify missing or incorrectly interpreted fields
+
+5. **Implement write functionality**
+   - Once read path is stable, implement serialization
+   - Test round-trip: parse → modify → serialize → import
+
+### Low Priority
+
+6. **Performance optimization**
+   - Profile parsing pipeline
+   - Implement caching for large RWZ files
+   - Consider lazy-loading of string data
+
+## Conclusion
+
+Phase 2 analysis has successfully:
+
+- ✓ Identified core data structure (192-byte blocks)
+- ✓ Mapped 4,093 pointer relationships
+- ✓ Located 692 size-bounded string regions
+- ✓ Analyzed all gaps and padding
+- ✓ Extracted and validated rule data against OCR baseline
+
+**Overall Coverage: 97.6% of file analyzed and classified**
+
+The RWZ format is now sufficiently understood to proceed with implementation
+of a complete decoder and editor. All major data structures have been identified,
+and their relationships mapped.
+
+## Appendix: Technical Metrics
+
+### File Statistics
+- Total size: 86,842 bytes
+- Data analyzed: 84,801 bytes (97.6%)
+- Data unanalyzed: 2,041 bytes (2.4% - all null padding)
+
+### Structure Counts
+- Repeating blocks: 452
+- Detected pointers: 4,093
+- Pointer chains: 100
+- Pointer clusters: 162
+- Size fields: 692
+- String extractions: 2,328
+- Field boundaries: 30
+- Repeating patterns: 20
+- Gaps: 175
+"""
+
+
+def parse_json_file(path: Path):
+    """Parse a JSON file; large files are memory-mapped straight into orjson."""
+    with open(path, 'rb') as f:
+        if orjson is None:
+            return json.loads(f.read())
+        if os.fstat(f.fileno()).st_size < MMAP_MIN_SIZE:
+            return orjson.loads(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            return orjson.loads(view)
+
+
+def cached_parse_json_file(path: Path, cache_dir: Optional[Path]):
+    """parse_json_file with a pickle memo in cache_dir, one entry per input file.
+
+    The entry is named after the resolved path and stores the input's
+    (mtime_ns, size), so a regenerated input overwrites its own stale entry.
+    """
+    if cache_dir is None:
+        return parse_json_file(path)
+    st = path.stat()
+    stamp = (st.st_mtime_ns, st.st_size)
+    key = str(path.resolve())
+    cache_file = cache_dir / (hashlib.sha1(key.encode('utf-8')).hexdigest() + '.pickle')
     try:
-        with open(path, 'r') as f:
-            return json.load(f)
-    except:
+        with open(cache_file, 'rb') as f:
+            cached_stamp, data = pickle.load(f)
+        if cached_stamp == stamp:
+            return data
+    except (OSError, EOFError, pickle.UnpicklingError, TypeError, ValueError):
+        # Missing, unreadable, corrupt or old-format entry: reparse below
+        pass
+    data = parse_json_file(path)
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix('.tmp')
+        with open(tmp_file, 'wb') as f:
+            pickle.dump((stamp, data), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        pass
+    return data
+
+
+def load_json(path: Path, cache_dir: Optional[Path] = None) -> Optional[Dict]:
+    """Load JSON file (orjson when installed, else stdlib json), memoized in cache_dir."""
+    try:
+        return cached_parse_json_file(path, cache_dir)
+    except (OSError, ValueError) as e:
+        # Missing inputs are expected (their report sections are skipped)
+        logger.debug("Could not load %s: %s", path, e)
         return None
 
 
-def generate_final_report(reports_dir: Path, output: Path) -> int:
+def generate_final_report(reports_dir: Path, output: Path, use_cache: bool = True) -> int:
     """Generate comprehensive final report."""
+    cache_dir = reports_dir / '.cache' if use_cache else None
     
-    # Load all analysis results
-    block_data = load_json(reports_dir / 'block_structure_analysis.json')
-    pointer_data = load_json(reports_dir / 'pointer_network.json')
-    size_data = load_json(reports_dir / 'size_fields.json')
-    gap_data = load_json(reports_dir / 'gap_details.json')
-    integration_data = load_json(reports_dir / 'phase2_integration.json')
-    
-    report_lines = []
-    
-    # Header
-    report_lines.append("# RWZ Binary Format Reverse Engineering - Phase 2 Final Report")
-    report_lines.append("")
-    report_lines.append("**Session:** GitHub Copilot Phase 2 Deep Analysis")
-    report_lines.append("**Date:** 2026-02-03")
-    report_lines.append("**Input RWZ:** Provided at runtime (see run.ps1 -Rwz)")
-    report_lines.append("")
+    # Load all analysis results; the files are independent, so read them concurrently
+    with ThreadPoolExecutor(max_workers=len(REPORT_INPUTS)) as ex:
+        futures = {name: ex.submit(load_json, reports_dir / fname, cache_dir)
+                   for name, fname in REPORT_INPUTS.items()}
+    loaded = {name: fut.result() for name, fut in futures.items()}
+    block_data = loaded['block']
+    pointer_data = loaded['pointer']
+    size_data = loaded['size']
+    gap_data = loaded['gap']
+    integration_data = loaded['integration']
     
-    # Executive Summary
-    report_lines.append("## Executive Summary")
-    report_lines.append("")
-    report_lines.append("This Phase 2 analysis applies an integrated, multi-angle approach to reverse engineer")
-    report_lines.append("the RWZ binary format through simultaneous investigation of:")
-    report_lines.append("")
-    report_lines.append("1. **Repeating block structures** (192-byte blocks)")
-    report_lines.append("2. **Pointer networks and object graphs**")
-    report_lines.append("3. **Size field-bounded regions** (implicit string containers)")
-    report_lines.append("4. **Gap analysis** (identifying hidden data zones)")
-    report_lines.append("")
-    report_lines.append("### Coverage Achievement")
-    report_lines.append("")
-    report_lines.append("- **Data coverage:** 97.6% of file analyzed and classified")
-    report_lines.append("- **Structures identified:** 452 repeating 192-byte blocks")
-    report_lines.append("- **Pointers mapped:** 4,093 valid pointer references with 100 chains detected")
-    report_lines.append("- **Size fields located:** 692 size-field patterns with 2,328 string extractions")
-    report_lines.append("- **Gap analysis:** 175 gaps (2.4% of file, all null-filled)")
-    report_lines.append("")
-    
-    # Phase 2 Task Results
-    report_lines.append("## Phase 2 Task Results")
-    report_lines.append("")
-    
-    # Task 1: Block Structure
-    report_lines.append("### Task 1: 192-Byte Block Structure Analysis ✓ COMPLETE")
-    report_lines.append("")
-    if block_data:
-        report_lines.append(f"- **Blocks found:** {block_data.get('block_count', 452)}")
-        report_lines.append(f"- **Blocks analyzed (detail):** 10 representative samples")
-        report_lines.append(f"- **Field boundaries detected:** 30")
-        report_lines.append(f"- **Repeating patterns:** 20")
-        report_lines.append("")
-        report_lines.append("**Key Findings:**")
-        report_lines.append("- Consistent 192-byte block structure throughout file")
-        report_lines.append("- Internal field boundaries at regular intervals suggest structured data")
-        report_lines.append("- UTF-16LE encoded strings detected within blocks")
-        report_lines.append("- Metadata patterns (0x01 00 00 00 00 00 00 00) appear at specific offsets")
-    report_lines.append("")
-    
-    # Task 2: Pointer Network
-    report_lines.append("### Task 2: Pointer Network Analysis & Graph ✓ COMPLETE")
-    report_lines.append("")
-    if pointer_data:
-        total = pointer_data.get('total_pointers', 0)
-        classification = pointer_data.get('classification', {})
-        report_lines.append(f"- **Total pointers detected:** {total}")
-        report_lines.append(f"- **Pointer chains:** 100 chains (max depth varies)")
-        report_lines.append(f"- **Pointer clusters:** 162 clusters")
-        report_lines.append(f"- **String pointers:** {classification.get('string_pointers', 0)}")
-        report_lines.append(f"- **Data pointers:** {classification.get('data_pointers', 0)}")
-        report_lines.append("")
-        report_lines.append("**Key Findings:**")
-        report_lines.append("- Pointer clustering suggests object-oriented data organization")
-        report_lines.append("- String pointers comprise ~12% of all pointers")
-        report_lines.append("- Pointer chains indicate nested or linked data structures")
-        report_lines.append("- Cycle detection found in graph (potential linked lists)")
-    report_lines.append("")
-    
-    # Task 3: Size Fields
-    report_lines.append("### Task 3: Size Field String Extraction ✓ COMPLETE")
-    report_lines.append("")
-    if size_data:
-        report_lines.append(f"- **Size fields identified:** {size_data.get('size_fields_analyzed', 692)}")
-        report_lines.append(f"- **String regions extracted:** {size_data.get('strings_extracted', 692)}")
-        report_lines.append(f"- **Total string extractions:** {sum(len(s.get('strings', [])) for s in size_data.get('sample_strings', []))}")
-        report_lines.append("")
-        report_lines.append("**Key Findings:**")
-        report_lines.append("- Size fields reliably identify bounded string regions")
-        report_lines.append("- UTF-8 and UTF-16 encodings both detected")
-        report_lines.append("- Null-terminated string patterns identified")
-        report_lines.append("- Regular spacing suggests consistent data structure layout")
-    report_lines.append("")
-    
-    # Task 4: Gap Analysis
-    report_lines.append("### Task 4: Gap Detail Inspection ✓ COMPLETE")
-    report_lines.append("")
-    if gap_data:
-        total_gaps = gap_data.get('total_gaps', 0)
-        total_gap_size = gap_data.get('total_gap_size', 0)
-        gap_pct = gap_data.get('gap_percentage', 0)
-        report_lines.append(f"- **Total gaps found:** {total_gaps}")
-        report_lines.append(f"- **Total gap size:** {total_gap_size} bytes ({gap_pct:.1f}% of file)")
-        report_lines.append(f"- **Gap classification:** All pure null-filled regions")
-        report_lines.append("")
-        report_lines.append("**Key Findings:**")
-        report_lines.append("- No hidden structured data in gaps")
-        report_lines.append("- Gaps appear to be padding/alignment zones")
-        report_lines.append("- Consistent null-filling pattern suggests intentional layout")
-    report_lines.append("")
-    
-    # Integrated Findings
-    report_lines.append("## Integrated Findings")
-    report_lines.append("")
-    report_lines.append("### Data Organization Model")
-    report_lines.append("")
-    report_lines.append("The RWZ file appears to use a hybrid data organization:")
-    report_lines.append("")
-    report_lines.append("```")
-    report_lines.append("┌─────────────────────────────────────────────┐")
-    report_lines.append("│       RWZ Container (86,842 bytes)          │")
-    report_lines.append("├─────────────────────────────────────────────┤")
-    report_lines.append("│  Header/Metadata (pointers to objects)      │ ← 4,093 pointers")
-    report_lines.append("│  ┌────────────────────────────────────┐     │")
-    report_lines.append("│  │  Object Pool                       │     │")
-    report_lines.append("│  │  ┌──────────────────────────────┐  │     │")
-    report_lines.append("│  │  │ 192-byte Block 1 (Metadata)  │  │     │ ← 452 blocks")
-    report_lines.append("│  │  │ [DWORD pointers + size fields]   │     │")
-    report_lines.append("│  │  └──────────────────────────────┘  │     │")
-    report_lines.append("│  │  ┌──────────────────────────────┐  │     │")
-    report_lines.append("│  │  │ String Data (size-bounded)   │  │     │ ← 692 size fields")
-    report_lines.append("│  │  │ [UTF-8/UTF-16 strings]       │  │     │")
-    report_lines.append("│  │  └──────────────────────────────┘  │     │")
-    report_lines.append("│  └────────────────────────────────────┘     │")
-    report_lines.append("│  Alignment/Padding Gaps (2.4%)          │ ← 175 null gaps")
-    report_lines.append("└─────────────────────────────────────────────┘")
-    report_lines.append("```")
-    report_lines.append("")
-    
-    # Extracted Rules
-    report_lines.append("### Extracted Rules from Analysis")
-    report_lines.append("")
-    if integration_data and 'sample_rules' in integration_data:
-        rules = integration_data.get('sample_rules', [])[:30]
-        for i, rule in enumerate(rules, 1):
-            text = rule.get('value', '')[:100]
-            source = rule.get('source', 'unknown')
-            report_lines.append(f"{i}. `{text}` (via {source})")
-    report_lines.append("")
-    
-    # Validation Results
-    report_lines.append("### Validation Against OCR Baseline")
-    report_lines.append("")
-    if integration_data and 'validation' in integration_data:
-        val = integration_data.get('validation', {})
-        total = val.get('total_rules', 0)
-        validated = val.get('validated', 0)
-        not_found = val.get('not_found_in_ocr', 0)
-        pct = (validated / total * 100) if total > 0 else 0
-        report_lines.append(f"- **Total rules extracted:** {total}")
-        report_lines.append(f"- **Matched with OCR:** {validated} ({pct:.1f}%)")
-        report_lines.append(f"- **Not in OCR baseline:** {not_found}")
-        report_lines.append("")
-        if val.get('matches'):
-            report_lines.append("**Sample validated matches:**")
-            for match in val.get('matches', [])[:5]:
-                report_lines.append(f"- {match}")
-    report_lines.append("")
-    
-    # Recommendations
-    report_lines.append("## Recommendations for Phase 3")
-    report_lines.append("")
-    report_lines.append("### High Priority")
-    report_lines.append("")
-    report_lines.append("1. **Implement 192-byte block decoder**")
-    report_lines.append("   - Use detected field boundaries as frame template")
-    report_lines.append("   - Validate against OCR extracted rule values")
-    report_lines.append("   - Map pointer references to string data")
-    report_lines.append("")
-    report_lines.append("2. **Build size field reference engine**")
-    report_lines.append("   - Create mapping of all 692 size fields to extracted strings")
-    report_lines.append("   - Identify field naming/categorization patterns")
-    report_lines.append("   - Cross-validate against application behavior")
-    report_lines.append("")
-    report_lines.append("3. **Reconstruct object graph**")
-    report_lines.append("   - Use 100 detected pointer chains to build object relationships")
-    report_lines.append("   - Identify parent-child relationships")
-    report_lines.append("   - Map to logical rule structure")
-    report_lines.append("")
-    report_lines.append("### Medium Priority")
-    report_lines.append("")
-    report_lines.append("4. **Validate with application hooking**")
-    report_lines.append("   - Hook Outlook rule engine during import/export")
-    report_lines.append("   - Compare reverse-engineered structure with runtime state")
-    report_lines.append("   - Identify missing or incorrectly interpreted fields")
-    report_lines.append("")
-    report_lines.append("5. **Implement write functionality**")
-    report_lines.append("   - Once read path is stable, implement serialization")
-    report_lines.append("   - Test round-trip: parse → modify → serialize → import")
-    report_lines.append("")
-    report_lines.append("### Low Priority")
-    report_lines.append("")
-    report_lines.append("6. **Performance optimization**")
-    report_lines.append("   - Profile parsing pipeline")
-    report_lines.append("   - Implement caching for large RWZ files")
-    report_lines.append("   - Consider lazy-loading of string data")
-    report_lines.append("")
-    
-    # Conclusion
-    report_lines.append("## Conclusion")
-    report_lines.append("")
-    report_lines.append("Phase 2 analysis has successfully:")
-    report_lines.append("")
-    report_lines.append("- ✓ Identified core data structure (192-byte blocks)")
-    report_lines.append("- ✓ Mapped 4,093 pointer relationships")
-    report_lines.append("- ✓ Located 692 size-bounded string regions")
-    report_lines.append("- ✓ Analyzed all gaps and padding")
-    report_lines.append("- ✓ Extracted and validated rule data against OCR baseline")
-    report_lines.append("")
-    report_lines.append("**Overall Coverage: 97.6% of file analyzed and classified**")
-    report_lines.append("")
-    report_lines.append("The RWZ format is now sufficiently understood to proceed with implementation")
-    report_lines.append("of a complete decoder and editor. All major data structures have been identified,")
-    report_lines.append("and their relationships mapped.")
-    report_lines.append("")
-    
-    # Appendix: Technical Metrics
-    report_lines.append("## Appendix: Technical Metrics")
-    report_lines.append("")
-    report_lines.append("### File Statistics")
-    report_lines.append("- Total size: 86,842 bytes")
-    report_lines.append("- Data analyzed: 84,801 bytes (97.6%)")
-    report_lines.append("- Data unanalyzed: 2,041 bytes (2.4% - all null padding)")
-    report_lines.append("")
-    report_lines.append("### Structure Counts")
-    report_lines.append("- Repeating blocks: 452")
-    report_lines.append("- Detected pointers: 4,093")
-    report_lines.append("- Pointer chains: 100")
-    report_lines.append("- Pointer clusters: 162")
-    report_lines.append("- Size fields: 692")
-    report_lines.append("- String extractions: 2,328")
-    report_lines.append("- Field boundaries: 30")
-    report_lines.append("- Repeating patterns: 20")
-    report_lines.append("- Gaps: 175")
-    report_lines.append("")
+    # Stream the report to a temporary file next to the output; emit() writes
+    # the same newline-joined text the old list + '\n'.join produced
+    line_count = 0
+    tmp_output = output.with_name(output.name + '.tmp')
+    try:
+        with open(tmp_output, 'w', encoding='utf-8', buffering=1 << 16) as f:
+            write = f.write
+        
+            def emit(text: str) -> None:
+                nonlocal line_count
+                if line_count:
+                    write('\n')
+                write(text)
+                line_count += text.count('\n') + 1
+        
+            emit(HEADER_TEXT)
+            if block_data:
+                emit(BLOCK_SECTION_TMPL.format(block_count=block_data.get('block_count', 452)))
+            emit("")
+        
+            # Task 2: Pointer Network
+            emit("### Task 2: Pointer Network Analysis & Graph ✓ COMPLETE")
+            emit("")
+            if pointer_data:
+                classification = pointer_data.get('classification', {})
+                emit(POINTER_SECTION_TMPL.format(
+                    total_pointers=pointer_data.get('total_pointers', 0),
+                    string_pointers=classification.get('string_pointers', 0),
+                    data_pointers=classification.get('data_pointers', 0),
+                ))
+            emit("")
+        
+            # Task 3: Size Fields
+            emit("### Task 3: Size Field String Extraction ✓ COMPLETE")
+            emit("")
+            if size_data:
+                emit(SIZE_SECTION_TMPL.format(
+                    size_fields_analyzed=size_data.get('size_fields_analyzed', 692),
+                    strings_extracted=size_data.get('strings_extracted', 692),
+                    total_extractions=sum(len(s.get('strings', [])) for s in size_data.get('sample_strings', [])),
+                ))
+            emit("")
+        
+            # Task 4: Gap Analysis
+            emit("### Task 4: Gap Detail Inspection ✓ COMPLETE")
+            emit("")
+            if gap_data:
+                emit(GAP_SECTION_TMPL.format(
+                    total_gaps=gap_data.get('total_gaps', 0),
+                    total_gap_size=gap_data.get('total_gap_size', 0),
+                    gap_pct=gap_data.get('gap_percentage', 0),
+                ))
+            emit("")
+        
+            emit(MIDDLE_TEXT)
+        
+            # Extracted Rules
+            emit("### Extracted Rules from Analysis")
+            emit("")
+            if integration_data and 'sample_rules' in integration_data:
+                rules = islice(integration_data.get('sample_rules', ()), 30)
+                for i, rule in enumerate(rules, 1):
+                    text = rule.get('value', '')[:100]
+                    source = rule.get('source', 'unknown')
+                    emit(f"{i}. `{text}` (via {source})")
+            emit("")
+        
+            # Validation Results
+            emit("### Validation Against OCR Baseline")
+            emit("")
+            if integration_data and 'validation' in integration_data:
+                val = integration_data.get('validation', {})
+                total = val.get('total_rules', 0)
+                validated = val.get('validated', 0)
+                not_found = val.get('not_found_in_ocr', 0)
+                pct = (validated / total * 100) if total > 0 else 0
+                emit(f"- **Total rules extracted:** {total}")
+                emit(f"- **Matched with OCR:** {validated} ({pct:.1f}%)")
+                emit(f"- **Not in OCR baseline:** {not_found}")
+                emit("")
+                if val.get('matches'):
+                    emit("**Sample validated matches:**")
+                    for match in islice(val.get('matches', ()), 5):
+                        emit(f"- {match}")
+            emit("")
+        
+            emit(FOOTER_TEXT)
     
-    # Write report
-    with open(output, 'w') as f:
-        f.write('\n'.join(report_lines))
+        # Swap the finished report in, so a failed run never leaves a truncated file
+        os.replace(tmp_output, output)
+    except BaseException:
+        # ...nor a partial temp file next to the output
+        tmp_output.unlink(missing_ok=True)
+        raise
     
     print(f"Report written to {output}", file=sys.stderr)
-    print(f"Total lines: {len(report_lines)}", file=sys.stderr)
+    print(f"Total lines: {line_count}", file=sys.stderr)
     
     return 0
 
 
-def main(argv: List[str]) -> int:
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description='Generate Phase 2 final report')
-    parser.add_argument('--reports-dir', type=Path, default=Path.cwd() / 'reports',
-                       help='Reports directory')
-    parser.add_argument('--out', type=Path, default=Path.cwd() / 'reports' / 'PHASE2_FINAL_REPORT.md',
-                       help='Output file')
-    
-    args = parser.parse_args(argv)
-    return generate_final_report(args.reports_dir, args.out)
+    parser.add_argument('--reports-dir', type=Path,
+                       help='Reports directory (default: ./reports)')
+    parser.add_argument('--out', type=Path,
+                       help='Output file (default: ./reports/PHASE2_FINAL_REPORT.md)')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Do not use the parsed-JSON cache in <reports-dir>/.cache')
+    return parser
 
 
+# Built once at import so repeated main() calls only parse
+_PARSER = build_parser()
+
+
+def main(argv: List[str]) -> int:
+    args = _PARSER.parse_args(argv)
+    # Defaults follow the current directory at call time, not at import
+    reports_dir = args.reports_dir or Path.cwd() / 'reports'
+    output = args.out or Path.cwd() / 'reports' / 'PHASE2_FINAL_REPORT.md'
+    return generate_final_report(reports_dir, output, use_cache=not args.no_cache)
+
 if __name__ == '__main__':
     sys.exit(main(sys.argv[1:]))
@@ -14,23 +14,114 @@ This tool performs:
 """
 
 import argparse
+import hashlib
 import json
+import mmap
+import os
+import pickle
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from pathlib import Path
 from typing import List, Dict, Set, Optional, Tuple
 from collections import defaultdict
 
+try:
+    import orjson
+except Exception:
+    orjson = None
 
-def load_json_file(path: Path) -> Optional[Dict]:
-    """Load JSON file safely."""
+try:
+    import ijson
+except Exception:
+    ijson = None
+
+# Phase 2 outputs to integrate: short name -> (file name, progress label)
+PHASE2_INPUTS = {
+    'block': ('block_structure_analysis.json', 'block structure analysis'),
+    'pointer': ('pointer_network.json', 'pointer network analysis'),
+    'size': ('size_fields.json', 'size field analysis'),
+    'gap': ('gap_details.json', 'gap analysis'),
+}
+
+# Inputs at least this large are memory-mapped instead of read into a buffer
+MMAP_MIN_SIZE = 4096
+
+# Source tag of rules recovered from size-field strings
+SIZE_FIELD_SOURCE = sys.intern('size_field_extraction')
+
+# Matched / unmatched rule texts kept in the validation results (the first N)
+VALIDATION_SAMPLE_LIMIT = 50
+
+# Shared read-only default for missing sub-dicts (avoids a fresh {} per lookup)
+_EMPTY: Dict = {}
+
+
+def parse_json_file(path: Path):
+    """Parse a JSON file; large files are memory-mapped straight into orjson."""
+    with open(path, 'rb') as f:
+        if orjson is None:
+            return json.loads(f.read())
+        if os.fstat(f.fileno()).st_size < MMAP_MIN_SIZE:
+            return orjson.loads(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            return orjson.loads(view)
+
+
+def cached_parse_json_file(path: Path, cache_dir: Optional[Path]):
+    """parse_json_file with a pickle memo in cache_dir, one entry per input file.
+
+    The entry is named after the resolved path and stores the input's
+    (mtime_ns, size), so a regenerated input overwrites its own stale entry.
+    """
+    if cache_dir is None:
+        return parse_json_file(path)
+    st = path.stat()
+    stamp = (st.st_mtime_ns, st.st_size)
+    key = str(path.resolve())
+    cache_file = cache_dir / (hashlib.sha1(key.encode('utf-8')).hexdigest() + '.pickle')
     try:
-        with open(path, 'r') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"Warning: Could not load {path}: {e}", file=sys.stderr)
+        with open(cache_file, 'rb') as f:
+            cached_stamp, data = pickle.load(f)
+        if cached_stamp == stamp:
+            return data
+    except (OSError, EOFError, pickle.UnpicklingError, TypeError, ValueError):
+        # Missing, unreadable, corrupt or old-format entry: reparse below
+        pass
+    data = parse_json_file(path)
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix('.tmp')
+        with open(tmp_file, 'wb') as f:
+            pickle.dump((stamp, data), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        pass
+    return data
+
+
+def load_json_file(path: Path, cache_dir: Optional[Path] = None) -> Optional[Dict]:
+    """Load JSON file safely (orjson when installed, else stdlib json).
+
+    With ``cache_dir``, parsed results are memoized there across runs.
+    """
+    try:
+        return cached_parse_json_file(path, cache_dir)
+    except (OSError, ValueError) as e:
+        # One write call, so warnings from concurrent loads do not interleave
+        sys.stderr.write(f"Warning: Could not load {path}: {e}\n")
         return None
 
 
+def write_json(path: Path, payload: Dict) -> None:
+    """Write payload as indented JSON (orjson when installed, else stdlib)."""
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS, default=str))
+        return
+    with open(path, 'w') as f:
+        json.dump(payload, f, indent=2, default=str)
+
+
 def integrate_block_structure(block_data: Dict) -> Dict:
     """Extract key findings from block structure analysis."""
     if not block_data:
@@ -49,26 +140,34 @@ def integrate_pointer_network(pointer_data: Dict) -> Dict:
     if not pointer_data:
         return {}
     
-    classification = pointer_data.get('classification', {})
+    classification = pointer_data.get('classification') or _EMPTY
+    regions = pointer_data.get('regions') or _EMPTY
     
     return {
         'total_pointers': pointer_data.get('total_pointers', 0),
-        'chains_detected': len(pointer_data.get('chains', [])),
-        'clusters_found': len(pointer_data.get('regions', {}).get('clusters', [])),
+        'chains_detected': len(pointer_data.get('chains') or ()),
+        'clusters_found': len(regions.get('clusters') or ()),
         'string_pointers': classification.get('string_pointers', 0),
         'data_pointers': classification.get('data_pointers', 0),
     }
 
 
-def integrate_size_fields(size_data: Dict) -> Dict:
-    """Extract key findings from size field analysis."""
+def integrate_size_fields(size_data: Dict, total_extractions: Optional[int] = None) -> Dict:
+    """Extract key findings from size field analysis.
+
+    ``total_extractions`` may be passed in from walk_size_strings to avoid
+    walking sample_strings a second time.
+    """
     if not size_data:
         return {}
     
+    if total_extractions is None:
+        total_extractions = sum(len(s['strings']) for s in size_data.get('sample_strings', ()) if 'strings' in s)
+    
     return {
         'size_fields_found': size_data.get('size_fields_analyzed', 0),
         'strings_extracted': size_data.get('strings_extracted', 0),
-        'total_extractions': sum(len(s.get('strings', [])) for s in size_data.get('sample_strings', [])),
+        'total_extractions': total_extractions,
     }
 
 
@@ -77,85 +176,128 @@ def integrate_gap_analysis(gap_data: Dict) -> Dict:
     if not gap_data:
         return {}
     
+    classification = gap_data.get('classification') or _EMPTY
+    
     return {
         'total_gaps': gap_data.get('total_gaps', 0),
         'gap_size_bytes': gap_data.get('total_gap_size', 0),
         'gap_percentage': gap_data.get('gap_percentage', 0),
-        'pure_null_gaps': gap_data.get('classification', {}).get('pure_null', 0),
-        'sparse_gaps': gap_data.get('classification', {}).get('sparse', 0),
-        'structured_gaps': gap_data.get('classification', {}).get('structured', 0),
+        'pure_null_gaps': classification.get('pure_null', 0),
+        'sparse_gaps': classification.get('sparse', 0),
+        'structured_gaps': classification.get('structured', 0),
     }
 
 
-def extract_rules_from_analysis(block_data: Dict, pointer_data: Dict, 
-                                size_data: Dict) -> List[Dict]:
-    """Attempt to extract rules from integrated analysis."""
+def walk_size_strings(size_data: Dict) -> Tuple[int, List[Tuple[Dict, str]]]:
+    """Walk size_data['sample_strings'] once for integration and rule extraction.
+
+    Returns the total number of extracted strings and the unique rules
+    from the first 50 items, each paired with its lowercased text so
+    validation does not re-lowercase.
+    """
+    total_extractions = 0
     rules = []
+    if not size_data:
+        return total_extractions, rules
     
-    # Extract from size fields and strings
-    if size_data and 'sample_strings' in size_data:
-        for item in size_data.get('sample_strings', [])[:50]:
-            for string in item.get('strings', []):
-                text = string.get('text', '').strip()
-                if text and len(text) > 2:
-                    rules.append({
-                        'source': 'size_field_extraction',
-                        'value': text,
-                        'encoding': string.get('encoding', 'unknown'),
-                        'size_offset': item.get('size_offset_hex', ''),
-                        'confidence': 0.6,
-                    })
-    
-    # Deduplicate
     seen = set()
-    unique_rules = []
-    for rule in rules:
-        key = (rule['source'], rule['value'])
-        if key not in seen:
-            seen.add(key)
-            unique_rules.append(rule)
+    for index, item in enumerate(size_data.get('sample_strings', ())):
+        strings = item.get('strings', ())
+        total_extractions += len(strings)
+        if index >= 50:
+            continue
+        
+        # Extract from size fields and strings, deduplicating as we go
+        for string in strings:
+            text = string.get('text', '').strip()
+            if text and len(text) > 2:
+                # Every rule here has the same source, so the text alone is the dedup key
+                if text in seen:
+                    continue
+                seen.add(text)
+                encoding = string.get('encoding', 'unknown')
+                if isinstance(encoding, str):
+                    # Parsed JSON gives each rule its own copy; share one per encoding
+                    encoding = sys.intern(encoding)
+                rules.append(({
+                    'source': SIZE_FIELD_SOURCE,
+                    'value': text,
+                    'encoding': encoding,
+                    'size_offset': item.get('size_offset_hex', ''),
+                    'confidence': 0.6,
+                }, text.lower()))
+    
+    return total_extractions, rules
+
+
+def stream_ocr_texts(ocr_path: Path) -> Optional[Set[str]]:
+    """Collect lowercased results[*].text with ijson, without loading the whole OCR JSON.
+
+    Returns None when ijson is not installed or cannot parse the file, so the
+    caller falls back to a full json.load.
+    """
+    if ijson is None:
+        return None
+    try:
+        with open(ocr_path, 'rb') as f:
+            return {text.lower() for text in ijson.items(f, 'results.item.text')}
+    except ijson.JSONError:
+        return None
+
+
+def load_ocr_texts(ocr_path: Optional[Path]) -> Tuple[Optional[Set[str]], str]:
+    """Load the lowercased OCR texts; returns (texts or None, validation status)."""
+    if not ocr_path or not ocr_path.exists():
+        return None, 'OCR data not found'
     
-    return unique_rules
+    try:
+        ocr_texts = stream_ocr_texts(ocr_path)
+        if ocr_texts is None:
+            with open(ocr_path, 'r') as f:
+                ocr_data = json.load(f)
+            
+            ocr_texts = set()
+            if isinstance(ocr_data, dict) and 'results' in ocr_data:
+                for result in ocr_data.get('results', []):
+                    if 'text' in result:
+                        ocr_texts.add(result['text'].lower())
+    except Exception as e:
+        return None, f'Error: {e}'
+    
+    return ocr_texts, 'Validation complete'
 
 
-def validate_against_ocr(rules: List[Dict], ocr_path: Optional[Path]) -> Dict:
-    """Validate extracted rules against OCR data."""
+def validate_rules(extracted: List[Tuple[Dict, str]],
+                   ocr_path: Optional[Path]) -> Tuple[List[Dict], Dict]:
+    """Collect extracted rules and validate them against OCR data in a single pass."""
+    ocr_texts, status = load_ocr_texts(ocr_path)
     validation = {
-        'total_rules': len(rules),
+        'total_rules': 0,
         'validated': 0,
         'not_found_in_ocr': 0,
         'matches': [],
         'mismatches': [],
     }
+    matches = validation['matches']
+    mismatches = validation['mismatches']
     
-    if not ocr_path or not ocr_path.exists():
-        validation['status'] = 'OCR data not found'
-        return validation
-    
-    try:
-        with open(ocr_path, 'r') as f:
-            ocr_data = json.load(f)
-        
-        ocr_texts = set()
-        if isinstance(ocr_data, dict) and 'results' in ocr_data:
-            for result in ocr_data.get('results', []):
-                if 'text' in result:
-                    ocr_texts.add(result['text'].lower())
-        
-        for rule in rules:
-            rule_text = rule.get('value', '').lower()
-            if rule_text in ocr_texts:
-                validation['validated'] += 1
-                validation['matches'].append(rule_text[:50])
-            else:
-                validation['not_found_in_ocr'] += 1
-                validation['mismatches'].append(rule_text[:50])
-        
-        validation['status'] = 'Validation complete'
-    except Exception as e:
-        validation['status'] = f'Error: {e}'
-    
-    return validation
+    rules = []
+    for rule, rule_text in extracted:
+        rules.append(rule)
+        if ocr_texts is None:
+            continue
+        if rule_text in ocr_texts:
+            validation['validated'] += 1
+            if len(matches) < VALIDATION_SAMPLE_LIMIT:
+                matches.append(rule_text[:50])
+        else:
+            validation['not_found_in_ocr'] += 1
+            if len(mismatches) < VALIDATION_SAMPLE_LIMIT:
+                mismatches.append(rule_text[:50])
+    
+    validation['total_rules'] = len(rules)
+    validation['status'] = status
+    return rules, validation
 
 
 def generate_comprehensive_report(integration: Dict, rules: List[Dict], 
@@ -203,7 +345,7 @@ def generate_comprehensive_report(integration: Dict, rules: List[Dict],
     # Extracted rules
     report.append(f"## Extracted Rules ({len(rules)} total)")
     report.append("")
-    for i, rule in enumerate(rules[:20], 1):
+    for i, rule in enumerate(islice(rules, 20), 1):
         report.append(f"{i}. {rule.get('value', '')[:80]}")
     if len(rules) > 20:
         report.append(f"... and {len(rules) - 20} more")
@@ -214,7 +356,7 @@ def generate_comprehensive_report(integration: Dict, rules: List[Dict],
     report.append(f"- Rules validated: {validation.get('validated', 0)}")
     report.append(f"- Not found in OCR: {validation.get('not_found_in_ocr', 0)}")
     if validation.get('matches'):
-        report.append(f"- Sample matches: {', '.join(validation['matches'][:3])}")
+        report.append(f"- Sample matches: {', '.join(islice(validation['matches'], 3))}")
     report.append("")
     
     # Next steps
@@ -228,12 +370,12 @@ def generate_comprehensive_report(integration: Dict, rules: List[Dict],
     return "\n".join(report)
 
 
-def main(argv: List[str]) -> int:
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         description='Integrate and validate Phase 2 analysis'
     )
-    parser.add_argument('--workspace', type=Path, default=Path.cwd(),
-                       help='Workspace root directory')
+    parser.add_argument('--workspace', type=Path,
+                       help='Workspace root directory (default: current directory)')
     parser.add_argument('--reports-dir', type=Path,
                        help='Reports directory (auto-detect if not specified)')
     parser.add_argument('--ocr-file', type=Path,
@@ -242,46 +384,55 @@ def main(argv: List[str]) -> int:
                        help='Output JSON file')
     parser.add_argument('--out-md', type=Path,
                        help='Output Markdown file')
-    
-    args = parser.parse_args(argv)
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Do not use the parsed-JSON cache in <reports-dir>/.cache')
+    return parser
+
+
+# Built once at import so repeated main() calls only parse
+_PARSER = build_parser()
+
+
+def main(argv: List[str]) -> int:
+    args = _PARSER.parse_args(argv)
+    workspace = args.workspace or Path.cwd()
     
     # Auto-detect reports directory
-    reports_dir = args.reports_dir or args.workspace / 'reports'
+    reports_dir = args.reports_dir or workspace / 'reports'
     if not reports_dir.exists():
         print(f"Error: Reports directory not found: {reports_dir}", file=sys.stderr)
         return 1
     
     print(f"Loading Phase 2 analysis results from {reports_dir}", file=sys.stderr)
-    
-    # Load all Phase 2 outputs
-    print("  - Loading block structure analysis...", file=sys.stderr)
-    block_data = load_json_file(reports_dir / 'block_structure_analysis.json')
-    
-    print("  - Loading pointer network analysis...", file=sys.stderr)
-    pointer_data = load_json_file(reports_dir / 'pointer_network.json')
-    
-    print("  - Loading size field analysis...", file=sys.stderr)
-    size_data = load_json_file(reports_dir / 'size_fields.json')
-    
-    print("  - Loading gap analysis...", file=sys.stderr)
-    gap_data = load_json_file(reports_dir / 'gap_details.json')
-    
-    # Integrate findings
+    cache_dir = None if args.no_cache else reports_dir / '.cache'
+    
+    # Load all Phase 2 outputs; the files are independent, so read them concurrently
+    for fname, label in PHASE2_INPUTS.values():
+        print(f"  - Loading {label}...", file=sys.stderr)
+    with ThreadPoolExecutor(max_workers=len(PHASE2_INPUTS)) as ex:
+        futures = {name: ex.submit(load_json_file, reports_dir / fname, cache_dir)
+                   for name, (fname, label) in PHASE2_INPUTS.items()}
+    loaded = {name: fut.result() for name, fut in futures.items()}
+    block_data = loaded['block']
+    pointer_data = loaded['pointer']
+    size_data = loaded['size']
+    gap_data = loaded['gap']
+    
+    # Integrate findings; sample_strings is walked once for both the size
+    # field summary and rule extraction
     print("  - Integrating findings...", file=sys.stderr)
+    total_extractions, extracted = walk_size_strings(size_data)
     integration = {
         'block_structure': integrate_block_structure(block_data),
         'pointer_network': integrate_pointer_network(pointer_data),
-        'size_fields': integrate_size_fields(size_data),
+        'size_fields': integrate_size_fields(size_data, total_extractions),
         'gap_analysis': integrate_gap_analysis(gap_data),
     }
     
-    # Extract rules
+    # Extract rules and validate them against OCR in one pass
     print("  - Extracting rules...", file=sys.stderr)
-    rules = extract_rules_from_analysis(block_data, pointer_data, size_data)
-    
-    # Validate
     print("  - Validating against OCR...", file=sys.stderr)
-    validation = validate_against_ocr(rules, args.ocr_file)
+    rules, validation = validate_rules(extracted, args.ocr_file)
     
     # Generate report
     report_md = generate_comprehensive_report(integration, rules, validation)
@@ -297,8 +448,7 @@ def main(argv: List[str]) -> int:
     
     # Output JSON
     if args.out:
-        with open(args.out, 'w') as f:
-            json.dump(results, f, indent=2, default=str)
+        write_json(args.out, results)
         print(f"JSON output: {args.out}", file=sys.stderr)
     
     # Output Markdown
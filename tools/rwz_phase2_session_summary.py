@@ -9,97 +9,104 @@ import argparse
 import json
 import sys
 from pathlib import Path
-
-
-def build_summary() -> dict:
-    return {
-        'phase': 2,
-        'session_status': 'COMPLETE',
-        'timestamp': '2026-02-03',
-
-        'tools_created': [
-            'rwz_block_structure_analyzer.py - 192-byte block deep analysis',
-            'rwz_pointer_network.py - Pointer graph and chain detection',
-            'rwz_size_fields.py - Size field string extraction',
-            'rwz_gap_details.py - Gap analysis and classification',
-            'rwz_phase2_integration.py - Unified validation pipeline',
-            'rwz_phase2_final_report.py - Comprehensive final report',
-        ],
-
-        'analysis_results': {
-            'block_structure': {
-                'blocks_found': 452,
-                'blocks_analyzed_in_detail': 10,
-                'field_boundaries': 30,
-                'repeating_patterns': 20,
-                'output_files': ['block_structure_analysis.json', 'block_structure_analysis.md']
-            },
-            'pointer_network': {
-                'total_pointers': 4093,
-                'pointer_chains': 100,
-                'pointer_clusters': 162,
-                'string_pointers': 513,
-                'data_pointers': 380,
-                'output_files': ['pointer_network.json', 'pointer_network.md']
-            },
-            'size_fields': {
-                'size_fields_found': 692,
-                'strings_extracted': 692,
-                'total_string_extractions': 2328,
-                'output_files': ['size_fields.json', 'size_fields.md']
-            },
-            'gap_analysis': {
-                'total_gaps': 175,
-                'gap_size_bytes': 2041,
-                'gap_percentage': 2.35,
-                'pure_null_gaps': 175,
-                'output_files': ['gap_details.json', 'gap_details.md']
-            }
+from types import MappingProxyType
+
+
+# Every field is static, so the summary is built once at import time and
+# handed out as a read-only view.
+_SUMMARY = {
+    'phase': 2,
+    'session_status': 'COMPLETE',
+    'timestamp': '2026-02-03',
+
+    'tools_created': [
+        'rwz_block_structure_analyzer.py - 192-byte block deep analysis',
+        'rwz_pointer_network.py - Pointer graph and chain detection',
+        'rwz_size_fields.py - Size field string extraction',
+        'rwz_gap_details.py - Gap analysis and classification',
+        'rwz_phase2_integration.py - Unified validation pipeline',
+        'rwz_phase2_final_report.py - Comprehensive final report',
+    ],
+
+    'analysis_results': {
+        'block_structure': {
+            'blocks_found': 452,
+            'blocks_analyzed_in_detail': 10,
+            'field_boundaries': 30,
+            'repeating_patterns': 20,
+            'output_files': ['block_structure_analysis.json', 'block_structure_analysis.md']
         },
-
-        'integration_results': {
-            'rules_extracted': 66,
-            'rules_validated_against_ocr': 'completed',
-            'output_files': ['phase2_integration.json', 'phase2_integration.md']
+        'pointer_network': {
+            'total_pointers': 4093,
+            'pointer_chains': 100,
+            'pointer_clusters': 162,
+            'string_pointers': 513,
+            'data_pointers': 380,
+            'output_files': ['pointer_network.json', 'pointer_network.md']
         },
-
-        'coverage_metrics': {
-            'file_size_bytes': 86842,
-            'bytes_analyzed': 84801,
-            'coverage_percentage': 97.6,
-            'bytes_unanalyzed': 2041,
-            'unanalyzed_type': 'null_padding'
+        'size_fields': {
+            'size_fields_found': 692,
+            'strings_extracted': 692,
+            'total_string_extractions': 2328,
+            'output_files': ['size_fields.json', 'size_fields.md']
         },
-
-        'key_findings': [
-            'RWZ file uses hybrid object-oriented data organization',
-            '192-byte repeating blocks form core metadata structure',
-            '4,093 pointers reference string and data objects',
-            '692 size fields identify bounded string regions',
-            'All gaps are null-filled padding (no hidden data)',
-            'UTF-16LE and UTF-8 strings identified',
-            'Object graph structure with 100 pointer chains detected'
-        ],
-
-        'phase2_outputs': [
-            'PHASE2_FINAL_REPORT.md - Comprehensive analysis report',
-            'block_structure_analysis.json - Detailed block structure data',
-            'pointer_network.json - Complete pointer graph',
-            'size_fields.json - Size field and string data',
-            'gap_details.json - Gap classification and analysis',
-            'phase2_integration.json - Unified integration results'
-        ],
-
-        'next_phase_recommendations': [
-            'Implement 192-byte block decoder using detected field boundaries',
-            'Build complete object reconstruction from pointer graph',
-            'Create size field reference engine for string mapping',
-            'Validate findings against live application state',
-            'Implement read/write functionality for RWZ format',
-            'Create round-trip test suite (parse → modify → serialize)',
-            'Integrate with Outlook API for validation'
-        ]
-    }
+        'gap_analysis': {
+            'total_gaps': 175,
+            'gap_size_bytes': 2041,
+            'gap_percentage': 2.35,
+            'pure_null_gaps': 175,
+            'output_files': ['gap_details.json', 'gap_details.md']
+        }
+    },
+
+    'integration_results': {
+        'rules_extracted': 66,
+        'rules_validated_against_ocr': 'completed',
+        'output_files': ['phase2_integration.json', 'phase2_integration.md']
+    },
+
+    'coverage_metrics': {
+        'file_size_bytes': 86842,
+        'bytes_analyzed': 84801,
+        'coverage_percentage': 97.6,
+        'bytes_unanalyzed': 2041,
+        'unanalyzed_type': 'null_padding'
+    },
+
+    'key_findings': [
+        'RWZ file uses hybrid object-oriented data organization',
+        '192-byte repeating blocks form core metadata structure',
+        '4,093 pointers reference string and data objects',
+        '692 size fields identify bounded string regions',
+        'All gaps are null-filled padding (no hidden data)',
+        'UTF-16LE and UTF-8 strings identified',
+        'Object graph structure with 100 pointer chains detected'
+    ],
+
+    'phase2_outputs': [
+        'PHASE2_FINAL_REPORT.md - Comprehensive analysis report',
+        'block_structure_analysis.json - Detailed block structure data',
+        'pointer_network.json - Complete pointer graph',
+        'size_fields.json - Size field and string data',
+        'gap_details.json - Gap classification and analysis',
+        'phase2_integration.json - Unified integration results'
+    ],
+
+    'next_phase_recommendations': [
+        'Implement 192-byte block decoder using detected field boundaries',
+        'Build complete object reconstruction from pointer graph',
+        'Create size field reference engine for string mapping',
+        'Validate findings against live application state',
+        'Implement read/write functionality for RWZ format',
+        'Create round-trip test suite (parse → modify → serialize)',
+        'Integrate with Outlook API for validation'
+    ]
+}
+PHASE2_SUMMARY = MappingProxyType(_SUMMARY)
+
+
+def build_summary() -> MappingProxyType:
+    return PHASE2_SUMMARY
 
 
 def main(argv: list[str]) -> int:
@@ -117,7 +124,7 @@ def main(argv: list[str]) -> int:
 
     out_file.parent.mkdir(parents=True, exist_ok=True)
     with open(out_file, 'w', encoding='utf-8') as f:
-        json.dump(summary, f, indent=2)
+        json.dump(dict(summary), f, indent=2)
 
     print(f"Summary written to {out_file}")
 
@@ -16,40 +16,85 @@ This tool performs:
 
 import argparse
 import json
-import struct
+import mmap
+import operator
+import os
+import re
 import sys
+from array import array
+from itertools import compress, islice
 from pathlib import Path
 from typing import List, Dict, Set, Tuple, Optional
-from collections import defaultdict, deque
+from collections import Counter, defaultdict, deque
 
+try:
+    import orjson
+except Exception:
+    orjson = None
 
-def extract_all_pointers(data: bytes, min_val: int = 0, max_val: Optional[int] = None) -> List[Dict]:
-    """Extract all potential pointers from data."""
+
+# array typecode holding an unsigned 32-bit value on this platform
+DWORD_TYPECODE = 'I' if array('I').itemsize == 4 else 'L'
+
+# A single printable ASCII byte; searched in place, so it works on mmap'd data
+PRINTABLE_BYTE_RE = re.compile(rb'[\x20-\x7e]')
+
+# bytes.translate table flagging printable ASCII bytes with 0x01
+PRINTABLE_FLAGS = bytes(1 if 32 <= b <= 126 else 0 for b in range(256))
+
+
+def dword_values(data: bytes):
+    """Every 4-byte aligned little-endian DWORD of data, indexable by offset // 4.
+
+    On little-endian hosts this is a zero-copy memoryview over data (or the
+    mmap), shared by extraction and confidence scoring; big-endian hosts get
+    a byte-swapped array copy.
+    """
+    size = len(data) // 4 * 4
+    if sys.byteorder == 'little':
+        return memoryview(data)[:size].cast(DWORD_TYPECODE)
+    values = array(DWORD_TYPECODE, data[:size])
+    values.byteswap()
+    return values
+
+
+def extract_all_pointers(data: bytes, min_val: int = 0, max_val: Optional[int] = None) -> Dict[str, array]:
+    """Extract all potential pointers from data.
+
+    Pointers are returned as parallel columns rather than one dict each:
+    'offset', 'value' (the pointer's target) and 'confidence'. Hex strings
+    are formatted only where a pointer is actually reported.
+    """
     if max_val is None:
         max_val = len(data)
     
-    pointers = []
-    
-    for offset in range(0, len(data) - 3, 4):
-        val = struct.unpack('<I', data[offset:offset+4])[0]
-        
-        # Valid pointer criteria
-        if min_val <= val < max_val:
-            pointers.append({
-                'offset': offset,
-                'offset_hex': f'0x{offset:08x}',
-                'value': val,
-                'value_hex': f'0x{val:08x}',
-                'target': val,
-                'target_hex': f'0x{val:08x}',
-                'confidence': _estimate_pointer_confidence(data, offset, val),
-            })
+    # Valid pointer criteria: min_val <= val < max_val, tested in C over all DWORDs
+    values = dword_values(data)
+    in_range = map(range(min_val, max_val).__contains__, values)
+    indices = list(compress(range(len(values)), in_range))
     
-    return pointers
+    return {
+        'offset': array('q', [index * 4 for index in indices]),
+        'value': array(DWORD_TYPECODE, map(values.__getitem__, indices)),
+        'confidence': array('d', [_estimate_pointer_confidence(data, values, index, values[index])
+                                  for index in indices]),
+    }
+
+
+def filter_pointers(pointers: Dict[str, array], min_confidence: float) -> Dict[str, array]:
+    """Keep the pointers whose confidence is at least min_confidence."""
+    keep = [conf >= min_confidence for conf in pointers['confidence']]
+    return {name: array(column.typecode, compress(column, keep)) for name, column in pointers.items()}
+
 
+def _estimate_pointer_confidence(data: bytes, values, index: int, target: int) -> float:
+    """Estimate if a value is really a pointer.
 
-def _estimate_pointer_confidence(data: bytes, offset: int, target: int) -> float:
-    """Estimate if a value is really a pointer."""
+    ``values`` are the file's DWORDs (the candidate is ``values[index]``), so
+    every test below is an index or a C-level search rather than an unpack.
+    """
+    data_len = len(data)
+    offset = index * 4
     confidence = 0.0
     
     # Is it aligned?
@@ -57,164 +102,164 @@ def _estimate_pointer_confidence(data: bytes, offset: int, target: int) -> float
         confidence += 0.2
     
     # Does it point to valid ASCII/UTF-16?
-    if target + 16 < len(data):
-        region = data[target:target+16]
-        if any(32 <= b <= 126 for b in region):
+    if target + 16 < data_len:
+        if PRINTABLE_BYTE_RE.search(data, target, target + 16):
             confidence += 0.3
     
     # Is it preceded by a size field?
     if offset >= 4:
-        prev_val = struct.unpack('<I', data[offset-4:offset])[0]
+        prev_val = values[index - 1]
         if 100 < prev_val < 50000:  # Looks like a size
             confidence += 0.2
     
     # Multiple pointers in sequence?
-    if offset >= 8 and offset + 8 < len(data):
-        prev_val = struct.unpack('<I', data[offset-4:offset])[0]
-        next_val = struct.unpack('<I', data[offset+4:offset+8])[0]
-        if target > 100 and (100 <= prev_val < len(data)) and (100 <= next_val < len(data)):
+    if offset >= 8 and offset + 8 < data_len:
+        prev_val = values[index - 1]
+        next_val = values[index + 1]
+        if target > 100 and (100 <= prev_val < data_len) and (100 <= next_val < data_len):
             confidence += 0.3
     
     return min(1.0, confidence)
 
 
-def build_pointer_graph(pointers: List[Dict], data: bytes) -> Dict:
-    """Build a graph of pointer relationships."""
-    graph = {
-        'nodes': {},  # offset -> info
-        'edges': [],  # [from_offset, to_offset]
-        'cycles': [],
-        'chains': [],
+def build_pointer_graph(pointers: Dict[str, array], data: bytes) -> Dict:
+    """Build a graph of pointer relationships.
+
+    Every pointer is one node and one edge (offset -> target), so the edges
+    are kept as the pointer columns themselves; format_edges() renders
+    only the edges that are reported.
+    """
+    return {
+        'nodes_count': len(set(pointers['offset'])),
+        'edges_count': len(pointers['offset']),
+        'edges_from': pointers['offset'],
+        'edges_to': pointers['value'],
+        'edges_confidence': pointers['confidence'],
     }
-    
-    # Create nodes
-    for ptr in pointers:
-        graph['nodes'][ptr['offset']] = {
-            'offset_hex': ptr['offset_hex'],
-            'value': ptr['value'],
-            'target': ptr['target'],
-            'confidence': ptr['confidence'],
-            'in_degree': 0,
-            'out_degree': 0,
-        }
-    
-    # Create edges
-    for ptr in pointers:
-        target = ptr['target']
-        graph['edges'].append({
-            'from': ptr['offset'],
-            'from_hex': ptr['offset_hex'],
-            'to': target,
-            'to_hex': f'0x{target:08x}',
-            'confidence': ptr['confidence'],
-        })
-        graph['nodes'][ptr['offset']]['out_degree'] += 1
-        
-        # Check if target is also a pointer offset
-        if target in graph['nodes']:
-            graph['nodes'][target]['in_degree'] += 1
-    
-    return graph
 
 
-def detect_pointer_chains(pointers: List[Dict], data: bytes, max_depth: int = 10) -> List[Dict]:
+def format_edges(graph: Dict, limit: int) -> List[Dict]:
+    """Render the first ``limit`` graph edges as report dicts."""
+    columns = (graph['edges_from'], graph['edges_to'], graph['edges_confidence'])
+    return [{
+        'from': offset,
+        'from_hex': f'0x{offset:08x}',
+        'to': target,
+        'to_hex': f'0x{target:08x}',
+        'confidence': confidence,
+    } for offset, target, confidence in islice(zip(*columns), limit)]
+
+
+def detect_pointer_chains(pointers: Dict[str, array], data: bytes, max_depth: int = 10) -> List[Dict]:
     """Detect chains of pointers."""
     chains = []
-    visited = set()
+    offsets = pointers['offset']
+    values = pointers['value']
     
-    # Build offset -> pointer mapping
-    offset_to_ptr = {p['offset']: p for p in pointers}
+    # successor[i] is the index of the pointer stored at pointer i's target, or -1,
+    # so walks follow list indices instead of looking targets up again
+    index_of = {offset: i for i, offset in enumerate(offsets)}
+    successor = [index_of.get(value, -1) for value in values]
     
-    for start_ptr in pointers:
-        if start_ptr['offset'] in visited:
+    # Per-pointer flags: already part of an earlier chain / on the chain being walked
+    visited = bytearray(len(offsets))
+    on_chain = bytearray(len(offsets))
+    
+    for start in range(len(offsets)):
+        if visited[start]:
             continue
         
-        chain = [start_ptr['offset']]
-        current_target = start_ptr['value']
+        chain = [start]
+        on_chain[start] = 1
+        current = start
         depth = 0
         
         while depth < max_depth:
             # Is the target also a valid pointer offset?
-            if current_target in offset_to_ptr:
-                next_ptr = offset_to_ptr[current_target]
-                if next_ptr['offset'] in chain:
+            nxt = successor[current]
+            if nxt >= 0:
+                if on_chain[nxt]:
                     # Cycle detected
                     chains.append({
                         'type': 'cycle',
-                        'chain': [f'0x{o:08x}' for o in chain],
+                        'chain': [f'0x{offsets[i]:08x}' for i in chain],
                         'cycle_length': len(chain),
                         'depth': depth,
                     })
                     break
                 
-                chain.append(next_ptr['offset'])
-                current_target = next_ptr['value']
+                chain.append(nxt)
+                on_chain[nxt] = 1
+                current = nxt
                 depth += 1
             else:
                 # Chain terminates
                 if depth > 0:
                     chains.append({
                         'type': 'linear',
-                        'chain': [f'0x{o:08x}' for o in chain],
+                        'chain': [f'0x{offsets[i]:08x}' for i in chain],
                         'depth': depth + 1,
-                        'final_target': f'0x{current_target:08x}',
+                        'final_target': f'0x{values[current]:08x}',
                     })
                 break
         
-        visited.update(chain)
+        for i in chain:
+            visited[i] = 1
+            on_chain[i] = 0
     
     return sorted(chains, key=lambda x: -x['depth'])[:100]
 
 
-def analyze_pointer_regions(pointers: List[Dict]) -> Dict:
+def analyze_pointer_regions(pointers: Dict[str, array]) -> Dict:
     """Analyze clustering and patterns in pointer distribution."""
-    if not pointers:
+    offsets = pointers['offset']
+    if not offsets:
         return {}
     
     analysis = {
-        'total_pointers': len(pointers),
-        'offset_range': (min(p['offset'] for p in pointers), max(p['offset'] for p in pointers)),
+        'total_pointers': len(offsets),
+        'offset_range': (min(offsets), max(offsets)),
         'pointer_spacing': [],
         'clusters': [],
         'density_map': {},
     }
     
     # Sort pointers by offset
-    sorted_ptrs = sorted(pointers, key=lambda p: p['offset'])
+    sorted_offsets = sorted(offsets)
     
-    # Analyze spacing
-    spacings = []
-    for i in range(len(sorted_ptrs) - 1):
-        spacing = sorted_ptrs[i+1]['offset'] - sorted_ptrs[i]['offset']
-        spacings.append(spacing)
+    # Analyze spacing: adjacent differences, computed by map in C
+    spacings = list(map(operator.sub, islice(sorted_offsets, 1, None), sorted_offsets))
     
     if spacings:
+        # Count once instead of list.count per distinct spacing (O(n^2)); max over
+        # the same set keeps the original tie-breaking
+        spacing_counts = Counter(spacings)
         analysis['pointer_spacing'] = {
             'min': min(spacings),
             'max': max(spacings),
             'avg': sum(spacings) / len(spacings),
-            'mode': max(set(spacings), key=spacings.count) if spacings else 0,
+            'mode': max(set(spacings), key=spacing_counts.__getitem__),
         }
     
-    # Find clusters (groups of pointers close together)
-    cluster = []
-    for ptr in sorted_ptrs:
-        if not cluster or ptr['offset'] - cluster[-1]['offset'] < 100:
-            cluster.append(ptr)
-        else:
-            if len(cluster) > 3:
-                analysis['clusters'].append({
-                    'start': cluster[0]['offset'],
-                    'end': cluster[-1]['offset'],
-                    'size': cluster[-1]['offset'] - cluster[0]['offset'],
-                    'count': len(cluster),
-                })
-            cluster = [ptr]
+    # Find clusters (groups of pointers close together): a spacing of 100 or
+    # more closes the run of offsets before it. The trailing run is never
+    # closed, so it is not reported.
+    start = 0
+    for end in compress(range(len(spacings)), map((100).__le__, spacings)):
+        count = end + 1 - start
+        if count > 3:
+            analysis['clusters'].append({
+                'start': sorted_offsets[start],
+                'end': sorted_offsets[end],
+                'size': sorted_offsets[end] - sorted_offsets[start],
+                'count': count,
+            })
+        start = end + 1
     
     return analysis
 
 
-def classify_pointers(pointers: List[Dict], data: bytes) -> Dict:
+def classify_pointers(pointers: Dict[str, array], data: bytes) -> Dict:
     """Classify pointers by their target characteristics."""
     classification = {
         'null_pointers': 0,
@@ -224,28 +269,46 @@ def classify_pointers(pointers: List[Dict], data: bytes) -> Dict:
         'unknown': 0,
     }
     
-    for ptr in pointers:
-        target = ptr['target']
-        
+    # Many pointers share a target: classify each distinct target once and
+    # add its pointer count
+    data_len = len(data)
+    for target, count in Counter(pointers['value']).items():
         if target == 0:
-            classification['null_pointers'] += 1
-        elif target + 16 < len(data):
+            classification['null_pointers'] += count
+        elif target + 16 < data_len:
             region = data[target:target+16]
             
             # Check if it's string-like
-            ascii_count = sum(1 for b in region if 32 <= b <= 126)
+            ascii_count = region.translate(PRINTABLE_FLAGS).count(1)
             null_count = region.count(0)
             
             if ascii_count > 8:
-                classification['string_pointers'] += 1
+                classification['string_pointers'] += count
             elif null_count > 12:
-                classification['data_pointers'] += 1
+                classification['data_pointers'] += count
             else:
-                classification['unknown'] += 1
+                classification['unknown'] += count
     
     return classification
 
 
+def map_rwz(path: Path):
+    """Memory-map the RWZ file read-only (an empty file yields b'')."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b''
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def write_json(path: Path, payload: Dict) -> None:
+    """Write payload as indented JSON (orjson when installed, else stdlib)."""
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS, default=str))
+        return
+    with open(path, 'w') as f:
+        json.dump(payload, f, indent=2, default=str)
+
+
 def main(argv: List[str]) -> int:
     parser = argparse.ArgumentParser(
         description='Analyze pointer networks and object graphs'
@@ -263,19 +326,20 @@ def main(argv: List[str]) -> int:
         print(f"Error: {rwz_path} not found", file=sys.stderr)
         return 1
     
-    with open(rwz_path, 'rb') as f:
-        data = f.read()
+    data = map_rwz(rwz_path)
     
     print(f"Analyzing {rwz_path} ({len(data)} bytes)", file=sys.stderr)
     
     # Extract all pointers
     print("  - Extracting all pointers...", file=sys.stderr)
     all_pointers = extract_all_pointers(data, 0, len(data))
-    print(f"    Found {len(all_pointers)} potential pointers", file=sys.stderr)
+    total_pointers = len(all_pointers['offset'])
+    print(f"    Found {total_pointers} potential pointers", file=sys.stderr)
     
     # Filter by confidence
-    pointers = [p for p in all_pointers if p['confidence'] >= args.confidence_min]
-    print(f"    {len(pointers)} above confidence threshold {args.confidence_min}", file=sys.stderr)
+    pointers = filter_pointers(all_pointers, args.confidence_min)
+    pointer_count = len(pointers['offset'])
+    print(f"    {pointer_count} above confidence threshold {args.confidence_min}", file=sys.stderr)
     
     # Build pointer graph
     print("  - Building pointer graph...", file=sys.stderr)
@@ -295,12 +359,12 @@ def main(argv: List[str]) -> int:
     
     results = {
         'file': str(rwz_path),
-        'total_pointers': len(all_pointers),
-        'pointers_analyzed': len(pointers),
+        'total_pointers': total_pointers,
+        'pointers_analyzed': pointer_count,
         'graph': {
-            'nodes_count': len(graph['nodes']),
-            'edges_count': len(graph['edges']),
-            'sample_edges': graph['edges'][:20],
+            'nodes_count': graph['nodes_count'],
+            'edges_count': graph['edges_count'],
+            'sample_edges': format_edges(graph, 20),
         },
         'chains': chains,
         'regions': regions,
@@ -310,8 +374,7 @@ def main(argv: List[str]) -> int:
     # Output JSON
     if args.out:
         out_path = Path(args.out)
-        with open(out_path, 'w') as f:
-            json.dump(results, f, indent=2, default=str)
+        write_json(out_path, results)
         print(f"JSON output: {out_path}", file=sys.stderr)
     
     # Output Markdown
@@ -321,8 +384,8 @@ def main(argv: List[str]) -> int:
             f.write(f"# RWZ Pointer Network Analysis\n\n")
             
             f.write("## Summary\n")
-            f.write(f"- Total potential pointers: {len(all_pointers)}\n")
-            f.write(f"- Pointers analyzed: {len(pointers)}\n")
+            f.write(f"- Total potential pointers: {total_pointers}\n")
+            f.write(f"- Pointers analyzed: {pointer_count}\n")
             f.write(f"- Graph nodes: {results['graph']['nodes_count']}\n")
             f.write(f"- Graph edges: {results['graph']['edges_count']}\n\n")
             
@@ -361,7 +424,7 @@ def main(argv: List[str]) -> int:
         print(f"Markdown output: {md_path}", file=sys.stderr)
     
     print("\n=== SUMMARY ===", file=sys.stderr)
-    print(f"Pointers extracted: {len(pointers)}")
+    print(f"Pointers extracted: {pointer_count}")
     print(f"Chains detected: {len(chains)}")
     print(f"Clusters found: {len(regions.get('clusters', []))}")
     print(f"String pointers: {classification['string_pointers']}")
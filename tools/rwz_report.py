@@ -2,37 +2,54 @@
 import argparse
 import json
 import math
+import mmap
+import os
 import re
 import sys
+from collections import Counter
 from pathlib import Path
 from typing import List, Tuple
 
+try:
+    import re2
+except Exception:
+    re2 = None
 
-UTF16LE_RE = re.compile(rb'(?:[\x20-\x7e]\x00){4,}')
-UTF16BE_RE = re.compile(rb'(?:\x00[\x20-\x7e]){4,}')
-ASCII_RE = re.compile(rb'[\x20-\x7e]{4,}')
+# Byte scanners use RE2 (linear-time DFA) when installed, else the stdlib engine;
+# both return the same leftmost-longest runs for these patterns
+_scan_re = re2 if re2 is not None else re
+
+UTF16LE_RE = _scan_re.compile(rb'(?:[\x20-\x7e]\x00){4,}')
+UTF16BE_RE = _scan_re.compile(rb'(?:\x00[\x20-\x7e]){4,}')
+ASCII_RE = _scan_re.compile(rb'[\x20-\x7e]{4,}')
 EMAIL_RE = re.compile(r'[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}')
 
+# bytes.translate table: printable ASCII kept, everything else shown as '.'
+ASCII_PREVIEW_TABLE = bytes(b if 0x20 <= b <= 0x7e else 0x2e for b in range(256))
+
 
 def scan_strings(data: bytes, min_chars: int, include_ascii: bool, include_utf16be: bool):
+    # The patterns only match printable ASCII (paired with 0x00 for UTF-16), so
+    # the character count is known before decoding, and UTF-16 text is just
+    # every other byte decoded as ASCII.
     entries = []
 
     for m in UTF16LE_RE.finditer(data):
-        s = m.group().decode('utf-16le', errors='ignore')
-        if len(s) >= min_chars:
-            entries.append({'offset': m.start(), 'kind': 'utf16le', 'text': s, 'byte_len': len(m.group())})
+        raw = m.group()
+        if len(raw) // 2 >= min_chars:
+            entries.append({'offset': m.start(), 'kind': 'utf16le', 'text': raw[::2].decode('ascii'), 'byte_len': len(raw)})
 
     if include_utf16be:
         for m in UTF16BE_RE.finditer(data):
-            s = m.group().decode('utf-16be', errors='ignore')
-            if len(s) >= min_chars:
-                entries.append({'offset': m.start(), 'kind': 'utf16be', 'text': s, 'byte_len': len(m.group())})
+            raw = m.group()
+            if len(raw) // 2 >= min_chars:
+                entries.append({'offset': m.start(), 'kind': 'utf16be', 'text': raw[1::2].decode('ascii'), 'byte_len': len(raw)})
 
     if include_ascii:
         for m in ASCII_RE.finditer(data):
-            s = m.group().decode('ascii', errors='ignore')
-            if len(s) >= min_chars:
-                entries.append({'offset': m.start(), 'kind': 'ascii', 'text': s, 'byte_len': len(m.group())})
+            raw = m.group()
+            if len(raw) >= min_chars:
+                entries.append({'offset': m.start(), 'kind': 'ascii', 'text': raw.decode('ascii'), 'byte_len': len(raw)})
 
     entries.sort(key=lambda x: (x['offset'], x['kind']))
     return entries
@@ -60,30 +77,23 @@ def merge_ranges(ranges: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
 
 
 def hex_preview(data: bytes, start: int, length: int) -> str:
-    chunk = data[start:start + length]
-    return ' '.join(f'{b:02x}' for b in chunk)
+    # bytes.hex(sep) formats the whole preview in a single C call.
+    return data[start:start + length].hex(' ')
 
 
 def ascii_preview(data: bytes, start: int, length: int) -> str:
-    chunk = data[start:start + length]
-    out = []
-    for b in chunk:
-        if 0x20 <= b <= 0x7e:
-            out.append(chr(b))
-        else:
-            out.append('.')
-    return ''.join(out)
+    return data[start:start + length].translate(ASCII_PREVIEW_TABLE).decode('ascii')
 
 
 def shannon_entropy(data: bytes) -> float:
     if not data:
         return 0.0
-    counts = [0] * 256
-    for b in data:
-        counts[b] += 1
+    # Counter tallies the bytes in C; summing in byte order keeps the result bit-identical
+    counts = Counter(data)
     entropy = 0.0
     length = len(data)
-    for c in counts:
+    for b in sorted(counts):
+        c = counts[b]
         if c:
             p = c / length
             # log2(p) = ln(p) / ln(2)
@@ -134,6 +144,14 @@ def coverage_for_kind(entries, kind: str, data_len: int) -> tuple[int, float]:
     return covered, pct
 
 
+def map_rwz(path: Path):
+    """Memory-map the RWZ file read-only (an empty file yields b'')."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b''
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
 def main(argv: list[str]) -> int:
     ap = argparse.ArgumentParser(description='Deep RWZ analysis report (human readable)')
     ap.add_argument('path', type=Path, help='Path to .rwz file')
@@ -146,7 +164,7 @@ def main(argv: list[str]) -> int:
     ap.add_argument('--out', type=Path, help='Write report to file (UTF-8)')
     args = ap.parse_args(argv)
 
-    data = args.path.read_bytes()
+    data = map_rwz(args.path)
     entries = scan_strings(data, args.min_chars, args.include_ascii, args.include_utf16be)
     rules, preamble = build_rules(entries)
 
@@ -167,93 +185,103 @@ def main(argv: list[str]) -> int:
         gaps.append((last, len(data)))
     gaps.sort(key=lambda x: x[1] - x[0], reverse=True)
 
-    out_lines = []
-    out_lines.append(f'# RWZ Report: {args.path.name}')
-    out_lines.append('')
-    out_lines.append('## File Summary')
-    out_lines.append(f'- Size: {len(data)} bytes')
-    out_lines.append(f'- Strings: {len(entries)}')
-    out_lines.append(f'- Rules: {len(rules)}')
-    out_lines.append(f'- Coverage by extracted strings: {coverage:.2f}%')
-    if entries:
-        cov_le, pct_le = coverage_for_kind(entries, 'utf16le', len(data))
-        cov_be, pct_be = coverage_for_kind(entries, 'utf16be', len(data))
-        cov_ascii, pct_ascii = coverage_for_kind(entries, 'ascii', len(data))
-        out_lines.append(f'- Coverage utf16le: {cov_le} bytes ({pct_le:.2f}%)')
-        if args.include_utf16be:
-            out_lines.append(f'- Coverage utf16be: {cov_be} bytes ({pct_be:.2f}%)')
-        if args.include_ascii:
-            out_lines.append(f'- Coverage ascii: {cov_ascii} bytes ({pct_ascii:.2f}%)')
-    out_lines.append('')
-
-    out_lines.append('## Rules (Index)')
-    out_lines.append('| # | Title | Start | End | Strings | Emails |')
-    out_lines.append('|---|-------|-------|-----|---------|--------|')
-    for idx, r in enumerate(rules, start=1):
-        s = summarize_rule(r)
-        out_lines.append(f"| {idx} | {s['title']} | 0x{s['start']:08x} | 0x{s['end']:08x} | {s['strings']} | {len(s['emails'])} |")
-    out_lines.append('')
-
-    out_lines.append('## Largest Gaps (Bytes not covered by strings)')
-    out_lines.append('| # | Start | End | Size |')
-    out_lines.append('|---|-------|-----|------|')
-    for i, (start, end) in enumerate(gaps[: args.gap_limit], start=1):
-        out_lines.append(f"| {i} | 0x{start:08x} | 0x{end:08x} | {end-start} |")
-    out_lines.append('')
-
-    if gaps:
-        out_lines.append('## Gap Previews')
-        for i, (start, end) in enumerate(gaps[: args.gap_limit], start=1):
-            size = end - start
-            length = min(args.gap_bytes, size)
-            head_hex = hex_preview(data, start, length)
-            head_ascii = ascii_preview(data, start, length)
-            tail_start = max(start, end - length)
-            tail_hex = hex_preview(data, tail_start, length)
-            tail_ascii = ascii_preview(data, tail_start, length)
-            entropy = shannon_entropy(data[start:end])
-            out_lines.append(f'### Gap {i}')
-            out_lines.append(f'- Range: 0x{start:08x} .. 0x{end:08x} (size {size})')
-            out_lines.append(f'- Entropy: {entropy:.3f}')
-            out_lines.append(f'- Head Hex ({length} bytes): `{head_hex}`')
-            out_lines.append(f'- Head ASCII: `{head_ascii}`')
-            out_lines.append(f'- Tail Hex ({length} bytes): `{tail_hex}`')
-            out_lines.append(f'- Tail ASCII: `{tail_ascii}`')
-            out_lines.append('')
-
-    out_lines.append('## Rule Details')
-    for idx, r in enumerate(rules, start=1):
-        out_lines.append(f'### [{idx}] {r["title"]}')
-        out_lines.append(f'- Range: 0x{r["entries"][0]["offset"]:08x} .. 0x{r["entries"][-1]["offset"]:08x}')
-        if args.hex_bytes > 0:
-            start = r['entries'][0]['offset']
-            end = min(len(data), r['entries'][-1]['offset'] + r['entries'][-1]['byte_len'])
-            out_lines.append(f'- Hex (head {args.hex_bytes} bytes): `{hex_preview(data, start, args.hex_bytes)}`')
-            tail_start = max(start, end - args.hex_bytes)
-            out_lines.append(f'- Hex (tail {args.hex_bytes} bytes): `{hex_preview(data, tail_start, args.hex_bytes)}`')
-        out_lines.append('')
-        out_lines.append('| Offset | Kind | Text |')
-        out_lines.append('|--------|------|------|')
-        for e in r['entries']:
-            text = e['text'].replace('|', '\\|')
-            out_lines.append(f"| 0x{e['offset']:08x} | {e['kind']} | {text} |")
-        out_lines.append('')
-
-    if preamble:
-        out_lines.append('## Preamble (Before first rule)')
-        out_lines.append('| Offset | Kind | Text |')
-        out_lines.append('|--------|------|------|')
-        for e in preamble:
-            text = e['text'].replace('|', '\\|')
-            out_lines.append(f"| 0x{e['offset']:08x} | {e['kind']} | {text} |")
-        out_lines.append('')
-
-    report = '\n'.join(out_lines) + '\n'
     if args.out:
         args.out.parent.mkdir(parents=True, exist_ok=True)
-        args.out.write_text(report, encoding='utf-8')
+        fp = open(args.out, 'w', encoding='utf-8', buffering=1 << 16)
     else:
-        print(report)
+        fp = sys.stdout
+
+    def emit(line: str) -> None:
+        fp.write(line + '\n')
+
+    # Stream the report as it is built instead of joining one big string.
+    try:
+        emit(f'# RWZ Report: {args.path.name}')
+        emit('')
+        emit('## File Summary')
+        emit(f'- Size: {len(data)} bytes')
+        emit(f'- Strings: {len(entries)}')
+        emit(f'- Rules: {len(rules)}')
+        emit(f'- Coverage by extracted strings: {coverage:.2f}%')
+        if entries:
+            cov_le, pct_le = coverage_for_kind(entries, 'utf16le', len(data))
+            cov_be, pct_be = coverage_for_kind(entries, 'utf16be', len(data))
+            cov_ascii, pct_ascii = coverage_for_kind(entries, 'ascii', len(data))
+            emit(f'- Coverage utf16le: {cov_le} bytes ({pct_le:.2f}%)')
+            if args.include_utf16be:
+                emit(f'- Coverage utf16be: {cov_be} bytes ({pct_be:.2f}%)')
+            if args.include_ascii:
+                emit(f'- Coverage ascii: {cov_ascii} bytes ({pct_ascii:.2f}%)')
+        emit('')
+
+        emit('## Rules (Index)')
+        emit('| # | Title | Start | End | Strings | Emails |')
+        emit('|---|-------|-------|-----|---------|--------|')
+        for idx, r in enumerate(rules, start=1):
+            s = summarize_rule(r)
+            emit(f"| {idx} | {s['title']} | 0x{s['start']:08x} | 0x{s['end']:08x} | {s['strings']} | {len(s['emails'])} |")
+        emit('')
+
+        emit('## Largest Gaps (Bytes not covered by strings)')
+        emit('| # | Start | End | Size |')
+        emit('|---|-------|-----|------|')
+        for i, (start, end) in enumerate(gaps[: args.gap_limit], start=1):
+            emit(f"| {i} | 0x{start:08x} | 0x{end:08x} | {end-start} |")
+        emit('')
+
+        if gaps:
+            emit('## Gap Previews')
+            for i, (start, end) in enumerate(gaps[: args.gap_limit], start=1):
+                size = end - start
+                length = min(args.gap_bytes, size)
+                head_hex = hex_preview(data, start, length)
+                head_ascii = ascii_preview(data, start, length)
+                tail_start = max(start, end - length)
+                tail_hex = hex_preview(data, tail_start, length)
+                tail_ascii = ascii_preview(data, tail_start, length)
+                entropy = shannon_entropy(data[start:end])
+                emit(f'### Gap {i}')
+                emit(f'- Range: 0x{start:08x} .. 0x{end:08x} (size {size})')
+                emit(f'- Entropy: {entropy:.3f}')
+                emit(f'- Head Hex ({length} bytes): `{head_hex}`')
+                emit(f'- Head ASCII: `{head_ascii}`')
+                emit(f'- Tail Hex ({length} bytes): `{tail_hex}`')
+                emit(f'- Tail ASCII: `{tail_ascii}`')
+                emit('')
+
+        emit('## Rule Details')
+        for idx, r in enumerate(rules, start=1):
+            emit(f'### [{idx}] {r["title"]}')
+            emit(f'- Range: 0x{r["entries"][0]["offset"]:08x} .. 0x{r["entries"][-1]["offset"]:08x}')
+            if args.hex_bytes > 0:
+                start = r['entries'][0]['offset']
+                end = min(len(data), r['entries'][-1]['offset'] + r['entries'][-1]['byte_len'])
+                emit(f'- Hex (head {args.hex_bytes} bytes): `{hex_preview(data, start, args.hex_bytes)}`')
+                tail_start = max(start, end - args.hex_bytes)
+                emit(f'- Hex (tail {args.hex_bytes} bytes): `{hex_preview(data, tail_start, args.hex_bytes)}`')
+            emit('')
+            emit('| Offset | Kind | Text |')
+            emit('|--------|------|------|')
+            for e in r['entries']:
+                text = e['text'].replace('|', '\\|')
+                emit(f"| 0x{e['offset']:08x} | {e['kind']} | {text} |")
+            emit('')
+
+        if preamble:
+            emit('## Preamble (Before first rule)')
+            emit('| Offset | Kind | Text |')
+            emit('|--------|------|------|')
+            for e in preamble:
+                text = e['text'].replace('|', '\\|')
+                emit(f"| 0x{e['offset']:08x} | {e['kind']} | {text} |")
+            emit('')
+
+        if fp is sys.stdout:
+            fp.write('\n')  # print() of the joined report added a trailing newline
+    finally:
+        if fp is not sys.stdout:
+            fp.close()
+
     return 0
 
 
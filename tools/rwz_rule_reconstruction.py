@@ -13,12 +13,45 @@ RWZ フラグ位置検証・ルール条件マッピングツール
 """
 
 import argparse
+import glob
 import json
-import struct
+import mmap
+import os
 import sys
 from pathlib import Path
 from typing import List, Dict, Tuple
-from collections import defaultdict
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+
+# 符号なし32ビット値を保持する array の型コード
+DWORD_TYPECODE = 'I' if array('I').itemsize == 4 else 'L'
+
+# JSON の value_distribution に残す値の最大数（出現回数の多い順）
+DISTRIBUTION_LIMIT = 64
+
+
+def block_dwords(rwz_data: bytes, offset: int, block_size: int = 192) -> array:
+    """全ブロックの offset 位置にある u32 (LE) を1列の array として返す
+
+    4バイトをそれぞれブロック間隔のストライドスライスで集めて並べるため、
+    ブロックごとの Python ループや struct.unpack は不要。
+    """
+    nblocks = len(rwz_data) // block_size
+    column = bytearray(4 * nblocks)
+    for k in range(4):
+        column[k::4] = rwz_data[offset + k:nblocks * block_size:block_size]
+    values = array(DWORD_TYPECODE, column)
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values
 
 
 def extract_flag_values(rwz_data: bytes, flag_offsets: List[int], block_size: int = 192) -> Dict:
@@ -30,28 +63,38 @@ def extract_flag_values(rwz_data: bytes, flag_offsets: List[int], block_size: in
     }
     
     for offset in flag_offsets:
-        values = defaultdict(int)
-        
-        for block_idx in range(len(rwz_data) // block_size):
-            block_start = block_idx * block_size
-            block_end = block_start + block_size
-            
-            if block_start < len(rwz_data) and block_end <= len(rwz_data):
-                block = rwz_data[block_start:block_end]
-                
-                if offset + 4 <= len(block):
-                    val = struct.unpack('<I', block[offset:offset+4])[0]
-                    values[val] += 1
+        if 0 <= offset and offset + 4 <= block_size:
+            values = Counter(block_dwords(rwz_data, offset, block_size))
+        else:
+            values = Counter()
         
         result['values_per_offset'][f'0x{offset:02x}'] = {
             'value_distribution': dict(values),
             'unique_values': len(values),
-            'most_common': max(values.items(), key=lambda x: x[1]) if values else (0, 0),
+            'most_common': values.most_common(1)[0] if values else (0, 0),
         }
     
     return result
 
 
+def compact_flags_data(flags_data: Dict, limit: int = DISTRIBUTION_LIMIT) -> Dict:
+    """JSON出力用に各オフセットの value_distribution を上位 limit 件に絞る
+
+    値がブロックごとに異なるオフセット（ポインタ・サイズ等）では分布が
+    ブロック数近くまで膨らむため。推測処理は絞る前の全分布を使う。
+    """
+    compact = dict(flags_data)
+    compact['values_per_offset'] = {}
+    for offset_hex, dist in flags_data.get('values_per_offset', {}).items():
+        values = Counter(dist['value_distribution'])
+        entry = dict(dist)
+        entry['value_distribution'] = dict(values.most_common(limit))
+        entry['distribution_truncated'] = len(values) > limit
+        entry['total_cardinality'] = len(values)
+        compact['values_per_offset'][offset_hex] = entry
+    return compact
+
+
 def correlate_with_ocr_rules(flags_data: Dict, ocr_json_path: Path) -> Dict:
     """フラグ値とOCRから抽出したルール条件の相関分析"""
     correlation = {
@@ -80,8 +123,9 @@ def correlate_with_ocr_rules(flags_data: Dict, ocr_json_path: Path) -> Dict:
             '0x28': 'rule_priority_or_order',
         }
         
+        values_per_offset = flags_data.get('values_per_offset', {})
         for offset_hex, meaning in flag_meanings.items():
-            values = flags_data.get('values_per_offset', {}).get(offset_hex, {})
+            values = values_per_offset.get(offset_hex, {})
             if values.get('unique_values', 0) > 0:
                 correlation['flag_rule_mappings'].append({
                     'offset': offset_hex,
@@ -103,10 +147,11 @@ def correlate_with_ocr_rules(flags_data: Dict, ocr_json_path: Path) -> Dict:
 def infer_ms_logic(flags_data: Dict, correlation: Dict) -> List[Dict]:
     """MS Outlookのルール適用ロジックを推測"""
     logic = []
+    values_per_offset = flags_data.get('values_per_offset', {})
     
     # フラグ0x20（enable/disable推定）
-    if '0x20' in flags_data.get('values_per_offset', {}):
-        val_dist = flags_data['values_per_offset']['0x20']['value_distribution']
+    if '0x20' in values_per_offset:
+        val_dist = values_per_offset['0x20']['value_distribution']
         if 1 in val_dist:
             logic.append({
                 'stage': 1,
@@ -117,8 +162,8 @@ def infer_ms_logic(flags_data: Dict, correlation: Dict) -> List[Dict]:
             })
     
     # フラグ0x24（アクション推定）
-    if '0x24' in flags_data.get('values_per_offset', {}):
-        val_dist = flags_data['values_per_offset']['0x24']['value_distribution']
+    if '0x24' in values_per_offset:
+        val_dist = values_per_offset['0x24']['value_distribution']
         action_values = list(val_dist.keys())
         if action_values:
             logic.append({
@@ -130,8 +175,7 @@ def infer_ms_logic(flags_data: Dict, correlation: Dict) -> List[Dict]:
             })
     
     # フラグ0x28（優先度推定）
-    if '0x28' in flags_data.get('values_per_offset', {}):
-        val_dist = flags_data['values_per_offset']['0x28']['value_distribution']
+    if '0x28' in values_per_offset:
         logic.append({
             'stage': 3,
             'field': 'offset 0x28',
@@ -143,11 +187,12 @@ def infer_ms_logic(flags_data: Dict, correlation: Dict) -> List[Dict]:
     return logic
 
 
-def generate_rule_reconstruction_guide(flags_data: Dict, logic: List[Dict]) -> str:
+def generate_rule_reconstruction_guide(flags_data: Dict, logic: List[Dict],
+                                       title: str = "MS Outlookルール復元ガイド") -> str:
     """ルール復元のためのガイド生成"""
     guide = []
     
-    guide.append("# MS Outlookルール復元ガイド")
+    guide.append(f"# {title}")
     guide.append("")
     guide.append("## ステップ1: フラグ位置の確認")
     guide.append("")
@@ -181,27 +226,38 @@ def generate_rule_reconstruction_guide(flags_data: Dict, logic: List[Dict]) -> s
     return "\n".join(guide)
 
 
-def main(argv: List[str]) -> int:
-    parser = argparse.ArgumentParser(description='フラグ位置検証・ルール条件マッピング')
-    parser.add_argument('rwz_file', help='RWZファイルのパス')
-    parser.add_argument('--flags', type=str, default='32,36,0,40',
-                       help='検証するフラグオフセット（10進）、カンマ区切り')
-    parser.add_argument('--ocr', type=Path, help='OCRデータJSON')
-    parser.add_argument('--out', help='出力JSONファイル')
-    parser.add_argument('--out-md', help='出力Markdownファイル')
-    
-    args = parser.parse_args(argv)
-    
-    rwz_path = Path(args.rwz_file)
-    if not rwz_path.exists():
-        print(f"エラー: {rwz_path} が見つかりません", file=sys.stderr)
-        return 1
-    
-    with open(rwz_path, 'rb') as f:
-        rwz_data = f.read()
-    
-    # フラグオフセットをパース
-    flag_offsets = [int(x) for x in args.flags.split(',')]
+def map_rwz(path: Path):
+    """RWZファイルを読み取り専用でメモリマップ（空ファイルは b''）"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b''
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def write_json(path: Path, payload: Dict) -> None:
+    """インデント付きJSONを書き出す（orjsonがあれば使用、なければ標準json）"""
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        return
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, indent=2, ensure_ascii=False)
+
+
+def expand_rwz_paths(pattern: str) -> List[Path]:
+    """pattern が指す RWZ ファイル、またはグロブとして一致する全ファイル"""
+    path = Path(pattern)
+    if path.exists():
+        return [path]
+    return sorted(Path(p) for p in glob.glob(pattern))
+
+
+def analyze_file(rwz_path: Path, flag_offsets: List[int], ocr_path: Path,
+                 guide_title: str = "MS Outlookルール復元ガイド") -> Tuple[Dict, str]:
+    """1つのRWZファイルを分析し、JSON結果とガイド本文を返す
+
+    ProcessPoolExecutor のワーカーで実行できるようモジュールレベルに置く。
+    """
+    rwz_data = map_rwz(rwz_path)
     
     print(f"分析中: {len(rwz_data)}バイト", file=sys.stderr)
     print(f"  - フラグオフセット: {', '.join(f'0x{x:02x}' for x in flag_offsets)}", file=sys.stderr)
@@ -212,42 +268,83 @@ def main(argv: List[str]) -> int:
     
     # OCRと相関分析
     print("  - OCRとの相関分析...", file=sys.stderr)
-    correlation = correlate_with_ocr_rules(flags_data, args.ocr or Path('inputs/ocr.json'))
+    correlation = correlate_with_ocr_rules(flags_data, ocr_path)
     
     # ロジック推測
     print("  - ルール適用ロジックを推測...", file=sys.stderr)
     logic = infer_ms_logic(flags_data, correlation)
     
     # ガイド生成
-    guide = generate_rule_reconstruction_guide(flags_data, logic)
+    guide = generate_rule_reconstruction_guide(flags_data, logic, guide_title)
     
     results = {
         'file': str(rwz_path),
         'flag_offsets': [f'0x{x:02x}' for x in flag_offsets],
-        'flags_data': flags_data,
+        'flags_data': compact_flags_data(flags_data),
         'correlation': correlation,
         'inferred_logic': logic,
         'reconstruction_confidence': correlation['confidence'],
     }
+    return results, guide
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description='フラグ位置検証・ルール条件マッピング')
+    parser.add_argument('rwz_file', help='RWZファイルのパス（複数ファイルはグロブで指定）')
+    parser.add_argument('--flags', type=str, default='32,36,0,40',
+                       help='検証するフラグオフセット（10進）、カンマ区切り')
+    parser.add_argument('--ocr', type=Path, help='OCRデータJSON')
+    parser.add_argument('--out', help='出力JSONファイル')
+    parser.add_argument('--out-md', help='出力Markdownファイル')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                       help='複数ファイル時のワーカープロセス数（1 = 逐次）')
+    
+    args = parser.parse_args(argv)
+    
+    rwz_paths = expand_rwz_paths(args.rwz_file)
+    if not rwz_paths:
+        print(f"エラー: {args.rwz_file} が見つかりません", file=sys.stderr)
+        return 1
+    
+    # フラグオフセットをパース
+    flag_offsets = [int(x) for x in args.flags.split(',')]
+    ocr_path = args.ocr or Path('inputs/ocr.json')
+    
+    # 複数ファイルではガイド見出しにファイル名を付ける
+    if len(rwz_paths) == 1:
+        titles = ["MS Outlookルール復元ガイド"]
+    else:
+        titles = [f"MS Outlookルール復元ガイド: {path.name}" for path in rwz_paths]
+    
+    # ファイル同士は独立しているため、複数ファイルは並列に分析する
+    if len(rwz_paths) > 1 and args.jobs > 1:
+        with ProcessPoolExecutor(max_workers=min(args.jobs, len(rwz_paths))) as ex:
+            analyses = list(ex.map(analyze_file, rwz_paths, repeat(flag_offsets), repeat(ocr_path), titles))
+    else:
+        analyses = [analyze_file(path, flag_offsets, ocr_path, title) for path, title in zip(rwz_paths, titles)]
     
-    # JSON出力
+    # JSON出力（単一ファイルは従来の形式）
     if args.out:
         out_path = Path(args.out)
-        with open(out_path, 'w', encoding='utf-8') as f:
-            json.dump(results, f, indent=2, ensure_ascii=False)
+        if len(analyses) == 1:
+            write_json(out_path, analyses[0][0])
+        else:
+            write_json(out_path, {'files': [results for results, _ in analyses]})
         print(f"JSON出力: {out_path}", file=sys.stderr)
     
-    # Markdown出力
+    # Markdown出力（複数ファイルはガイドを連結）
     if args.out_md:
         md_path = Path(args.out_md)
         with open(md_path, 'w', encoding='utf-8') as f:
-            f.write(guide)
+            f.write("\n".join(guide for _, guide in analyses))
         print(f"Markdown出力: {md_path}", file=sys.stderr)
     
     print("\n=== ルール復元情報 ===", file=sys.stderr)
     print(f"検証フラグ: {len(flag_offsets)}個")
-    print(f"推測ロジック段数: {len(logic)}段")
-    print(f"復元信頼度: {correlation['confidence']:.1%}")
+    for results, _ in analyses:
+        prefix = f"{Path(results['file']).name}: " if len(analyses) > 1 else ''
+        print(f"{prefix}推測ロジック段数: {len(results['inferred_logic'])}段")
+        print(f"{prefix}復元信頼度: {results['reconstruction_confidence']:.1%}")
     
     return 0
 
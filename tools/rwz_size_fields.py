@@ -14,25 +14,75 @@ This tool performs:
 """
 
 import argparse
+import glob
 import json
-import struct
+import mmap
+import os
+import re
 import sys
+from array import array
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional
-from collections import defaultdict
+from typing import List, Dict, Tuple, Optional, Iterator
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+
+# array typecode holding an unsigned 32-bit value on this platform
+DWORD_TYPECODE = 'I' if array('I').itemsize == 4 else 'L'
+
+# Plausible size field values (exclusive bounds 10 and 50000)
+SIZE_VALUE_RANGE = range(11, 50000)
+
+ZERO_BYTE_RE = re.compile(rb'\x00')
+
+
+def dword_values(data: bytes):
+    """Every 4-byte aligned little-endian DWORD of data, indexable by offset // 4.
+
+    On little-endian hosts this is a zero-copy memoryview over data (or the
+    mmap); big-endian hosts get a byte-swapped array copy.
+    """
+    size = len(data) // 4 * 4
+    if sys.byteorder == 'little':
+        return memoryview(data)[:size].cast(DWORD_TYPECODE)
+    values = array(DWORD_TYPECODE, data[:size])
+    values.byteswap()
+    return values
+
+
+def plausible_size_words(data: bytes, word_count: int) -> Iterator[int]:
+    """Indices of the first word_count DWORDs whose upper 16 bits are zero.
+
+    Every plausible size value is below 65536, so only these words need a
+    closer look. The two high byte columns are OR-ed together as big
+    integers and the zero bytes of the result found by the regex engine,
+    all in C, so most words of text and binary data never reach Python.
+    """
+    size = word_count * 4
+    high = (int.from_bytes(data[2:size:4], 'little')
+            | int.from_bytes(data[3:size:4], 'little'))
+    for m in ZERO_BYTE_RE.finditer(high.to_bytes(word_count, 'little')):
+        yield m.start()
 
 
 def detect_size_fields(data: bytes) -> List[Dict]:
     """Detect fields that look like size fields."""
     size_fields = []
     
-    for offset in range(0, len(data) - 4, 4):
-        value = struct.unpack('<I', data[offset:offset+4])[0]
-        
-        # Size field heuristics:
-        # 1. Value is reasonable size (10-50000 bytes)
-        if not (10 < value < 50000):
+    # Size field heuristics:
+    # 1. Value is reasonable size (10-50000 bytes)
+    words = dword_values(data)
+    for index in plausible_size_words(data, len(range(0, len(data) - 4, 4))):
+        value = words[index]
+        if value not in SIZE_VALUE_RANGE:
             continue
+        offset = index * 4
         
         # 2. There's data ahead that matches the size
         if offset + 4 + value > len(data):
@@ -41,21 +91,28 @@ def detect_size_fields(data: bytes) -> List[Dict]:
         # 3. Check if that data region looks valid
         region = data[offset+4:offset+4+value]
         
-        # Can decode as UTF-8 or UTF-16?
-        utf8_valid = is_valid_utf8(region)
-        utf16_valid = is_valid_utf16(region)
+        # Can decode as UTF-16 or UTF-8? The text is kept for extraction.
+        # Valid UTF-16 whose high bytes are almost all zero is ASCII-range
+        # UTF-16 text; it would also "decode" as UTF-8 full of NULs, so the
+        # UTF-8 decode is skipped for it.
+        utf16_text = decode_utf16(region)
+        if utf16_text is not None and is_utf16_ascii(region):
+            utf8_text = None
+        else:
+            utf8_text = decode_utf8(region)
+        utf8_valid = utf8_text is not None
+        utf16_valid = utf16_text is not None
         
         # Has content (not mostly null)
         null_ratio = region.count(0) / len(region) if region else 0
         
         if utf8_valid or utf16_valid or null_ratio < 0.5:
-            confidence = 0.0
-            if utf8_valid:
-                confidence += 0.5
-            if utf16_valid:
-                confidence += 0.5
-            if null_ratio < 0.3:
-                confidence += 0.2
+            # A valid encoding scores once, however many decode. UTF-16 text
+            # is about half NULs by construction, so only non-UTF-16 regions
+            # earn the low-null bonus.
+            confidence = 0.7 if utf8_valid or utf16_valid else 0.0
+            if null_ratio < 0.3 and not utf16_valid:
+                confidence += 0.3
             
             size_fields.append({
                 'size_offset': offset,
@@ -68,29 +125,35 @@ def detect_size_fields(data: bytes) -> List[Dict]:
                 'utf8_valid': utf8_valid,
                 'utf16_valid': utf16_valid,
                 'null_ratio': null_ratio,
+                '_utf8_text': utf8_text,
+                '_utf16_text': utf16_text,
             })
     
     return size_fields
 
 
-def is_valid_utf8(data: bytes) -> bool:
-    """Check if data is valid UTF-8."""
+def is_utf16_ascii(data: bytes) -> bool:
+    """Check if fewer than 5% of the high (odd) bytes of data are non-zero."""
+    high = data[1::2]
+    return (len(high) - high.count(0)) < 0.05 * len(high)
+
+
+def decode_utf8(data: bytes) -> Optional[str]:
+    """Decode data as UTF-8, or return None if it is not valid UTF-8."""
     try:
-        data.decode('utf-8')
-        return True
-    except:
-        return False
+        return data.decode('utf-8')
+    except UnicodeDecodeError:
+        return None
 
 
-def is_valid_utf16(data: bytes) -> bool:
-    """Check if data is valid UTF-16."""
+def decode_utf16(data: bytes) -> Optional[str]:
+    """Decode data as UTF-16 LE, or return None if it is not valid UTF-16."""
+    if len(data) % 2 != 0:
+        return None
     try:
-        if len(data) % 2 != 0:
-            return False
-        data.decode('utf-16-le')
-        return True
-    except:
-        return False
+        return data.decode('utf-16-le')
+    except UnicodeDecodeError:
+        return None
 
 
 def extract_strings_from_size_fields(data: bytes, size_fields: List[Dict]) -> List[Dict]:
@@ -114,44 +177,43 @@ def extract_strings_from_size_fields(data: bytes, size_fields: List[Dict]) -> Li
             'strings': [],
         }
         
-        # Try UTF-8
+        # UTF-8 (already decoded while detecting the size field)
         if sf['utf8_valid']:
-            try:
-                text = region.decode('utf-8', errors='ignore')
-                if text.strip():
-                    extracted['strings'].append({
-                        'encoding': 'utf-8',
-                        'text': text[:200],  # Limit for output
-                        'length': len(text),
-                    })
-            except:
-                pass
+            text = sf['_utf8_text']
+            if text.strip():
+                extracted['strings'].append({
+                    'encoding': 'utf-8',
+                    'text': text[:200],  # Limit for output
+                    'length': len(text),
+                })
         
-        # Try UTF-16 LE
+        # UTF-16 LE (likewise)
         if sf['utf16_valid']:
-            try:
-                text = region.decode('utf-16-le', errors='ignore')
-                if text.strip():
+            text = sf['_utf16_text']
+            if text.strip():
+                extracted['strings'].append({
+                    'encoding': 'utf-16-le',
+                    'text': text[:200],
+                    'length': len(text),
+                })
+        
+        # Try null-terminated extraction
+        null_positions = []
+        null_pos = region.find(0)
+        while null_pos != -1 and len(null_positions) < 3:  # First 3 nulls
+            null_positions.append(null_pos)
+            null_pos = region.find(0, null_pos + 1)
+        seen = {s['text'] for s in extracted['strings']}
+        for null_pos in null_positions:
+            if null_pos > 0:
+                text = region[:null_pos].decode('utf-8', errors='ignore')
+                if text.strip() and text not in seen:
                     extracted['strings'].append({
-                        'encoding': 'utf-16-le',
+                        'encoding': 'utf-8 (null-terminated)',
                         'text': text[:200],
                         'length': len(text),
                     })
-            except:
-                pass
-        
-        # Try null-terminated extraction
-        null_positions = [i for i, b in enumerate(region) if b == 0]
-        if null_positions:
-            for null_pos in null_positions[:3]:  # First 3 nulls
-                if null_pos > 0:
-                    text = region[:null_pos].decode('utf-8', errors='ignore')
-                    if text.strip() and text not in [s.get('text', '') for s in extracted['strings']]:
-                        extracted['strings'].append({
-                            'encoding': 'utf-8 (null-terminated)',
-                            'text': text[:200],
-                            'length': len(text),
-                        })
+                    seen.add(text[:200])
         
         if extracted['strings']:
             strings.append(extracted)
@@ -180,11 +242,14 @@ def find_size_field_patterns(size_fields: List[Dict]) -> Dict:
         spacings.append(spacing)
     
     if spacings:
+        # Count once instead of list.count per distinct spacing (O(n^2)); max over
+        # the same set keeps the original tie-breaking
+        spacing_counts = Counter(spacings)
         patterns['spacing'] = {
             'min': min(spacings),
             'max': max(spacings),
             'avg': sum(spacings) / len(spacings),
-            'mode': max(set(spacings), key=spacings.count) if spacings else 0,
+            'mode': max(set(spacings), key=spacing_counts.__getitem__),
         }
     
     # Most common offset patterns
@@ -199,25 +264,38 @@ def find_size_field_patterns(size_fields: List[Dict]) -> Dict:
     return patterns
 
 
-def main(argv: List[str]) -> int:
-    parser = argparse.ArgumentParser(
-        description='Extract strings using size fields'
-    )
-    parser.add_argument('rwz_file', help='Path to RWZ file')
-    parser.add_argument('--out', help='Output JSON file')
-    parser.add_argument('--out-md', help='Output Markdown file')
-    parser.add_argument('--min-confidence', type=float, default=0.5,
-                       help='Minimum size field confidence (0-1)')
-    
-    args = parser.parse_args(argv)
-    
-    rwz_path = Path(args.rwz_file)
-    if not rwz_path.exists():
-        print(f"Error: {rwz_path} not found", file=sys.stderr)
-        return 1
-    
-    with open(rwz_path, 'rb') as f:
-        data = f.read()
+def map_rwz(path: Path):
+    """Memory-map the RWZ file read-only (an empty file yields b'')."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b''
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def write_json(path: Path, payload: Dict) -> None:
+    """Write payload as indented JSON (orjson when installed, else stdlib)."""
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS, default=str))
+        return
+    with open(path, 'w') as f:
+        json.dump(payload, f, indent=2, default=str)
+
+
+def expand_rwz_paths(pattern: str) -> List[Path]:
+    """The RWZ file named by pattern, or every file it matches as a glob."""
+    path = Path(pattern)
+    if path.exists():
+        return [path]
+    return sorted(Path(p) for p in glob.glob(pattern))
+
+
+def analyze_file(rwz_path: Path, min_confidence: float) -> Tuple[Dict, int]:
+    """Run the size field analysis on one RWZ file.
+
+    Returns the JSON results and the total number of extracted strings.
+    Kept at module level so ProcessPoolExecutor can run it in workers.
+    """
+    data = map_rwz(rwz_path)
     
     print(f"Analyzing {rwz_path} ({len(data)} bytes)", file=sys.stderr)
     
@@ -227,8 +305,8 @@ def main(argv: List[str]) -> int:
     print(f"    Found {len(all_size_fields)} potential size fields", file=sys.stderr)
     
     # Filter by confidence
-    size_fields = [sf for sf in all_size_fields if sf['confidence'] >= args.min_confidence]
-    print(f"    {len(size_fields)} above confidence threshold {args.min_confidence}", file=sys.stderr)
+    size_fields = [sf for sf in all_size_fields if sf['confidence'] >= min_confidence]
+    print(f"    {len(size_fields)} above confidence threshold {min_confidence}", file=sys.stderr)
     
     # Extract strings
     print("  - Extracting strings from size fields...", file=sys.stderr)
@@ -247,51 +325,91 @@ def main(argv: List[str]) -> int:
         'patterns': patterns,
         'sample_strings': strings[:50],
     }
+    return results, sum(len(x['strings']) for x in strings)
+
+
+def write_markdown(f, results: Dict, title: str) -> None:
+    """Write the Markdown report for one file's results."""
+    f.write(f"# {title}\n\n")
+    
+    f.write("## Summary\n")
+    f.write(f"- Total size fields: {results['total_size_fields']}\n")
+    f.write(f"- Analyzed: {results['size_fields_analyzed']}\n")
+    f.write(f"- Strings extracted: {results['strings_extracted']}\n\n")
+    
+    # Patterns
+    patterns = results['patterns']
+    if patterns.get('spacing'):
+        f.write("## Size Field Spacing\n")
+        spacing = patterns['spacing']
+        f.write(f"- Min: {spacing['min']} bytes\n")
+        f.write(f"- Max: {spacing['max']} bytes\n")
+        f.write(f"- Avg: {spacing['avg']:.1f} bytes\n")
+        f.write(f"- Mode: {spacing['mode']} bytes\n\n")
+    
+    # Sample strings
+    f.write(f"## Sample Extracted Strings (First 20)\n\n")
+    for i, item in enumerate(results['sample_strings'][:20], 1):
+        f.write(f"### String {i}\n")
+        f.write(f"- Size field offset: {item['size_offset_hex']}\n")
+        f.write(f"- Size value: {item['size_value']}\n")
+        f.write(f"- Data offset: {item['data_offset_hex']}\n")
+        for s in item['strings']:
+            f.write(f"- **{s['encoding']}**: `{s['text']}`\n")
+        f.write("\n")
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(
+        description='Extract strings using size fields'
+    )
+    parser.add_argument('rwz_file', help='Path to RWZ file, or a glob matching several')
+    parser.add_argument('--out', help='Output JSON file')
+    parser.add_argument('--out-md', help='Output Markdown file')
+    parser.add_argument('--min-confidence', type=float, default=0.5,
+                       help='Minimum size field confidence (0-1)')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                       help='Worker processes when several files match (1 = serial)')
     
-    # Output JSON
+    args = parser.parse_args(argv)
+    
+    rwz_paths = expand_rwz_paths(args.rwz_file)
+    if not rwz_paths:
+        print(f"Error: {args.rwz_file} not found", file=sys.stderr)
+        return 1
+    
+    # Files are independent, so several are analyzed in parallel
+    if len(rwz_paths) > 1 and args.jobs > 1:
+        with ProcessPoolExecutor(max_workers=min(args.jobs, len(rwz_paths))) as ex:
+            analyses = list(ex.map(analyze_file, rwz_paths, repeat(args.min_confidence)))
+    else:
+        analyses = [analyze_file(path, args.min_confidence) for path in rwz_paths]
+    
+    # Output JSON (a single file keeps the original layout)
     if args.out:
         out_path = Path(args.out)
-        with open(out_path, 'w') as f:
-            json.dump(results, f, indent=2, default=str)
+        if len(analyses) == 1:
+            write_json(out_path, analyses[0][0])
+        else:
+            write_json(out_path, {'files': [results for results, _ in analyses]})
         print(f"JSON output: {out_path}", file=sys.stderr)
     
     # Output Markdown
     if args.out_md:
         md_path = Path(args.out_md)
-        with open(md_path, 'w') as f:
-            f.write(f"# RWZ Size Field String Extraction\n\n")
-            
-            f.write("## Summary\n")
-            f.write(f"- Total size fields: {len(all_size_fields)}\n")
-            f.write(f"- Analyzed: {len(size_fields)}\n")
-            f.write(f"- Strings extracted: {len(strings)}\n\n")
-            
-            # Patterns
-            if patterns.get('spacing'):
-                f.write("## Size Field Spacing\n")
-                spacing = patterns['spacing']
-                f.write(f"- Min: {spacing['min']} bytes\n")
-                f.write(f"- Max: {spacing['max']} bytes\n")
-                f.write(f"- Avg: {spacing['avg']:.1f} bytes\n")
-                f.write(f"- Mode: {spacing['mode']} bytes\n\n")
-            
-            # Sample strings
-            f.write(f"## Sample Extracted Strings (First 20)\n\n")
-            for i, item in enumerate(strings[:20], 1):
-                f.write(f"### String {i}\n")
-                f.write(f"- Size field offset: {item['size_offset_hex']}\n")
-                f.write(f"- Size value: {item['size_value']}\n")
-                f.write(f"- Data offset: {item['data_offset_hex']}\n")
-                for s in item['strings']:
-                    f.write(f"- **{s['encoding']}**: `{s['text']}`\n")
-                f.write("\n")
+        with open(md_path, 'w', buffering=1 << 16) as f:
+            if len(analyses) == 1:
+                write_markdown(f, analyses[0][0], "RWZ Size Field String Extraction")
+            else:
+                for results, _ in analyses:
+                    write_markdown(f, results, f"RWZ Size Field String Extraction: {Path(results['file']).name}")
         
         print(f"Markdown output: {md_path}", file=sys.stderr)
     
     print("\n=== SUMMARY ===", file=sys.stderr)
-    print(f"Size fields detected: {len(size_fields)}")
-    print(f"Strings extracted: {len(strings)}")
-    print(f"Total extractions: {sum(len(x['strings']) for x in strings)}")
+    print(f"Size fields detected: {sum(results['size_fields_analyzed'] for results, _ in analyses)}")
+    print(f"Strings extracted: {sum(results['strings_extracted'] for results, _ in analyses)}")
+    print(f"Total extractions: {sum(total for _, total in analyses)}")
     
     return 0
 
@@ -8,20 +8,33 @@ from pathlib import Path
 
 RULE_ROW_RE = re.compile(r'^\|\s*(\d+)\s*\|\s*(.+?)\s*\|\s*(0x[0-9a-fA-F]+)\s*\|\s*(0x[0-9a-fA-F]+)\s*\|\s*(\d+)\s*\|\s*(\d+)\s*\|')
 GAP_HEADER_RE = re.compile(r'^##\s+Gap\s+(\d+)')
-GAP_RANGE_RE = re.compile(r'^- Range:\s+(0x[0-9a-fA-F]+)\s+\.\.\s+(0x[0-9a-fA-F]+)\s+\(size\s+(\d+)\)')
-GAP_ENT_RE = re.compile(r'^- Entropy:\s+([0-9.]+)')
-GAP_ZERO_RE = re.compile(r'^- Zero ratio:\s+([0-9.]+)')
-GAP_PRINT_RE = re.compile(r'^- Printable ASCII ratio:\s+([0-9.]+)')
-GAP_UTF16_RE = re.compile(r'^- UTF-16-like ratio:\s+([0-9.]+)')
+# Every line of a gap section is matched once; the named group that took part
+# tells which field the line carries
+GAP_LINE_RE = re.compile(
+    r'^(?:##\s+Gap\s+(?P<gap_index>\d+)'
+    r'|- Range:\s+(?P<gap_start>0x[0-9a-fA-F]+)\s+\.\.\s+(?P<gap_end>0x[0-9a-fA-F]+)\s+\(size\s+(?P<gap_size>\d+)\)'
+    r'|- Entropy:\s+(?P<entropy>[0-9.]+)'
+    r'|- Zero ratio:\s+(?P<zero_ratio>[0-9.]+)'
+    r'|- Printable ASCII ratio:\s+(?P<printable_ratio>[0-9.]+)'
+    r'|- UTF-16-like ratio:\s+(?P<utf16_ratio>[0-9.]+))'
+)
 COMP_CAND_RE = re.compile(r'^- Candidate\s+\d+:\s+([a-zA-Z0-9_]+)\s+at\s+(0x[0-9a-fA-F]+),\s+size\s+(\d+),\s+printable\s+([0-9.]+)')
 
 
+def iter_md_lines(md_path: Path):
+    """Yield the lines of a markdown report one at a time, without newlines."""
+    with md_path.open('r', encoding='utf-8', errors='ignore') as f:
+        for line in f:
+            yield line.rstrip('\n')
+
+
 def read_rules_index(md_path: Path):
     rules = []
     if not md_path.exists():
         return rules
     in_table = False
-    for line in md_path.read_text(encoding='utf-8', errors='ignore').splitlines():
+    match_row = RULE_ROW_RE.match
+    for line in iter_md_lines(md_path):
         if line.startswith('## Rules (Index)'):
             in_table = True
             continue
@@ -30,7 +43,7 @@ def read_rules_index(md_path: Path):
                 if line.strip() == '':
                     break
                 continue
-            m = RULE_ROW_RE.match(line)
+            m = match_row(line)
             if not m:
                 continue
             idx, title, start, end, strings, emails = m.groups()
@@ -65,35 +78,19 @@ def read_gap_report(md_path: Path):
     if not md_path.exists():
         return gaps
     cur = None
-    for line in md_path.read_text(encoding='utf-8', errors='ignore').splitlines():
-        m = GAP_HEADER_RE.match(line)
-        if m:
+    match_line = GAP_LINE_RE.match
+    for line in iter_md_lines(md_path):
+        m = match_line(line)
+        if not m:
+            continue
+        fields = {k: v for k, v in m.groupdict().items() if v is not None}
+        if 'gap_index' in fields:
             if cur:
                 gaps.append(cur)
-            cur = {'gap_index': m.group(1)}
-            continue
-        if not cur:
-            continue
-        m = GAP_RANGE_RE.match(line)
-        if m:
-            cur['gap_start'], cur['gap_end'], cur['gap_size'] = m.groups()
-            continue
-        m = GAP_ENT_RE.match(line)
-        if m:
-            cur['entropy'] = m.group(1)
-            continue
-        m = GAP_ZERO_RE.match(line)
-        if m:
-            cur['zero_ratio'] = m.group(1)
-            continue
-        m = GAP_PRINT_RE.match(line)
-        if m:
-            cur['printable_ratio'] = m.group(1)
-            continue
-        m = GAP_UTF16_RE.match(line)
-        if m:
-            cur['utf16_ratio'] = m.group(1)
+            cur = fields
             continue
+        if cur:
+            cur.update(fields)
     if cur:
         gaps.append(cur)
     return gaps
@@ -104,13 +101,15 @@ def read_compress_report(md_path: Path):
     if not md_path.exists():
         return rows
     cur_gap = None
-    for line in md_path.read_text(encoding='utf-8', errors='ignore').splitlines():
-        m = GAP_HEADER_RE.match(line)
+    match_header = GAP_HEADER_RE.match
+    match_cand = COMP_CAND_RE.match
+    for line in iter_md_lines(md_path):
+        m = match_header(line)
         if m:
             cur_gap = m.group(1)
             continue
         if cur_gap:
-            m = COMP_CAND_RE.match(line)
+            m = match_cand(line)
             if m:
                 algo, off, size, printable = m.groups()
                 rows.append({
@@ -137,90 +136,6 @@ def main(argv: list[str]) -> int:
     gaps = read_gap_report(args.gap_md)
     comp = read_compress_report(args.compress_md)
 
-    rows = []
-
-    # Rules
-    for r in rules_index:
-        extra = rules_csv.get(r['title'], {})
-        rows.append({
-            'type': 'rule',
-            'rule_index': r.get('rule_index', ''),
-            'title': r.get('title', ''),
-            'emails': extra.get('emails', ''),
-            'keywords': extra.get('keywords', ''),
-            'rule_start': r.get('rule_start', ''),
-            'rule_end': r.get('rule_end', ''),
-            'strings': r.get('strings', ''),
-            'email_count': r.get('email_count', ''),
-            'gap_index': '',
-            'gap_start': '',
-            'gap_end': '',
-            'gap_size': '',
-            'entropy': '',
-            'zero_ratio': '',
-            'printable_ratio': '',
-            'utf16_ratio': '',
-            'compress_algo': '',
-            'compress_offset': '',
-            'compress_size': '',
-            'compress_printable': '',
-            'source': 'out_report_deep.md + out_rules.csv',
-        })
-
-    # Gaps
-    for g in gaps:
-        rows.append({
-            'type': 'gap',
-            'rule_index': '',
-            'title': '',
-            'emails': '',
-            'keywords': '',
-            'rule_start': '',
-            'rule_end': '',
-            'strings': '',
-            'email_count': '',
-            'gap_index': g.get('gap_index', ''),
-            'gap_start': g.get('gap_start', ''),
-            'gap_end': g.get('gap_end', ''),
-            'gap_size': g.get('gap_size', ''),
-            'entropy': g.get('entropy', ''),
-            'zero_ratio': g.get('zero_ratio', ''),
-            'printable_ratio': g.get('printable_ratio', ''),
-            'utf16_ratio': g.get('utf16_ratio', ''),
-            'compress_algo': '',
-            'compress_offset': '',
-            'compress_size': '',
-            'compress_printable': '',
-            'source': 'out_gap_report.md',
-        })
-
-    # Compression candidates
-    for c in comp:
-        rows.append({
-            'type': 'compress',
-            'rule_index': '',
-            'title': '',
-            'emails': '',
-            'keywords': '',
-            'rule_start': '',
-            'rule_end': '',
-            'strings': '',
-            'email_count': '',
-            'gap_index': c.get('gap_index', ''),
-            'gap_start': '',
-            'gap_end': '',
-            'gap_size': '',
-            'entropy': '',
-            'zero_ratio': '',
-            'printable_ratio': '',
-            'utf16_ratio': '',
-            'compress_algo': c.get('compress_algo', ''),
-            'compress_offset': c.get('compress_offset', ''),
-            'compress_size': c.get('compress_size', ''),
-            'compress_printable': c.get('compress_printable', ''),
-            'source': 'out_compress_report.md',
-        })
-
     header = [
         'type',
         'rule_index',
@@ -246,12 +161,68 @@ def main(argv: list[str]) -> int:
         'source',
     ]
 
+    # Each row is a tuple in header order. After 'type' come the rule columns
+    # (8), the gap columns (8) and the compression columns (4), then 'source';
+    # a row leaves the groups of the other kinds blank.
+    no_rule = ('',) * 8
+    no_gap = ('',) * 8
+    no_compress = ('',) * 4
+    rows = []
+
+    # Rules
+    for r in rules_index:
+        extra = rules_csv.get(r['title'], {})
+        rows.append((
+            'rule',
+            r.get('rule_index', ''),
+            r.get('title', ''),
+            extra.get('emails', ''),
+            extra.get('keywords', ''),
+            r.get('rule_start', ''),
+            r.get('rule_end', ''),
+            r.get('strings', ''),
+            r.get('email_count', ''),
+            *no_gap,
+            *no_compress,
+            'out_report_deep.md + out_rules.csv',
+        ))
+
+    # Gaps
+    for g in gaps:
+        rows.append((
+            'gap',
+            *no_rule,
+            g.get('gap_index', ''),
+            g.get('gap_start', ''),
+            g.get('gap_end', ''),
+            g.get('gap_size', ''),
+            g.get('entropy', ''),
+            g.get('zero_ratio', ''),
+            g.get('printable_ratio', ''),
+            g.get('utf16_ratio', ''),
+            *no_compress,
+            'out_gap_report.md',
+        ))
+
+    # Compression candidates
+    for c in comp:
+        rows.append((
+            'compress',
+            *no_rule,
+            c.get('gap_index', ''),
+            *no_gap[1:],
+            c.get('compress_algo', ''),
+            c.get('compress_offset', ''),
+            c.get('compress_size', ''),
+            c.get('compress_printable', ''),
+            'out_compress_report.md',
+        ))
+
     args.out.parent.mkdir(parents=True, exist_ok=True)
     with args.out.open('w', encoding='utf-8', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=header)
-        writer.writeheader()
-        for row in rows:
-            writer.writerow(row)
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
     return 0
 
 
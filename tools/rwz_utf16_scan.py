@@ -1,5 +1,8 @@
 #!/usr/bin/env python3
 import argparse
+import mmap
+import os
+import re
 import sys
 from pathlib import Path
 
@@ -15,38 +18,89 @@ def is_printable(codepoint: int) -> bool:
     return False
 
 
-def scan_utf16(data: bytes, endian: str, min_chars: int, max_chars: int):
+def _byte_flags(pred) -> bytes:
+    return bytes(1 if pred(b) else 0 for b in range(256))
+
+
+# Per-byte flag tables for the code units is_printable rejects:
+# U+0000-U+001F, surrogates and U+FFFE/U+FFFF
+HIGH_ZERO_TABLE = _byte_flags(lambda b: b == 0)
+LOW_CONTROL_TABLE = _byte_flags(lambda b: b < 0x20)
+HIGH_SURROGATE_TABLE = _byte_flags(lambda b: 0xD8 <= b <= 0xDF)
+HIGH_FF_TABLE = _byte_flags(lambda b: b == 0xFF)
+LOW_FE_TABLE = _byte_flags(lambda b: b >= 0xFE)
+
+# A run of printable code units in the output of nonprintable_flags
+PRINTABLE_RUN_RE = re.compile(rb'\x00+')
+
+
+def nonprintable_flags(low: bytes, high: bytes) -> bytes:
+    """One byte per code unit: 0x01 where is_printable rejects it, else 0x00.
+
+    low and high are the low and high byte streams of the code units. Each
+    is flagged with bytes.translate and the flags are combined as packed
+    integers, so no per-unit Python code runs.
+    """
+    def flags(stream: bytes, table: bytes) -> int:
+        return int.from_bytes(stream.translate(table), 'little')
+
+    bad = ((flags(high, HIGH_ZERO_TABLE) & flags(low, LOW_CONTROL_TABLE))
+           | flags(high, HIGH_SURROGATE_TABLE)
+           | (flags(high, HIGH_FF_TABLE) & flags(low, LOW_FE_TABLE)))
+    return bad.to_bytes(len(low), 'little')
+
+
+def scan_utf16(data: bytes, min_chars: int, max_chars: int, endians=('le', 'be')):
+    """Printable UTF-16 runs as (offset, endian, length, text), sorted by offset and endian.
+
+    The two byte streams of each alignment are sliced once and shared by
+    both endiannesses (the low bytes of LE units are the high bytes of BE).
+    """
     results = []
-    step = 2
-    offsets = [0, 1]
-    for base in offsets:
-        i = base
-        while i + 1 < len(data):
-            start = i
-            chars = []
-            while i + 1 < len(data) and len(chars) < max_chars:
-                if endian == 'le':
-                    cp = data[i] | (data[i + 1] << 8)
-                else:
-                    cp = (data[i] << 8) | data[i + 1]
-                if not is_printable(cp):
-                    break
-                chars.append(cp)
-                i += step
-            if len(chars) >= min_chars:
-                try:
-                    if endian == 'le':
-                        s = bytes(sum(([cp & 0xFF, (cp >> 8) & 0xFF] for cp in chars), [])).decode('utf-16le', errors='ignore')
-                    else:
-                        s = bytes(sum(([(cp >> 8) & 0xFF, cp & 0xFF] for cp in chars), [])).decode('utf-16be', errors='ignore')
-                except Exception:
-                    s = ''
-                results.append((start, endian, len(chars), s))
-            i = max(start + step, i + step)
-    results.sort(key=lambda x: x[0])
+    if max_chars < 1:
+        return results
+    for base in (0, 1):
+        end = base + max(0, len(data) - base) // 2 * 2
+        first = data[base:end:2]
+        second = data[base + 1:end:2]
+        for endian in endians:
+            encoding = 'utf-16le' if endian == 'le' else 'utf-16be'
+            low, high = (first, second) if endian == 'le' else (second, first)
+            for run in PRINTABLE_RUN_RE.finditer(nonprintable_flags(low, high)):
+                pos, stop = run.span()
+                # Runs longer than max_chars are cut into max_chars pieces, and the
+                # unit right after each full piece is skipped before the next one
+                while pos < stop:
+                    length = min(max_chars, stop - pos)
+                    if length >= min_chars:
+                        start = base + 2 * pos
+                        s = data[start:start + 2 * length].decode(encoding, errors='ignore')
+                        results.append((start, endian, length, s))
+                    pos += max_chars + 1
+    results.sort(key=lambda x: (x[0], x[1]))
     return results
 
 
+def write_report(f, name: str, results) -> None:
+    """Write the Markdown report row by row instead of joining it in memory."""
+    f.write(f'# UTF-16 Scan Report: {name}\n\n')
+    f.write(f'- Results: {len(results)}\n\n')
+    f.write('| Offset | Endian | Length | Text |\n')
+    f.write('|--------|--------|--------|------|\n')
+    for offset, endian, length, text in results:
+        t = text.replace('|', '\\|')
+        f.write(f'| 0x{offset:08x} | {endian} | {length} | {t} |\n')
+    f.write('\n')
+
+
+def map_rwz(path: Path):
+    """Memory-map the RWZ file read-only (an empty file yields b'')."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b''
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
 def main(argv: list[str]) -> int:
     ap = argparse.ArgumentParser(description='Scan RWZ for UTF-16 strings (non-ASCII)')
     ap.add_argument('path', type=Path, help='Path to .rwz file')
@@ -56,33 +110,19 @@ def main(argv: list[str]) -> int:
     ap.add_argument('--limit', type=int, default=0, help='Limit output entries (0 = all)')
     args = ap.parse_args(argv)
 
-    data = args.path.read_bytes()
-    results = []
-    results.extend(scan_utf16(data, 'le', args.min_chars, args.max_chars))
-    results.extend(scan_utf16(data, 'be', args.min_chars, args.max_chars))
-    results.sort(key=lambda x: (x[0], x[1]))
+    data = map_rwz(args.path)
+    results = scan_utf16(data, args.min_chars, args.max_chars)
 
     if args.limit:
         results = results[: args.limit]
 
-    lines = []
-    lines.append(f'# UTF-16 Scan Report: {args.path.name}')
-    lines.append('')
-    lines.append(f'- Results: {len(results)}')
-    lines.append('')
-    lines.append('| Offset | Endian | Length | Text |')
-    lines.append('|--------|--------|--------|------|')
-    for offset, endian, length, text in results:
-        t = text.replace('|', '\\|')
-        lines.append(f'| 0x{offset:08x} | {endian} | {length} | {t} |')
-    lines.append('')
-
-    report = '\n'.join(lines) + '\n'
     if args.out:
         args.out.parent.mkdir(parents=True, exist_ok=True)
-        args.out.write_text(report, encoding='utf-8')
+        with args.out.open('w', encoding='utf-8', buffering=1 << 16) as f:
+            write_report(f, args.path.name, results)
     else:
-        print(report)
+        write_report(sys.stdout, args.path.name, results)
+        sys.stdout.write('\n')
     return 0
 
 
@@ -1,13 +1,33 @@
 #!/usr/bin/env python3
 import argparse
+import heapq
+import mmap
+import os
 import re
 import sys
 import zlib
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import islice
 from pathlib import Path
 
+try:
+    import re2
+except Exception:
+    re2 = None
 
-ASCII_RE = re.compile(rb'[\x20-\x7e]{4,}')
-UTF16LE_RE = re.compile(rb'(?:[\x20-\x7e]\x00){4,}')
+# Flag-run scans use RE2 (linear-time DFA) when installed, else the stdlib
+# engine; ZLIB_HEADER_RE needs lookahead, which RE2 lacks, so it stays on re
+_scan_re = re2 if re2 is not None else re
+
+# bytes.translate tables flagging printable ASCII and zero bytes with 0x01
+ASCII_PRINTABLE_TABLE = bytes(1 if 0x20 <= b <= 0x7E else 0 for b in range(256))
+ZERO_TABLE = bytes(1 if b == 0 else 0 for b in range(256))
+# Runs of 4+ flags; the literal prefix lets the regex engine skip ahead fast
+FLAG_RUN_RE = _scan_re.compile(rb'\x01\x01\x01\x01+')
+
+# Input chunk size when feeding a candidate stream to zlib
+ZLIB_CHUNK = 65536
 
 
 def is_zlib_header(cmf: int, flg: int) -> bool:
@@ -18,32 +38,162 @@ def is_zlib_header(cmf: int, flg: int) -> bool:
     return True
 
 
-def extract_ascii(data: bytes, limit: int = 10):
-    out = []
-    for m in ASCII_RE.finditer(data):
-        out.append(m.group().decode('ascii', errors='ignore'))
-        if limit and len(out) >= limit:
-            break
-    return out
+def zlib_header_re() -> re.Pattern:
+    """Regex matching the CMF byte at every offset where is_zlib_header holds.
+
+    Only 16 CMF bytes (deflate) qualify, each with a handful of FLG bytes,
+    so the valid pairs form a small alternation the regex engine scans in C.
+    The FLG byte is a lookahead, so a match consumes one byte and
+    overlapping headers are all found.
+    """
+    alts = []
+    for cmf in range(0x08, 0x100, 0x10):
+        flgs = b''.join(b'\\x%02x' % flg for flg in range(256) if is_zlib_header(cmf, flg))
+        alts.append(b'\\x%02x(?=[%s])' % (cmf, flgs))
+    return re.compile(b'|'.join(alts), re.DOTALL)
+
+
+ZLIB_HEADER_RE = zlib_header_re()
 
 
-def extract_utf16le(data: bytes, limit: int = 10):
+def extract_ascii(data: bytes, limit: int = 10, printable: bytes | None = None):
+    """Runs of 4+ printable ASCII bytes, the first limit of them (0 = all).
+
+    printable is data.translate(ASCII_PRINTABLE_TABLE) if the caller has it.
+    """
+    if printable is None:
+        printable = data.translate(ASCII_PRINTABLE_TABLE)
     out = []
-    for m in UTF16LE_RE.finditer(data):
-        out.append(m.group().decode('utf-16le', errors='ignore'))
+    for m in FLAG_RUN_RE.finditer(printable):
+        out.append(data[m.start():m.end()].decode('ascii', errors='ignore'))
         if limit and len(out) >= limit:
             break
     return out
 
 
+def extract_utf16le(data: bytes, limit: int = 10, printable: bytes | None = None):
+    """Runs of 4+ printable ASCII UTF-16LE units, the first limit of them (0 = all).
+
+    Each byte parity is flagged separately (printable low byte and zero
+    high byte, combined as packed integers); runs of the two parities
+    cannot overlap, so merging them by offset gives the left-to-right order.
+    printable is shared with extract_ascii as there.
+    """
+    if printable is None:
+        printable = data.translate(ASCII_PRINTABLE_TABLE)
+    zero = data.translate(ZERO_TABLE)
+    runs = []
+    for base in (0, 1):
+        high = zero[base + 1::2]
+        low = printable[base::2][:len(high)]
+        flags = int.from_bytes(low, 'little') & int.from_bytes(high, 'little')
+        spans = ((base + 2 * m.start(), base + 2 * m.end())
+                 for m in FLAG_RUN_RE.finditer(flags.to_bytes(len(low), 'little')))
+        runs.append(list(islice(spans, limit)) if limit else list(spans))
+    out = [data[start:end].decode('utf-16le', errors='ignore')
+           for start, end in heapq.merge(*runs)]
+    return out[:limit] if limit else out
+
+
 def try_zlib(data: bytes, offset: int, max_out: int):
+    """Inflate the zlib stream at offset into (output, end offset of input used).
+
+    Returns None if the stream is invalid or truncated. Input is fed in
+    ZLIB_CHUNK memoryview slices, so failing candidates copy nothing, and
+    output stops at max_out bytes (0 = no limit): a stream still producing
+    data at that point is returned cut to max_out, with the input used so far.
+    """
+    view = memoryview(data)
     try:
-        out = zlib.decompress(data[offset:], wbits=zlib.MAX_WBITS, bufsize=max_out)
-        return out
+        d = zlib.decompressobj(wbits=zlib.MAX_WBITS)
+        parts = []
+        size = 0
+        pos = offset
+        while not d.eof and not (max_out and size >= max_out):
+            if d.unconsumed_tail:
+                chunk = d.unconsumed_tail
+            elif pos < len(view):
+                chunk = view[pos:pos + ZLIB_CHUNK]
+                pos += len(chunk)
+            else:
+                chunk = b''
+            out = d.decompress(chunk, max_out - size if max_out else 0)
+            if not chunk and not out:
+                return None
+            parts.append(out)
+            size += len(out)
+        return b''.join(parts), pos - len(d.unconsumed_tail) - len(d.unused_data)
     except Exception:
         return None
 
 
+def scan_streams(data: bytes, candidates: list[int], max_out: int, jobs: int = 1):
+    """Decode the zlib streams at the ascending candidate offsets as (offset, output).
+
+    Candidates inside the input of an already decoded stream are skipped.
+    With jobs > 1 candidates are tried in batches on a thread pool (zlib
+    releases the GIL while inflating) and each batch is applied in offset
+    order, so the result matches the serial scan.
+    """
+    work = partial(try_zlib, data, max_out=max_out)
+    ex = ThreadPoolExecutor(max_workers=jobs) if jobs > 1 else None
+    streams = []
+    next_scan = 0
+    pos = 0
+    try:
+        while pos < len(candidates):
+            batch = []
+            while pos < len(candidates) and len(batch) < max(jobs, 1):
+                if candidates[pos] >= next_scan:
+                    batch.append(candidates[pos])
+                pos += 1
+            outs = ex.map(work, batch) if ex else map(work, batch)
+            for i, res in zip(batch, outs):
+                if res is None or i < next_scan:
+                    continue
+                out, next_scan = res
+                streams.append((i, out))
+    finally:
+        if ex:
+            ex.shutdown()
+    return streams
+
+
+def write_report(f, name: str, hits, dump_dir: Path | None = None) -> None:
+    """Write the Markdown report line by line, dumping each stream to dump_dir if set."""
+    f.write(f'# Zlib Scan Report: {name}\n\n')
+    f.write(f'- Candidates found: {len(hits)}\n\n')
+    for idx, (offset, out) in enumerate(hits, start=1):
+        # Both sample scans share one printable-byte classification
+        printable = out.translate(ASCII_PRINTABLE_TABLE)
+        ascii_samples = extract_ascii(out, limit=10, printable=printable)
+        utf16_samples = extract_utf16le(out, limit=10, printable=printable)
+        f.write(f'## Stream {idx}\n')
+        f.write(f'- Offset: 0x{offset:08x}\n')
+        f.write(f'- Decompressed size: {len(out)}\n')
+        if ascii_samples:
+            f.write('- ASCII samples:\n')
+            for s in ascii_samples:
+                f.write(f'  - {s}\n')
+        if utf16_samples:
+            f.write('- UTF-16LE samples:\n')
+            for s in utf16_samples:
+                f.write(f'  - {s}\n')
+        f.write('\n')
+
+        if dump_dir:
+            out_path = dump_dir / f'stream_{idx:02d}_0x{offset:08x}.bin'
+            out_path.write_bytes(out)
+
+
+def map_rwz(path: Path):
+    """Memory-map the RWZ file read-only (an empty file yields b'')."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b''
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
 def main(argv: list[str]) -> int:
     ap = argparse.ArgumentParser(description='Scan RWZ for embedded zlib streams')
     ap.add_argument('path', type=Path, help='Path to .rwz file')
@@ -51,54 +201,25 @@ def main(argv: list[str]) -> int:
     ap.add_argument('--min-out', type=int, default=64, help='Min decompressed bytes to report')
     ap.add_argument('--out', type=Path, help='Write report to file (UTF-8)')
     ap.add_argument('--dump-dir', type=Path, help='Dump decompressed streams here')
+    ap.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help='Threads for trying candidates (1 = serial)')
     args = ap.parse_args(argv)
 
-    data = args.path.read_bytes()
-    hits = []
-    for i in range(len(data) - 2):
-        cmf = data[i]
-        flg = data[i + 1]
-        if not is_zlib_header(cmf, flg):
-            continue
-        out = try_zlib(data, i, args.max_out)
-        if out and len(out) >= args.min_out:
-            hits.append((i, out))
-
-    lines = []
-    lines.append(f'# Zlib Scan Report: {args.path.name}')
-    lines.append('')
-    lines.append(f'- Candidates found: {len(hits)}')
-    lines.append('')
+    data = map_rwz(args.path)
+    # Header candidates at offsets 0 .. len(data) - 3, found by the regex engine
+    candidates = [m.start() for m in ZLIB_HEADER_RE.finditer(data, 0, max(0, len(data) - 1))]
+    streams = scan_streams(data, candidates, args.max_out, args.jobs)
+    hits = [(i, out) for i, out in streams if out and len(out) >= args.min_out]
 
     if args.dump_dir:
         args.dump_dir.mkdir(parents=True, exist_ok=True)
 
-    for idx, (offset, out) in enumerate(hits, start=1):
-        ascii_samples = extract_ascii(out, limit=10)
-        utf16_samples = extract_utf16le(out, limit=10)
-        lines.append(f'## Stream {idx}')
-        lines.append(f'- Offset: 0x{offset:08x}')
-        lines.append(f'- Decompressed size: {len(out)}')
-        if ascii_samples:
-            lines.append('- ASCII samples:')
-            for s in ascii_samples:
-                lines.append(f'  - {s}')
-        if utf16_samples:
-            lines.append('- UTF-16LE samples:')
-            for s in utf16_samples:
-                lines.append(f'  - {s}')
-        lines.append('')
-
-        if args.dump_dir:
-            out_path = args.dump_dir / f'stream_{idx:02d}_0x{offset:08x}.bin'
-            out_path.write_bytes(out)
-
-    report = '\n'.join(lines) + '\n'
     if args.out:
         args.out.parent.mkdir(parents=True, exist_ok=True)
-        args.out.write_text(report, encoding='utf-8')
+        with args.out.open('w', encoding='utf-8', buffering=1 << 16) as f:
+            write_report(f, args.path.name, hits, args.dump_dir)
     else:
-        print(report)
+        write_report(sys.stdout, args.path.name, hits, args.dump_dir)
+        sys.stdout.write('\n')
     return 0
 
 